@@ -0,0 +1,99 @@
+"""
+Перенос старых отзывов вместе с комментариями в архивные таблицы.
+
+Оперативные таблицы остаются небольшими: списки по умолчанию читают
+только их, а архив добавляется лишь с параметром include_archived=1.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.db import router, transaction
+from django.utils import timezone
+
+from reviews.constants import ARCHIVE_CHUNK_SIZE
+from reviews.counters import change_counters
+from reviews.models import (
+    ArchivedComment, ArchivedReview, Comment, Review, Title
+)
+
+
+class ArchiveConflict(Exception):
+    """Во время переноса у отзывов появились новые комментарии."""
+
+
+def get_reviews_to_archive(older_than_days, keep_newest):
+    """
+    id отзывов старше `older_than_days` дней или не входящих в
+    `keep_newest` последних у своего произведения. 0 отключает условие.
+    """
+    ids = set()
+    if older_than_days:
+        ids.update(Review.objects.filter(
+            pub_date__lt=timezone.now() - timedelta(days=older_than_days)
+        ).values_list('pk', flat=True))
+    if keep_newest:
+        for title_id in Title.objects.filter(
+            review_count__gt=keep_newest
+        ).values_list('pk', flat=True):
+            ids.update(Review.objects.filter(title_id=title_id).order_by(
+                '-pub_date'
+            ).values_list('pk', flat=True)[keep_newest:])
+    return sorted(ids)
+
+
+def copy_rows(source, target, **filters):
+    fields = [field.attname for field in target._meta.concrete_fields]
+    return [
+        target(**values)
+        for values in source.objects.filter(**filters).order_by().values(
+            *fields
+        )
+    ]
+
+
+def archive_chunk(review_ids):
+    """
+    Переносит отзывы и их комментарии в архив одной транзакцией.
+    Возвращает количество перенесённых отзывов и комментариев.
+    """
+    using = router.db_for_write(Review)
+    with transaction.atomic(using=using):
+        reviews = copy_rows(Review, ArchivedReview, pk__in=review_ids)
+        comments = copy_rows(
+            Comment, ArchivedComment, review_id__in=review_ids
+        )
+        comment_counts = Counter(comment.review_id for comment in comments)
+        for review in reviews:
+            review.comment_count = comment_counts[review.pk]
+        ArchivedReview.objects.bulk_create(reviews)
+        ArchivedComment.objects.bulk_create(comments)
+        deleted = Comment._base_manager.filter(
+            review_id__in=review_ids
+        )._raw_delete(using)
+        if deleted != len(comments):
+            raise ArchiveConflict
+        Review._base_manager.filter(pk__in=review_ids)._raw_delete(using)
+        change_counters(Review, reviews, -1)
+        change_counters(ArchivedReview, reviews, 1)
+    return len(reviews), len(comments)
+
+
+def archive_reviews(older_than_days, keep_newest,
+                    chunk_size=ARCHIVE_CHUNK_SIZE):
+    """
+    Переносит в архив подходящие отзывы пачками. Пачки, в которые во
+    время переноса добавили комментарии, пропускаются до следующего
+    запуска. Возвращает количество перенесённых отзывов и комментариев.
+    """
+    ids = get_reviews_to_archive(older_than_days, keep_newest)
+    reviews = comments = 0
+    for start in range(0, len(ids), chunk_size):
+        try:
+            chunk_reviews, chunk_comments = archive_chunk(
+                ids[start:start + chunk_size]
+            )
+        except ArchiveConflict:
+            continue
+        reviews += chunk_reviews
+        comments += chunk_comments
+    return reviews, comments
@@ -0,0 +1,254 @@
+import asyncio
+import contextvars
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.handlers.asgi import ASGIRequest
+from django.core.paginator import Paginator
+from django.db import DatabaseError, close_old_connections
+from django.http import Http404, HttpResponse
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from api_yamdb.db_router import can_read_from_replica, replica_reads
+
+from .authentication import get_request_token
+from .mixins import (
+    EXPAND_PARAM, FIELDS_PARAM, INCLUDE_ARCHIVED_PARAM, OMIT_PARAM
+)
+from .renderers import FastJSONRenderer
+from .views import CommentViewSet, ReviewViewSet
+
+# Списки произведений и произведение сюда не входят: их ответ
+# упирается в процессор, и без Django он не быстрее.
+ASYNC_READ_ROUTES = (
+    (
+        re.compile(r'^/api/v1/titles/(?P<title_id>\d+)/reviews/$'),
+        ReviewViewSet,
+        'list',
+    ),
+    (
+        re.compile(
+            r'^/api/v1/titles/(?P<title_id>\d+)/reviews/'
+            r'(?P<review_id>\d+)/comments/$'
+        ),
+        CommentViewSet,
+        'list',
+    ),
+)
+# Методы маршрута списка, как в DefaultRouter.
+ACTION_MAPS = {
+    'list': {'get': 'list', 'post': 'create'},
+}
+SYNC_ONLY_PARAMS = (
+    FIELDS_PARAM, OMIT_PARAM, EXPAND_PARAM, INCLUDE_ARCHIVED_PARAM,
+    'format', 'count',
+)
+# Middleware, которые обрабатывают только ответ; остальные не нужны
+# запросам на чтение без сессии и CSRF.
+RESPONSE_MIDDLEWARE = (
+    'django.middleware.security.SecurityMiddleware',
+    'api.middleware.CompressionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+)
+JSON_MEDIA_RANGES = ('*/*', 'application/*', 'application/json')
+FALLBACK_ERRORS = (APIException, Http404, InvalidToken, ObjectDoesNotExist)
+
+logger = logging.getLogger(__name__)
+
+db_executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_DB_WORKERS, thread_name_prefix='async-db'
+)
+
+
+class FallbackToDjango(Exception):
+    """Запрос нужно обработать обычным синхронным представлением."""
+
+
+async def run_in_db_pool(func, *args):
+    """
+    Выполняет работу с БД в ограниченном пуле потоков.
+
+    У каждого потока пула своё постоянное соединение, оно закрывается
+    только после ошибки БД.
+    """
+
+    def call():
+        try:
+            return func(*args)
+        except DatabaseError:
+            close_old_connections()
+            raise
+
+    return await asyncio.get_running_loop().run_in_executor(
+        db_executor, contextvars.copy_context().run, call
+    )
+
+
+def accepts_json(request):
+    accept = request.META.get('HTTP_ACCEPT', '')
+    return all(
+        media_range.split(';')[0].strip() in JSON_MEDIA_RANGES
+        for media_range in accept.split(',')
+    ) if accept else True
+
+
+def get_view(viewset_class, action, request, kwargs):
+    view = viewset_class(
+        action=action, args=(), kwargs=kwargs, format_kwarg=None,
+        headers={}
+    )
+    # Обработчики методов привязываются как в ViewSetMixin.as_view,
+    # чтобы заголовок Allow совпадал с ответом Django.
+    view.action_map = {
+        method: name for method, name in ACTION_MAPS[action].items()
+        if hasattr(view, name)
+    }
+    for method, name in view.action_map.items():
+        setattr(view, method, getattr(view, name))
+    view.request = Request(request)
+    return view
+
+
+def get_queryset(view):
+    return view.filter_queryset(view.get_queryset())
+
+
+def get_page_rows(view, queryset, offset, limit):
+    serializer = view.values_serializer_class()
+    return serializer.to_representation(
+        list(serializer.get_rows(queryset)[offset:offset + limit])
+    )
+
+
+def get_page(view, offset, limit):
+    """
+    Общее количество и строки страницы. Запросы выполняются по очереди
+    в одном потоке: представление и пагинатор не потокобезопасны.
+    """
+    queryset = get_queryset(view)
+    count = view.paginator.get_count(queryset, view.request, view)
+    return queryset, count, get_page_rows(view, queryset, offset, limit)
+
+
+async def list_data(view):
+    """Страница списка: вся работа с БД — одним заданием пула."""
+    pagination = view.paginator
+    page_number = view.request.query_params.get(
+        pagination.page_query_param, '1'
+    )
+    if not page_number.isdigit() or int(page_number) < 1:
+        raise FallbackToDjango
+    page_number = int(page_number)
+    page_size = pagination.get_page_size(view.request)
+
+    queryset, count, results = await run_in_db_pool(
+        get_page, view, (page_number - 1) * page_size, page_size
+    )
+    paginator = Paginator(queryset, page_size)
+    paginator.count = count
+    if page_number > paginator.num_pages:
+        raise FallbackToDjango
+    pagination.request = view.request
+    pagination.page = paginator.page(page_number)
+    return pagination.get_paginated_response(results).data
+
+
+def get_no_response(request):
+    raise AssertionError('Middleware ответа не вызывает представление.')
+
+
+def get_response_middleware():
+    """
+    Middleware из MIDDLEWARE, которые только дописывают заголовки
+    и сжимают тело, в порядке обработки ответа Django.
+    """
+    return [
+        import_string(path)(get_no_response)
+        for path in reversed(settings.MIDDLEWARE)
+        if path in RESPONSE_MIDDLEWARE
+    ]
+
+
+def build_response(request, view, data):
+    """
+    Ответ с теми же заголовками, что у синхронного представления:
+    заголовки DRF, затем обработка теми же middleware.
+    """
+    response = HttpResponse(
+        FastJSONRenderer().render(data, renderer_context={'view': view}),
+        content_type=FastJSONRenderer.media_type,
+    )
+    for name, value in view.default_response_headers.items():
+        response[name] = value
+    for middleware in get_response_middleware():
+        response = middleware.process_response(request, response)
+    return response
+
+
+async def send_json(send, request, view, data):
+    response = build_response(request, view, data)
+    headers = [
+        (name.lower().encode('latin-1'), value.encode('latin-1'))
+        for name, value in response.items()
+    ]
+    await send({
+        'type': 'http.response.start',
+        'status': response.status_code,
+        'headers': headers,
+    })
+    await send({'type': 'http.response.body', 'body': response.content})
+
+
+async def read_view(scope, viewset_class, action, kwargs):
+    request = ASGIRequest(scope, None)
+    if (
+        not accepts_json(request)
+        or any(param in request.GET for param in SYNC_ONLY_PARAMS)
+    ):
+        raise FallbackToDjango
+    token = get_request_token(request)
+    view = get_view(viewset_class, action, request, kwargs)
+    with replica_reads(can_read_from_replica(
+        token.get(api_settings.USER_ID_CLAIM) if token else None
+    )):
+        return view, request, await list_data(view)
+
+
+def async_read_router(django_application):
+    """
+    Обрабатывает GET-запросы к спискам отзывов и комментариев прямо
+    в цикле событий.
+    Остальные запросы и нестандартные случаи уходят в Django.
+    """
+
+    async def application(scope, receive, send):
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            for pattern, viewset_class, action in ASYNC_READ_ROUTES:
+                match = pattern.match(scope['path'])
+                if match:
+                    try:
+                        view, request, data = await read_view(
+                            scope, viewset_class, action, match.groupdict()
+                        )
+                    except (FallbackToDjango, *FALLBACK_ERRORS):
+                        break
+                    except Exception:
+                        # Например, «database is locked»: Django повторит
+                        # запрос и при повторной ошибке вернёт обычный 500.
+                        logger.exception(
+                            'Ошибка асинхронного чтения %s, запрос передан '
+                            'Django.', scope['path']
+                        )
+                        break
+                    return await send_json(send, request, view, data)
+        return await django_application(scope, receive, send)
+
+    return application
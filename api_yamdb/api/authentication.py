@@ -0,0 +1,120 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework import permissions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+User = get_user_model()
+
+TOKEN_VERSION_CLAIM = 'ver'
+TOKEN_VERSION_CACHE_KEY = 'token_version:{user_id}'
+
+
+def get_token_version_cache_key(user_id):
+    return TOKEN_VERSION_CACHE_KEY.format(user_id=user_id)
+
+
+def get_request_token(request):
+    """
+    Проверяет подпись JWT из заголовка запроса без обращения к БД.
+
+    Возвращает токен или None, если заголовка нет.
+    """
+    authenticator = JWTAuthentication()
+    header = authenticator.get_header(request)
+    if header is None:
+        return None
+    raw_token = authenticator.get_raw_token(header)
+    if raw_token is None:
+        return None
+    return authenticator.get_validated_token(raw_token)
+
+
+def get_token_user_id(request):
+    """id пользователя из JWT запроса или None."""
+    try:
+        token = get_request_token(request)
+    except AuthenticationFailed:
+        return None
+    return token.get(api_settings.USER_ID_CLAIM) if token else None
+
+
+class YamdbRefreshToken(RefreshToken):
+    """Refresh-токен с ролью и версией токенов пользователя в claims."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['username'] = user.username
+        token['role'] = user.role
+        token['is_staff'] = user.is_staff
+        token['is_superuser'] = user.is_superuser
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        return token
+
+
+class YamdbTokenUser(TokenUser):
+    """Пользователь, восстановленный из claims токена без запроса к БД."""
+
+    @property
+    def role(self):
+        return self.token.get('role', User.Role.USER)
+
+    @property
+    def is_moderator(self):
+        return self.role == User.Role.MODERATOR
+
+    @property
+    def is_admin(self):
+        return (
+            self.role == User.Role.ADMIN
+            or self.is_staff
+            or self.is_superuser
+        )
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    Аутентификация по JWT без загрузки пользователя на безопасных запросах.
+
+    Актуальность роли проверяется по версии токенов пользователя,
+    которая кешируется в памяти процесса на TOKEN_VERSION_CACHE_TTL секунд.
+    Изменяющие запросы и токены без claims обрабатываются как обычно.
+    """
+
+    def authenticate(self, request):
+        self.request_method = request.method
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        if (
+            self.request_method not in permissions.SAFE_METHODS
+            or TOKEN_VERSION_CLAIM not in validated_token
+        ):
+            return super().get_user(validated_token)
+
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        if validated_token[TOKEN_VERSION_CLAIM] != self.get_token_version(
+            user_id
+        ):
+            raise AuthenticationFailed(
+                'Токен отозван.', code='token_revoked'
+            )
+        return YamdbTokenUser(validated_token)
+
+    def get_token_version(self, user_id):
+        """Текущая версия токенов активного пользователя или None."""
+        key = get_token_version_cache_key(user_id)
+        version = cache.get(key)
+        if version is None:
+            version = User.objects.filter(
+                pk=user_id, is_active=True
+            ).values_list('token_version', flat=True).first()
+            if version is None:
+                version = -1
+            cache.set(key, version, settings.TOKEN_VERSION_CACHE_TTL)
+        return None if version == -1 else version
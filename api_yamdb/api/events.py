@@ -0,0 +1,219 @@
+import asyncio
+import itertools
+import re
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+from reviews.models import Title
+from .async_views import run_in_db_pool
+
+TITLE_EVENTS_PATH = re.compile(r'^/api/v1/titles/(?P<title_id>\d+)/events/$')
+
+
+class Subscriber:
+    """Подписчик на события произведения с ограниченным буфером."""
+
+    def __init__(self, title_id, loop):
+        self.title_id = title_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=settings.SSE_BUFFER_SIZE)
+        self.overflowed = False
+
+    def put(self, event):
+        """Вызывается в цикле событий подписчика."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class EventBroker:
+    """
+    Рассылка событий о новых отзывах и комментариях внутри процесса.
+
+    События произведения сохраняются, только пока у него есть
+    подписчики и ещё SSE_RESUME_WINDOW секунд после ухода последнего,
+    чтобы переподключившийся клиент получил пропущенное по Last-Event-ID.
+    Процесс без подписчиков (например, под WSGI) событий не хранит.
+    """
+
+    def __init__(self):
+        self._ids = itertools.count(time.time_ns())
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._history = {}
+        self._resume_until = {}
+
+    def is_listened(self, title_id):
+        """Нужны ли события произведения хоть одному клиенту."""
+        with self._lock:
+            self._prune()
+            return (
+                title_id in self._subscribers
+                or title_id in self._resume_until
+            )
+
+    def publish(self, title_id, event_type, data):
+        """Публикует событие. Можно вызывать из любого потока."""
+        with self._lock:
+            self._prune()
+            if (
+                title_id not in self._subscribers
+                and title_id not in self._resume_until
+            ):
+                return
+            event = (next(self._ids), event_type, data)
+            self._history.setdefault(
+                title_id, deque(maxlen=settings.SSE_HISTORY_SIZE)
+            ).append(event)
+            subscribers = list(self._subscribers.get(title_id, ()))
+        for subscriber in subscribers:
+            subscriber.loop.call_soon_threadsafe(subscriber.put, event)
+
+    def subscribe(self, title_id, last_event_id=None):
+        subscriber = Subscriber(title_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(title_id, set()).add(subscriber)
+            self._resume_until.pop(title_id, None)
+            if last_event_id is not None:
+                for event in self._history.get(title_id, ()):
+                    if event[0] > last_event_id:
+                        subscriber.put(event)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            title_id = subscriber.title_id
+            subscribers = self._subscribers.get(title_id, set())
+            subscribers.discard(subscriber)
+            if not subscribers:
+                self._subscribers.pop(title_id, None)
+                self._resume_until[title_id] = (
+                    time.monotonic() + settings.SSE_RESUME_WINDOW
+                )
+            self._prune()
+
+    def _prune(self):
+        """Забывает произведения, окно возобновления которых истекло."""
+        now = time.monotonic()
+        expired = [
+            title_id for title_id, deadline in self._resume_until.items()
+            if deadline <= now
+        ]
+        for title_id in expired:
+            del self._resume_until[title_id]
+            self._history.pop(title_id, None)
+
+
+broker = EventBroker()
+
+
+def format_event(event):
+    event_id, event_type, data = event
+    return (
+        f'id: {event_id}\nevent: {event_type}\n'.encode()
+        + b'data: ' + data + b'\n\n'
+    )
+
+
+def get_last_event_id(scope):
+    for name, value in scope['headers']:
+        if name == b'last-event-id':
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+
+async def send_response(send, status, body):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json')],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def wait_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def stream_events(send, subscriber):
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+        ],
+    })
+    await send({
+        'type': 'http.response.body',
+        'body': f'retry: {settings.SSE_RETRY_MS}\n\n'.encode(),
+        'more_body': True,
+    })
+    while not subscriber.overflowed:
+        try:
+            event = await asyncio.wait_for(
+                subscriber.queue.get(), settings.SSE_HEARTBEAT_INTERVAL
+            )
+        except asyncio.TimeoutError:
+            body = b': ping\n\n'
+        else:
+            body = format_event(event)
+        await send({
+            'type': 'http.response.body', 'body': body, 'more_body': True
+        })
+    # Клиент не успевает читать: закрываем поток, браузер
+    # переподключится и дочитает пропущенное по Last-Event-ID.
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+async def title_events(scope, receive, send, title_id):
+    """
+    ASGI-обработчик потока событий Server-Sent Events
+    о новых отзывах и комментариях к произведению.
+    """
+    if scope['method'] != 'GET':
+        return await send_response(
+            send, 405, b'{"detail":"Method not allowed."}'
+        )
+    if not await run_in_db_pool(Title.objects.filter(pk=title_id).exists):
+        return await send_response(send, 404, b'{"detail":"Not found."}')
+
+    subscriber = broker.subscribe(title_id, get_last_event_id(scope))
+    tasks = {
+        asyncio.ensure_future(stream_events(send, subscriber)),
+        asyncio.ensure_future(wait_disconnect(receive)),
+    }
+    try:
+        done, pending = await asyncio.wait(
+            tasks, return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in pending:
+            task.cancel()
+        for task in done:
+            task.result()
+    finally:
+        broker.unsubscribe(subscriber)
+
+
+def events_router(django_application):
+    """Направляет запросы потока событий мимо Django."""
+
+    async def application(scope, receive, send):
+        if scope['type'] == 'http':
+            match = TITLE_EVENTS_PATH.match(scope['path'])
+            if match:
+                return await title_events(
+                    scope, receive, send, int(match['title_id'])
+                )
+        return await django_application(scope, receive, send)
+
+    return application
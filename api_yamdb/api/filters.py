@@ -1,20 +1,119 @@
+from django.db.models import CharField, Lookup
 from django_filters import rest_framework as filters
-from reviews.models import Genre, Title
+from django_filters.constants import EMPTY_VALUES
+from rest_framework.filters import SearchFilter
+
+from reviews.models import Title
+from .slug_cache import category_slugs, genre_slugs
+
+MAX_CHAR = chr(0x10FFFF)
+
+
+@CharField.register_lookup
+class Prefix(Lookup):
+    """
+    Поиск по началу строки через диапазон значений: в отличие от LIKE
+    такое условие использует обычный индекс.
+    """
+
+    lookup_name = 'prefix'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'({lhs} >= {rhs} AND {lhs} < {rhs})', [
+            *lhs_params, *rhs_params,
+            *lhs_params, *(param + MAX_CHAR for param in rhs_params),
+        ]
+
+
+class CasefoldSearchFilter(SearchFilter):
+    """
+    Поиск по теневым полям с приведёнными к единому регистру значениями.
+
+    Каждое слово поиска приводится к тому же виду и, как в SearchFilter,
+    должно найтись хотя бы в одном поле: по умолчанию — по вхождению,
+    `^поле` — по началу (диапазон по индексу), `=поле` — на равенство.
+    Поиск по вхождению индекс не использует; параметр
+    `search_mode=prefix` переключает поля без префикса на поиск по
+    началу строки.
+    """
+
+    lookup_prefixes = {'^': 'prefix', '=': 'exact'}
+    search_mode_param = 'search_mode'
+    PREFIX_MODE = 'prefix'
+    prefix_mode = False
+
+    def get_search_terms(self, request):
+        return [term.casefold() for term in super().get_search_terms(request)]
+
+    def filter_queryset(self, request, queryset, view):
+        self.prefix_mode = (
+            request.query_params.get(self.search_mode_param)
+            == self.PREFIX_MODE
+        )
+        return super().filter_queryset(request, queryset, view)
+
+    def construct_search(self, field_name):
+        if field_name[0] in self.lookup_prefixes:
+            return f'{field_name[1:]}__{self.lookup_prefixes[field_name[0]]}'
+        if self.prefix_mode:
+            return f'{field_name}__prefix'
+        return f'{field_name}__contains'
+
+
+class CachedSlugFilter(filters.CharFilter):
+    """
+    Фильтр по slug связи: slug переводится в id по SlugCache, поэтому
+    условие ставится на внешний ключ без JOIN. Неизвестный slug даёт
+    пустой результат.
+    """
+
+    def __init__(self, *args, slug_cache, **kwargs):
+        self.slug_cache = slug_cache
+        super().__init__(*args, **kwargs)
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        pk = self.slug_cache.get_id(value)
+        if pk is None:
+            return qs.none()
+        return qs.filter(**{self.field_name: pk})
+
+
+class CachedSlugMultipleFilter(filters.MultipleChoiceFilter):
+    """
+    Фильтр по нескольким slug связи «многие ко многим»: slug
+    проверяются и переводятся в id по SlugCache.
+    """
+
+    def __init__(self, *args, slug_cache, **kwargs):
+        self.slug_cache = slug_cache
+        super().__init__(*args, choices=slug_cache.get_choices, **kwargs)
+
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        ids = [self.slug_cache.get_id(slug) for slug in value]
+        qs = qs.filter(**{f'{self.field_name}__in': ids})
+        return qs.distinct() if len(ids) > 1 else qs
 
 
 class TitleFilter(filters.FilterSet):
-    genre = filters.ModelMultipleChoiceFilter(
-        field_name='genre__slug',
-        to_field_name='slug',
-        queryset=Genre.objects.all(),
+    genre = CachedSlugMultipleFilter(
+        field_name='genre',
+        slug_cache=genre_slugs,
     )
-    category = filters.CharFilter(
-        field_name='category__slug',
-    )
-    name = filters.CharFilter(
-        lookup_expr='icontains'
+    category = CachedSlugFilter(
+        field_name='category',
+        slug_cache=category_slugs,
     )
+    name = filters.CharFilter(method='filter_name')
 
     class Meta:
         model = Title
         fields = ['genre', 'category', 'name', 'year']
+
+    def filter_name(self, queryset, name, value):
+        return queryset.filter(name_casefold__contains=value.casefold())
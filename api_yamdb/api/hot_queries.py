@@ -0,0 +1,83 @@
+"""
+Частые запросы API, планы которых проверяет команда explain_hot_queries.
+
+Запросы повторяют то, что строят представления и фильтры; при изменении
+представлений нужно обновить и их.
+"""
+from datetime import datetime, timezone
+
+from django.conf import settings
+
+from reviews.expressions import rating_expression
+from reviews.models import Comment, Review, Title
+
+PAGE_SIZE = settings.REST_FRAMEWORK['PAGE_SIZE']
+CURSOR_DATE = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+HOT_QUERIES = {}
+
+
+def hot_query(name):
+    """Регистрирует функцию, которая возвращает частый запрос."""
+
+    def register(func):
+        HOT_QUERIES[name] = func
+        return func
+
+    return register
+
+
+@hot_query('Список произведений')
+def titles_list():
+    return Title.objects.order_by('name').annotate(
+        rating=rating_expression()
+    ).select_related('category')[:PAGE_SIZE]
+
+
+@hot_query('Фильтр произведений по категории, году и жанру')
+def titles_filtered():
+    return Title.objects.filter(
+        category_id=1, year=2000, genre__in=[1]
+    ).order_by('name')[:PAGE_SIZE]
+
+
+@hot_query('Жанры произведений страницы')
+def titles_genres():
+    return Title.genre.through.objects.filter(
+        title_id__in=range(1, PAGE_SIZE + 1)
+    ).order_by('genre__name').values_list(
+        'title_id', 'genre__name', 'genre__slug'
+    )
+
+
+@hot_query('Рейтинг произведения')
+def title_rating():
+    return Title.objects.annotate(rating=rating_expression()).filter(pk=1)
+
+
+@hot_query('Отзывы к произведению')
+def reviews_list():
+    return Review.objects.filter(title_id=1).select_related(
+        'author'
+    ).order_by('-pub_date')[:PAGE_SIZE]
+
+
+@hot_query('Отзывы пользователя')
+def user_reviews():
+    return Review.objects.filter(
+        author_id=1, pub_date__lt=CURSOR_DATE
+    ).order_by('-pub_date')[:PAGE_SIZE + 1]
+
+
+@hot_query('Комментарии к отзыву')
+def comments_list():
+    return Comment.objects.filter(review_id=1).select_related(
+        'author'
+    ).order_by('-pub_date')[:PAGE_SIZE]
+
+
+@hot_query('Комментарии пользователя')
+def user_comments():
+    return Comment.objects.filter(
+        author_id=1, pub_date__lt=CURSOR_DATE
+    ).order_by('-pub_date')[:PAGE_SIZE + 1]
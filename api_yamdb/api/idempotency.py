@@ -0,0 +1,126 @@
+"""
+Поддержка заголовка Idempotency-Key для POST-запросов.
+
+Ответ на запрос с ключом сохраняется в кеше на IDEMPOTENCY_KEY_TTL
+секунд. Повтор с тем же ключом и тем же телом получает сохранённый
+ответ вместе с его заголовками REPLAYED_HEADERS, а сериализатор и
+побочные эффекты (письма, счётчики, события) не выполняются повторно.
+При нескольких процессах нужен общий кеш.
+
+Ответы с секретами, например выдачу JWT, сохранять нельзя: такие
+обработчики декоратором не оборачиваются.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.throttling import BaseThrottle
+
+from reviews.constants import IDEMPOTENCY_KEY_MAX_LENGTH
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+# Заголовки ответа, которые сохраняются и возвращаются на повторы.
+REPLAYED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Location')
+RESPONSE_CACHE_KEY = 'idempotency_response:{scope}'
+LOCK_CACHE_KEY = 'idempotency_lock:{scope}'
+# Сколько секунд повтор считает исходный запрос выполняющимся.
+LOCK_TIMEOUT = 60
+
+
+def get_scope(request, key):
+    """
+    Ключ действует в пределах пути и пользователя, а для анонимных
+    запросов — в пределах пути и адреса клиента.
+    """
+    if request.user.is_authenticated:
+        owner = f'user:{request.user.pk}'
+    else:
+        owner = f'ip:{BaseThrottle().get_ident(request)}'
+    raw = f'{owner}:{request.path}:{key}'
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def get_fingerprint(request):
+    return hashlib.sha256(request.body).hexdigest()
+
+
+def error(message, status_code):
+    return Response({'detail': message}, status=status_code)
+
+
+def store_response(response_key, fingerprint, response):
+    headers = {
+        name: response[name]
+        for name in REPLAYED_HEADERS if response.has_header(name)
+    }
+    cache.set(response_key, (
+        fingerprint, response.status_code, response.data, headers
+    ), settings.IDEMPOTENCY_KEY_TTL)
+
+
+def idempotent(handler):
+    """
+    Декоратор обработчика POST-запроса вьюсета: с заголовком
+    Idempotency-Key ответ сохраняется и возвращается на повторы.
+    Ответы с ошибкой сервера не сохраняются.
+
+    Ответ сохраняется сразу, а после отрисовки — ещё раз, с заголовками,
+    которые добавляют finalize_response и рендерер.
+    """
+
+    @wraps(handler)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return handler(self, request, *args, **kwargs)
+        if len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            return error(
+                f'{IDEMPOTENCY_HEADER} не может быть длиннее '
+                f'{IDEMPOTENCY_KEY_MAX_LENGTH} символов.',
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        scope = get_scope(request, key)
+        fingerprint = get_fingerprint(request)
+        response_key = RESPONSE_CACHE_KEY.format(scope=scope)
+        stored = cache.get(response_key)
+        if stored is None:
+            lock_key = LOCK_CACHE_KEY.format(scope=scope)
+            if not cache.add(lock_key, fingerprint, LOCK_TIMEOUT):
+                return error(
+                    'Запрос с этим ключом идемпотентности ещё выполняется.',
+                    status.HTTP_409_CONFLICT
+                )
+            try:
+                response = handler(self, request, *args, **kwargs)
+                if not status.is_server_error(response.status_code):
+                    store_response(response_key, fingerprint, response)
+                    response.add_post_render_callback(
+                        lambda rendered: store_response(
+                            response_key, fingerprint, rendered
+                        )
+                    )
+            finally:
+                cache.delete(lock_key)
+            return response
+
+        stored_fingerprint, status_code, data, headers = stored
+        if stored_fingerprint != fingerprint:
+            return error(
+                'Ключ идемпотентности уже использован с другим запросом.',
+                status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+        headers = dict(headers)
+        content_type = headers.pop('Content-Type', None)
+        response = Response(
+            data, status=status_code,
+            headers=headers, content_type=content_type
+        )
+        response[REPLAYED_HEADER] = 'true'
+        return response
+
+    return wrapper
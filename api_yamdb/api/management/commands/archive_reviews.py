@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.archive import archive_reviews
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит старые отзывы вместе с комментариями '
+        'в архивные таблицы'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.ARCHIVE_REVIEWS_AFTER_DAYS,
+            help='Архивировать отзывы старше этого числа дней (0 — нет)'
+        )
+        parser.add_argument(
+            '--keep', type=int, default=settings.ARCHIVE_KEEP_NEWEST_REVIEWS,
+            help='Оставлять у произведения столько последних отзывов (0 — все)'
+        )
+
+    def handle(self, *args, **options):
+        reviews, comments = archive_reviews(options['days'], options['keep'])
+        self.stdout.write(self.style.SUCCESS(
+            f'В архив перенесено отзывов: {reviews}, '
+            f'комментариев: {comments}.'
+        ))
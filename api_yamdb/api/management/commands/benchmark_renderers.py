@@ -0,0 +1,100 @@
+import io
+import timeit
+from itertools import cycle, islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Avg
+from django.test.utils import override_settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnList
+
+from api.parsers import FastJSONParser, MessagePackParser
+from api.renderers import FastJSONRenderer, MessagePackRenderer
+from api.serializers import ReviewSerializer, TitleListSerializer
+from reviews.models import Review, Title
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает скорость рендеринга и разбора ответов '
+        'titles-list и reviews-list разными форматами'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', type=int, default=100,
+            help='Количество объектов в списке'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=200,
+            help='Количество повторов для каждого замера'
+        )
+
+    def handle(self, *args, **options):
+        payloads = {
+            'titles-list': self.get_payload(
+                TitleListSerializer,
+                Title.objects.annotate(
+                    rating=Avg('reviews__score')
+                ).select_related('category').prefetch_related('genre'),
+                options['size'],
+            ),
+            'reviews-list': self.get_payload(
+                ReviewSerializer,
+                Review.objects.select_related('author'),
+                options['size'],
+            ),
+        }
+        self.stdout.write(
+            f'{"payload":<14}{"format":<10}{"bytes":>10}'
+            f'{"render, мкс":>14}{"parse, мкс":>14}'
+        )
+        for payload_name, payload in payloads.items():
+            for format_name, renderer, parser in self.get_formats():
+                content = renderer.render(payload)
+                render_time = self.measure(
+                    lambda: renderer.render(payload), options['repeat']
+                )
+                parse_time = self.measure(
+                    lambda: parser.parse(io.BytesIO(content)),
+                    options['repeat']
+                )
+                self.stdout.write(
+                    f'{payload_name:<14}{format_name:<10}{len(content):>10}'
+                    f'{render_time:>14.1f}{parse_time:>14.1f}'
+                )
+
+    def get_formats(self):
+        with override_settings(API_JSON_BACKEND='stdlib'):
+            yield 'json', JSONRenderer(), JSONParser()
+        with override_settings(API_JSON_BACKEND='orjson'):
+            yield 'orjson', FastJSONRenderer(), FastJSONParser()
+        yield 'msgpack', MessagePackRenderer(), MessagePackParser()
+
+    @staticmethod
+    def get_payload(serializer_class, queryset, size):
+        """
+        Страница ответа списка из `size` объектов на основе данных БД.
+        Как и в ответе API, список связан с сериализатором: по нему
+        FastJSONRenderer решает, нужна ли проверка float.
+        """
+        serializer = serializer_class(queryset[:size], many=True)
+        results = serializer.data
+        if not results:
+            raise CommandError(
+                'В базе нет данных, сначала выполните import_csv.'
+            )
+        return {
+            'count': size,
+            'next': None,
+            'previous': None,
+            'results': ReturnList(
+                islice(cycle(results), size), serializer=serializer
+            ),
+        }
+
+    @staticmethod
+    def measure(func, repeat):
+        """Среднее время вызова в микросекундах."""
+        return timeit.timeit(func, number=repeat) / repeat * 10 ** 6
@@ -0,0 +1,90 @@
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.db.models import Avg
+
+from api.renderers import FastJSONRenderer
+from api.serializers import (
+    CommentSerializer,
+    CommentValuesSerializer,
+    ReviewSerializer,
+    ReviewValuesSerializer,
+    TitleListSerializer,
+    TitleValuesSerializer,
+)
+from reviews.models import Comment, Review, Title
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает скорость ModelSerializer и облегчённых сериализаторов '
+        'на списках произведений, отзывов и комментариев'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', type=int, default=100,
+            help='Количество объектов в списке'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=50,
+            help='Количество повторов для каждого замера'
+        )
+
+    def handle(self, *args, **options):
+        size, repeat = options['size'], options['repeat']
+        cases = (
+            (
+                'titles-list',
+                TitleListSerializer,
+                TitleValuesSerializer,
+                Title.objects.annotate(
+                    rating=Avg('reviews__score')
+                ).select_related('category').prefetch_related(
+                    'genre'
+                ).order_by('name'),
+            ),
+            (
+                'reviews-list',
+                ReviewSerializer,
+                ReviewValuesSerializer,
+                Review.objects.select_related('author'),
+            ),
+            (
+                'comments-list',
+                CommentSerializer,
+                CommentValuesSerializer,
+                Comment.objects.select_related('author'),
+            ),
+        )
+        renderer = FastJSONRenderer()
+        self.stdout.write(
+            f'{"payload":<15}{"serializer, мс":>16}{"values, мс":>12}'
+            f'{"ускорение":>11}{"совпадает":>11}'
+        )
+        for name, serializer_class, values_class, queryset in cases:
+            queryset = queryset[:size]
+            values_serializer = values_class()
+
+            def serialize():
+                return serializer_class(queryset.all(), many=True).data
+
+            def serialize_values():
+                return values_serializer.to_representation(
+                    values_serializer.get_rows(queryset.all())
+                )
+
+            same = renderer.render(serialize()) == renderer.render(
+                serialize_values()
+            )
+            serializer_time = self.measure(serialize, repeat)
+            values_time = self.measure(serialize_values, repeat)
+            self.stdout.write(
+                f'{name:<15}{serializer_time:>16.2f}{values_time:>12.2f}'
+                f'{serializer_time / values_time:>10.1f}x{str(same):>11}'
+            )
+
+    @staticmethod
+    def measure(func, repeat):
+        """Среднее время вызова в миллисекундах."""
+        return timeit.timeit(func, number=repeat) / repeat * 1000
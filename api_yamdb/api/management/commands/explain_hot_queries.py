@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.hot_queries import HOT_QUERIES
+
+
+def find_problem(detail, ordered_limit=False):
+    """
+    Описание проблемы в строке плана или None.
+
+    SCAN — всегда полный просмотр: условия по индексу SQLite выводит
+    только в строках SEARCH. Исключения — просмотр покрывающего индекса
+    и обход индекса в порядке ORDER BY в запросе без условий с LIMIT
+    (`ordered_limit`): он останавливается после LIMIT строк.
+    """
+    if detail.startswith('USE TEMP B-TREE'):
+        return 'сортировка без индекса'
+    if not detail.startswith('SCAN') or 'COVERING INDEX' in detail:
+        return None
+    if 'USING INDEX' not in detail:
+        return 'полный просмотр таблицы'
+    if ordered_limit:
+        return None
+    return 'полный просмотр индекса'
+
+
+def is_ordered_limit(queryset):
+    query = queryset.query
+    return not query.where and query.high_mark is not None
+
+
+class Command(BaseCommand):
+    help = (
+        'Выводит EXPLAIN QUERY PLAN для частых запросов API и отмечает '
+        'полные просмотры таблиц и сортировки без индекса'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fail', action='store_true',
+            help='Завершаться с ошибкой, если найдены проблемы'
+        )
+
+    def handle(self, *args, **options):
+        problems = 0
+        for name, get_queryset in HOT_QUERIES.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            queryset = get_queryset()
+            ordered_limit = is_ordered_limit(queryset)
+            for line in queryset.explain().splitlines():
+                detail = line.split(maxsplit=3)[-1]
+                problem = find_problem(detail, ordered_limit)
+                if problem is None:
+                    self.stdout.write(f'  {detail}')
+                else:
+                    problems += 1
+                    self.stdout.write(self.style.WARNING(
+                        f'  {detail}  <- {problem}'
+                    ))
+        if problems and options['fail']:
+            raise CommandError(f'Найдено проблем в планах: {problems}.')
+        self.stdout.write(f'Найдено проблем в планах: {problems}.')
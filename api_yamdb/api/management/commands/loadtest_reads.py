@@ -0,0 +1,124 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест чтения: сравнивает пропускную способность '
+        'WSGI- и ASGI-приложений внутри процесса при высокой конкурентности'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='+',
+            help=(
+                'Адреса для GET-запросов, например '
+                '/api/v1/titles/1/reviews/?page=2'
+            )
+        )
+        parser.add_argument(
+            '--requests', type=int, default=1000,
+            help='Общее количество запросов на каждый адрес'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=200,
+            help='Количество одновременных запросов'
+        )
+
+    def handle(self, *args, **options):
+        from api_yamdb.asgi import application as asgi_application
+        from api_yamdb.wsgi import application as wsgi_application
+
+        self.stdout.write(
+            f'{"path":<40}{"server":<8}{"rps":>10}'
+            f'{"p50, мс":>10}{"p95, мс":>10}{"ошибки":>8}'
+        )
+        for path in options['paths']:
+            for name, run in (
+                ('wsgi', self.run_wsgi), ('asgi', self.run_asgi),
+            ):
+                application = (
+                    wsgi_application if name == 'wsgi' else asgi_application
+                )
+                started = time.perf_counter()
+                results = run(application, path, options)
+                elapsed = time.perf_counter() - started
+                self.report(path, name, results, elapsed)
+
+    def report(self, path, name, results, elapsed):
+        latencies = sorted(latency for _, latency in results)
+        errors = sum(status != 200 for status, _ in results)
+        p50 = latencies[len(latencies) // 2] * 1000
+        p95 = latencies[int(len(latencies) * 0.95)] * 1000
+        self.stdout.write(
+            f'{path:<40}{name:<8}{len(results) / elapsed:>10.0f}'
+            f'{p50:>10.1f}{p95:>10.1f}{errors:>8}'
+        )
+
+    @staticmethod
+    def run_wsgi(application, path, options):
+        """Запросы из пула потоков, как у многопоточного WSGI-сервера."""
+        factory = RequestFactory()
+
+        def request(_):
+            environ = factory.get(path).environ
+            statuses = []
+            started = time.perf_counter()
+            body = application(
+                environ, lambda status, headers: statuses.append(status)
+            )
+            b''.join(body)
+            body.close()
+            return (
+                int(statuses[0].split()[0]), time.perf_counter() - started
+            )
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            return list(pool.map(request, range(options['requests'])))
+
+    @staticmethod
+    def run_asgi(application, path, options):
+        """Запросы корутинами в одном цикле событий."""
+        url = urlsplit(path)
+        scope = {
+            'type': 'http',
+            'method': 'GET',
+            'path': url.path,
+            'query_string': url.query.encode(),
+            'headers': [(b'host', b'testserver')],
+            'scheme': 'http',
+            'server': ('testserver', 80),
+        }
+
+        async def request(semaphore):
+            async with semaphore:
+                statuses = []
+                disconnected = asyncio.Event()
+
+                async def receive():
+                    if not statuses:
+                        return {'type': 'http.request'}
+                    await disconnected.wait()
+                    return {'type': 'http.disconnect'}
+
+                async def send(message):
+                    if message['type'] == 'http.response.start':
+                        statuses.append(message['status'])
+
+                started = time.perf_counter()
+                await application(dict(scope), receive, send)
+                disconnected.set()
+                return statuses[0], time.perf_counter() - started
+
+        async def run():
+            semaphore = asyncio.Semaphore(options['concurrency'])
+            return await asyncio.gather(*(
+                request(semaphore) for _ in range(options['requests'])
+            ))
+
+        return asyncio.run(run())
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from reviews.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет счётчики отзывов, комментариев и произведений '
+        'с реальным количеством строк и исправляет расхождения'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать расхождения, не исправляя их'
+        )
+
+    def handle(self, *args, **options):
+        drift = reconcile_counters(dry_run=options['dry_run'])
+        for counter, pk, stored, actual in drift:
+            target = counter if pk is None else f'{counter} id={pk}'
+            self.stdout.write(f'{target}: {stored} -> {actual}')
+        message = f'Расхождений: {len(drift)}.'
+        if drift and options['dry_run']:
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
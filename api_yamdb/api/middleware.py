@@ -0,0 +1,124 @@
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+from django.utils.text import compress_sequence, compress_string
+from rest_framework.permissions import SAFE_METHODS
+
+from api_yamdb.db_router import (
+    can_read_from_replica, remember_write, replica_reads
+)
+from .authentication import get_token_user_id
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+re_accepts_gzip = _lazy_re_compile(r'\bgzip\b')
+re_accepts_brotli = _lazy_re_compile(r'\bbr\b')
+
+UNCOMPRESSED_CONTENT_TYPES = ('text/event-stream',)
+
+
+def brotli_sequence(sequence):
+    compressor = brotli.Compressor(quality=settings.BROTLI_QUALITY)
+    for item in sequence:
+        data = compressor.process(item)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Сжимает ответы API в brotli (если установлен) или gzip.
+
+    Ответы короче COMPRESSION_MIN_SIZE байт отдаются как есть,
+    потоковые ответы сжимаются по мере отдачи.
+    """
+
+    def process_response(self, request, response):
+        if not response.streaming and (
+            len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+        if response.has_header('Content-Encoding') or response.get(
+            'Content-Type', ''
+        ).startswith(UNCOMPRESSED_CONTENT_TYPES):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = self.get_encoding(request)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = self.compress_sequence(
+                response.streaming_content, encoding
+            )
+            del response.headers['Content-Length']
+        else:
+            compressed_content = self.compress_string(
+                response.content, encoding
+            )
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response.headers['Content-Length'] = str(len(response.content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    @staticmethod
+    def get_encoding(request):
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if brotli is not None and re_accepts_brotli.search(accept_encoding):
+            return 'br'
+        if re_accepts_gzip.search(accept_encoding):
+            return 'gzip'
+        return None
+
+    @staticmethod
+    def compress_string(content, encoding):
+        if encoding == 'br':
+            return brotli.compress(content, quality=settings.BROTLI_QUALITY)
+        return compress_string(content)
+
+    @staticmethod
+    def compress_sequence(sequence, encoding):
+        if encoding == 'br':
+            return brotli_sequence(sequence)
+        return compress_sequence(sequence)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Разрешает безопасным запросам читать с реплик базы данных.
+
+    После успешного изменяющего запроса пользователь на время
+    READ_YOUR_WRITES_SECONDS закрепляется за основной базой.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method in SAFE_METHODS:
+            with replica_reads(
+                can_read_from_replica(get_token_user_id(request))
+            ):
+                return self.get_response(request)
+
+        response = self.get_response(request)
+        user = getattr(request, 'user', None)
+        if (
+            response.status_code < 400
+            and user is not None
+            and user.is_authenticated
+        ):
+            remember_write(user.pk)
+        return response
@@ -1,11 +1,60 @@
-from rest_framework import filters, mixins, serializers, viewsets
-from rest_framework.pagination import PageNumberPagination
+from django.db import router, transaction
+from django.db.models import BooleanField, F, Value
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from rest_framework import mixins, serializers, status, viewsets
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
 
-from reviews.models import Title
+from reviews.bulk_delete import bulk_delete
+from reviews.models import Title, VersionConflict
+from .filters import CasefoldSearchFilter
 from .permissions import (
     IsAdminOrReadOnly,
 )
 
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+EXPAND_PARAM = 'expand'
+INCLUDE_ARCHIVED_PARAM = 'include_archived'
+IF_MATCH_HEADER = 'If-Match'
+
+
+def get_field_names_param(request, param):
+    """
+    Возвращает множество имён полей из параметра запроса
+    или None, если параметр не передан.
+    Параметры учитываются только для безопасных запросов.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    value = request.query_params.get(param)
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def is_field_requested(request, name):
+    """Проверяет, попадёт ли поле верхнего уровня в ответ."""
+    fields = get_field_names_param(request, FIELDS_PARAM)
+    omit = get_field_names_param(request, OMIT_PARAM) or set()
+    return (fields is None or name in fields) and name not in omit
+
+
+def is_field_expanded(request, name):
+    return name in (get_field_names_param(request, EXPAND_PARAM) or set())
+
+
+def is_archive_requested(request):
+    """Нужно ли безопасному запросу читать и архивные таблицы."""
+    return (
+        request is not None
+        and request.method in SAFE_METHODS
+        and request.query_params.get(INCLUDE_ARCHIVED_PARAM, '').lower()
+        in ('1', 'true')
+    )
+
 
 class CategoryGenreViewsetMixin(
     mixins.CreateModelMixin,
@@ -15,14 +64,251 @@ class CategoryGenreViewsetMixin(
 ):
     lookup_field = 'slug'
     permission_classes = [IsAdminOrReadOnly]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['name']
-    pagination_class = PageNumberPagination
+    filter_backends = [CasefoldSearchFilter]
+    search_fields = ['name_casefold']
+
+
+def get_etag(instance):
+    """ETag объекта — версия его строки; None, если версии нет."""
+    version = getattr(instance, 'version', None)
+    return None if version is None else f'"{version}"'
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'Объект изменён другим запросом, загрузите его заново.'
+    default_code = 'precondition_failed'
+
+
+class OptimisticLockMixin:
+    """
+    Миксин вьюсетов с оптимистичной блокировкой. Ответ с объектом
+    содержит ETag с версией строки. PATCH и DELETE с заголовком
+    If-Match выполняются одним условным UPDATE по этой версии;
+    если объект успели изменить, возвращается 412.
+    Без If-Match запросы работают как раньше.
+    """
+
+    etag_object = None
+
+    def get_object(self):
+        self.etag_object = super().get_object()
+        return self.etag_object
+
+    def get_expected_version(self, instance):
+        if_match = self.request.headers.get(IF_MATCH_HEADER)
+        if if_match is None:
+            return None
+        # Сжатие ответа ослабляет ETag до W/"N", а версия от этого не
+        # меняется, поэтому слабый ETag в If-Match тоже принимается.
+        tags = {
+            tag[2:] if tag.startswith('W/') else tag
+            for tag in (tag.strip() for tag in if_match.split(','))
+        }
+        if '*' in tags:
+            return None
+        if get_etag(instance) not in tags:
+            raise PreconditionFailed
+        return instance.version
+
+    def save_versioned(self, serializer):
+        """Сохраняет объект сериализатора с проверкой If-Match."""
+        instance = serializer.instance
+        instance.expected_version = self.get_expected_version(instance)
+        try:
+            serializer.save()
+        except VersionConflict:
+            raise PreconditionFailed
+        self.etag_object = instance
+
+    def perform_update(self, serializer):
+        self.save_versioned(serializer)
+
+    def perform_destroy(self, instance):
+        version = self.get_expected_version(instance)
+        # Удаление занимает строку условным UPDATE версии: правки
+        # с устаревшим ETag после этого тоже получат 412.
+        if version is not None and not type(instance).objects.filter(
+            pk=instance.pk, version=version
+        ).update(version=F('version') + 1):
+            raise PreconditionFailed
+        super().perform_destroy(instance)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        etag = get_etag(self.etag_object)
+        if etag is not None and response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        return response
+
+
+class EarlyThrottleMixin:
+    """
+    Проверяет лимиты запросов до аутентификации, чтобы отклонённый
+    запрос не обращался к БД. Классы из `throttle_classes` не должны
+    обращаться к `request.user`.
+    """
+
+    throttles_checked = False
+
+    def initial(self, request, *args, **kwargs):
+        self.check_throttles(request)
+        self.throttles_checked = True
+        super().initial(request, *args, **kwargs)
+
+    def check_throttles(self, request):
+        if not self.throttles_checked:
+            super().check_throttles(request)
+
+
+class FastDestroyMixin:
+    """
+    Удаляет объект с зависимыми строками без сборщика каскада Django.
+
+    Всё удаление идёт в одной транзакции: при ошибке на любой пачке
+    объект остаётся целиком. Вместо post_delete отправляется сигнал
+    `bulk_deleted`.
+    """
+
+    def perform_destroy(self, instance):
+        model = type(instance)
+        with transaction.atomic(using=router.db_for_write(model)):
+            bulk_delete(model, [instance.pk])
+
+
+class ValuesListMixin:
+    """
+    Миксин вьюсетов, который отдаёт список через облегчённый
+    сериализатор `values_serializer_class`, если в запросе
+    не переданы параметры fields, omit и expand.
+    """
+
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if any(
+            param in request.query_params
+            for param in (FIELDS_PARAM, OMIT_PARAM, EXPAND_PARAM)
+        ):
+            return super().list(request, *args, **kwargs)
+
+        serializer = self.values_serializer_class()
+        rows = serializer.get_rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(
+                serializer.to_representation(page)
+            )
+        return Response(serializer.to_representation(rows))
+
+
+class IncludeArchivedMixin:
+    """
+    Миксин вьюсетов отзывов и комментариев: с параметром
+    include_archived=1 список и объект читаются из оперативной и
+    архивной таблиц. Без параметра запросы идут только к оперативной.
+
+    Страница выбирается по объединению (id, pub_date) обеих таблиц,
+    а сами строки загружаются по id из той таблицы, где они лежат.
+
+    Вьюсет определяет get_archived_queryset — архивный аналог
+    get_queryset.
+    """
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            if not is_archive_requested(self.request):
+                raise
+        return get_object_or_404(
+            self.get_archived_queryset(), pk=self.kwargs.get('pk')
+        )
+
+    def get_archive_keys(self):
+        querysets = (
+            (self.get_queryset(), False),
+            (self.get_archived_queryset(), True),
+        )
+        hot, archived = (
+            self.filter_queryset(queryset).order_by().annotate(
+                archived=Value(flag, output_field=BooleanField())
+            ).values_list('id', 'pub_date', 'archived')
+            for queryset, flag in querysets
+        )
+        return hot.union(archived, all=True).order_by('-pub_date', '-id')
+
+    def list(self, request, *args, **kwargs):
+        if not is_archive_requested(request):
+            return super().list(request, *args, **kwargs)
+        keys = self.get_archive_keys()
+        page = self.paginate_queryset(keys)
+        data = self.get_archive_data(keys if page is None else page)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def get_archive_data(self, keys):
+        use_values = self.values_serializer_class is not None and not any(
+            param in self.request.query_params
+            for param in (FIELDS_PARAM, OMIT_PARAM, EXPAND_PARAM)
+        )
+        values_serializer = use_values and self.values_serializer_class()
+        items = {}
+        for queryset, flag in (
+            (self.get_queryset(), False),
+            (self.get_archived_queryset(), True),
+        ):
+            ids = [pk for pk, _, archived in keys if archived == flag]
+            if not ids:
+                continue
+            queryset = queryset.filter(pk__in=ids)
+            if use_values:
+                items.update(
+                    ((flag, row[0]), row)
+                    for row in values_serializer.get_rows(queryset)
+                )
+            else:
+                items.update(((flag, obj.pk), obj) for obj in queryset)
+        ordered = [
+            items[key] for key in (
+                (archived, pk) for pk, _, archived in keys
+            ) if key in items
+        ]
+        if use_values:
+            return values_serializer.to_representation(ordered)
+        return self.get_serializer(ordered, many=True).data
+
+
+class SparseFieldsetsMixin:
+    """
+    Миксин сериализаторов, который учитывает параметры запроса:
+    fields — оставить только перечисленные поля,
+    omit — убрать перечисленные поля,
+    expand — развернуть связи из `expandable_fields`.
+    """
+
+    expandable_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        for name, serializer_class in self.expandable_fields.items():
+            if is_field_expanded(request, name):
+                self.fields[name] = serializer_class(read_only=True)
+        for name in list(self.fields):
+            if not is_field_requested(request, name):
+                self.fields.pop(name)
 
 
-class TitleSerializerMixin(serializers.ModelSerializer):
+class TitleSerializerMixin(SparseFieldsetsMixin, serializers.ModelSerializer):
     """Миксин сериализаторов произведения."""
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = (
+            'name_casefold', 'archived_review_count', 'archived_score_sum',
+            'version',
+        )
@@ -0,0 +1,193 @@
+"""
+Кодирование в MessagePack без внешних зависимостей.
+
+Используется, если не установлен пакет msgpack. Поддерживаются типы,
+которые встречаются в ответах API: None, bool, int, float, str, bytes,
+списки и словари. Остальные объекты передаются в функцию `default`.
+"""
+import struct
+
+# Глубина вложенности при разборе ограничена, чтобы тело запроса
+# вроде b'\x91' * 5000 не исчерпало стек интерпретатора.
+MAX_DEPTH = 100
+
+
+class MessagePackError(ValueError):
+    pass
+
+
+def packb(obj, default=None):
+    chunks = []
+    _pack(obj, chunks.append, default)
+    return b''.join(chunks)
+
+
+def _pack_length(length, write, fix_prefix, fix_limit, prefixes):
+    if fix_limit and length < fix_limit:
+        write(bytes((fix_prefix | length,)))
+    elif prefixes[0] is not None and length <= 0xff:
+        write(bytes((prefixes[0], length)))
+    elif length <= 0xffff:
+        write(struct.pack('>BH', prefixes[1], length))
+    elif length <= 0xffffffff:
+        write(struct.pack('>BI', prefixes[2], length))
+    else:
+        raise MessagePackError('Слишком длинный объект.')
+
+
+def _pack(obj, write, default):
+    if obj is None or obj is True or obj is False:
+        write(_CONSTANTS[obj])
+    elif isinstance(obj, int):
+        _pack_int(obj, write)
+    elif isinstance(obj, float):
+        write(struct.pack('>Bd', 0xcb, obj))
+    elif isinstance(obj, str):
+        data = obj.encode('utf-8')
+        _pack_length(len(data), write, 0xa0, 32, (0xd9, 0xda, 0xdb))
+        write(data)
+    elif isinstance(obj, (bytes, bytearray, memoryview)):
+        data = bytes(obj)
+        _pack_length(len(data), write, 0, 0, (0xc4, 0xc5, 0xc6))
+        write(data)
+    elif isinstance(obj, (list, tuple, dict)):
+        _pack_container(obj, write, default)
+    elif default is not None:
+        _pack(default(obj), write, None)
+    else:
+        raise TypeError(f'Тип {type(obj).__name__} не поддерживается.')
+
+
+def _pack_container(obj, write, default):
+    if isinstance(obj, dict):
+        _pack_length(len(obj), write, 0x80, 16, (None, 0xde, 0xdf))
+        for key, value in obj.items():
+            _pack(key, write, default)
+            _pack(value, write, default)
+    else:
+        _pack_length(len(obj), write, 0x90, 16, (None, 0xdc, 0xdd))
+        for item in obj:
+            _pack(item, write, default)
+
+
+_CONSTANTS = {None: b'\xc0', False: b'\xc2', True: b'\xc3'}
+_UINT_FORMATS = (
+    (0xff, '>BB', 0xcc),
+    (0xffff, '>BH', 0xcd),
+    (0xffffffff, '>BI', 0xce),
+    (0xffffffffffffffff, '>BQ', 0xcf),
+)
+_INT_FORMATS = (
+    (-0x80, '>Bb', 0xd0),
+    (-0x8000, '>Bh', 0xd1),
+    (-0x80000000, '>Bi', 0xd2),
+    (-0x8000000000000000, '>Bq', 0xd3),
+)
+
+
+def _pack_int(obj, write):
+    if -0x20 <= obj < 0x80:
+        write(struct.pack('>b', obj))
+        return
+    for limit, fmt, prefix in _UINT_FORMATS if obj >= 0 else _INT_FORMATS:
+        if abs(obj) <= abs(limit):
+            write(struct.pack(fmt, prefix, obj))
+            return
+    raise MessagePackError('Целое число вне диапазона MessagePack.')
+
+
+_PREFIX_CONSTANTS = {0xc0: None, 0xc2: False, 0xc3: True}
+_FIXED_FORMATS = {
+    0xca: '>f', 0xcb: '>d',
+    0xcc: '>B', 0xcd: '>H', 0xce: '>I', 0xcf: '>Q',
+    0xd0: '>b', 0xd1: '>h', 0xd2: '>i', 0xd3: '>q',
+}
+_LENGTH_FORMATS = {
+    0xc4: '>B', 0xc5: '>H', 0xc6: '>I',
+    0xd9: '>B', 0xda: '>H', 0xdb: '>I',
+    0xdc: '>H', 0xdd: '>I',
+    0xde: '>H', 0xdf: '>I',
+}
+
+
+def unpackb(data):
+    data = memoryview(data)
+    obj, offset = _unpack(data, 0, 0)
+    if offset != len(data):
+        raise MessagePackError('Лишние данные после объекта.')
+    return obj
+
+
+def _read(data, offset, size):
+    end = offset + size
+    if end > len(data):
+        raise MessagePackError('Неожиданный конец данных.')
+    return data[offset:end], end
+
+
+def _unpack(data, offset, depth):
+    prefix, offset = _read(data, offset, 1)
+    prefix = prefix[0]
+    if prefix <= 0x7f:
+        return prefix, offset
+    if prefix >= 0xe0:
+        return prefix - 0x100, offset
+    if prefix <= 0xbf:
+        return _unpack_fix(data, offset, prefix, depth)
+    if prefix in _PREFIX_CONSTANTS:
+        return _PREFIX_CONSTANTS[prefix], offset
+    if prefix in _FIXED_FORMATS:
+        fmt = _FIXED_FORMATS[prefix]
+        raw, offset = _read(data, offset, struct.calcsize(fmt))
+        return struct.unpack(fmt, raw)[0], offset
+    if prefix in _LENGTH_FORMATS:
+        return _unpack_sized(data, offset, prefix, depth)
+    raise MessagePackError(f'Неподдерживаемый тип 0x{prefix:02x}.')
+
+
+def _unpack_fix(data, offset, prefix, depth):
+    if prefix <= 0x8f:
+        return _unpack_map(data, offset, prefix & 0x0f, depth)
+    if prefix <= 0x9f:
+        return _unpack_array(data, offset, prefix & 0x0f, depth)
+    raw, offset = _read(data, offset, prefix & 0x1f)
+    return str(raw, 'utf-8'), offset
+
+
+def _unpack_sized(data, offset, prefix, depth):
+    fmt = _LENGTH_FORMATS[prefix]
+    raw, offset = _read(data, offset, struct.calcsize(fmt))
+    length = struct.unpack(fmt, raw)[0]
+    if prefix in (0xdc, 0xdd):
+        return _unpack_array(data, offset, length, depth)
+    if prefix in (0xde, 0xdf):
+        return _unpack_map(data, offset, length, depth)
+    raw, offset = _read(data, offset, length)
+    if prefix in (0xc4, 0xc5, 0xc6):
+        return bytes(raw), offset
+    return str(raw, 'utf-8'), offset
+
+
+def _check_depth(depth):
+    if depth >= MAX_DEPTH:
+        raise MessagePackError('Слишком глубокая вложенность.')
+    return depth + 1
+
+
+def _unpack_array(data, offset, length, depth):
+    depth = _check_depth(depth)
+    result = []
+    for _ in range(length):
+        item, offset = _unpack(data, offset, depth)
+        result.append(item)
+    return result, offset
+
+
+def _unpack_map(data, offset, length, depth):
+    depth = _check_depth(depth)
+    result = {}
+    for _ in range(length):
+        key, offset = _unpack(data, offset, depth)
+        value, offset = _unpack(data, offset, depth)
+        result[key] = value
+    return result, offset
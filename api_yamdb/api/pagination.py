@@ -0,0 +1,120 @@
+from django.core.paginator import EmptyPage, InvalidPage, Page
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+from reviews.constants import EXACT_COUNT_LIMIT
+
+COUNT_DISABLED_VALUES = ('0', 'false')
+
+
+class CountedPageNumberPagination(PageNumberPagination):
+    """
+    Постраничный вывод без лишних COUNT(*).
+
+    Общее количество берётся из счётчиков, если метод представления
+    `get_exact_count` его вернул (обычно для запроса без фильтров).
+    Иначе строки считаются не дальше EXACT_COUNT_LIMIT; если их больше,
+    в ответе `count` равен EXACT_COUNT_LIMIT, а `count_exact` — false.
+    С параметром `count=false` количество не считается вовсе: в ответе
+    `count` равен null, а следующая страница определяется по лишней
+    строке.
+    """
+
+    count_query_param = 'count'
+    count_enabled = True
+    count_exact = True
+
+    def is_count_enabled(self, request):
+        return request.query_params.get(
+            self.count_query_param, ''
+        ).lower() not in COUNT_DISABLED_VALUES
+
+    def get_count(self, queryset, request, view=None):
+        self.count_exact = True
+        if hasattr(view, 'get_exact_count'):
+            count = view.get_exact_count()
+            if count is not None:
+                return count
+        count = queryset.order_by()[:EXACT_COUNT_LIMIT + 1].count()
+        if count > EXACT_COUNT_LIMIT:
+            self.count_exact = False
+            return EXACT_COUNT_LIMIT
+        return count
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.request = request
+        self.count_enabled = self.is_count_enabled(request)
+        paginator = self.django_paginator_class(queryset, page_size)
+        if not self.count_enabled:
+            return self.paginate_without_count(queryset, paginator)
+
+        paginator.count = self.get_count(queryset, request, view)
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except EmptyPage as exc:
+            if self.count_exact:
+                self.raise_not_found(page_number, str(exc))
+            # Ограниченный подсчёт мог не дойти до запрошенной страницы.
+            paginator.count = queryset.count()
+            self.count_exact = True
+            self.page = self.get_page(paginator, page_number)
+        except InvalidPage as exc:
+            self.raise_not_found(page_number, str(exc))
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return list(self.page)
+
+    def paginate_without_count(self, queryset, paginator):
+        page_number = self.request.query_params.get(self.page_query_param, 1)
+        try:
+            page_number = int(page_number)
+        except ValueError:
+            self.raise_not_found(page_number, 'Неверный номер страницы.')
+        if page_number < 1:
+            self.raise_not_found(page_number, 'Неверный номер страницы.')
+
+        offset = (page_number - 1) * paginator.per_page
+        rows = list(queryset[offset:offset + paginator.per_page + 1])
+        if not rows and page_number > 1:
+            self.raise_not_found(page_number, 'Страница пуста.')
+        # Количество известно только до конца следующей страницы.
+        paginator.count = offset + len(rows)
+        self.page = Page(rows[:paginator.per_page], page_number, paginator)
+        return list(self.page)
+
+    def get_page(self, paginator, page_number):
+        try:
+            return paginator.page(page_number)
+        except InvalidPage as exc:
+            self.raise_not_found(page_number, str(exc))
+
+    def raise_not_found(self, page_number, message):
+        raise NotFound(self.invalid_page_message.format(
+            page_number=page_number, message=message
+        ))
+
+    def get_paginated_response(self, data):
+        count = self.page.paginator.count if self.count_enabled else None
+        return Response({
+            'count': count,
+            'count_exact': self.count_enabled and self.count_exact,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+class PubDateCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация от новых к старым: следующая страница читается
+    по индексу (автор, pub_date) без OFFSET и подсчёта строк.
+    """
+
+    ordering = '-pub_date'
@@ -0,0 +1,175 @@
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    from . import msgpack_codec as msgpack
+
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+# В этом диапазоне orjson и стандартный json записывают float
+# одинаково. За его пределами json использует экспоненту в формате
+# repr() (1e+16, 1.5e-07), а orjson — свой (1e16, 1.5e-7, 0.00001).
+PLAIN_FLOAT_RANGE = (1e-4, 1e16)
+# Поля, которые могут вернуть float (Decimal кодируется во float), или
+# значения произвольного вида.
+FLOAT_FIELDS = (
+    serializers.FloatField,
+    serializers.DecimalField,
+    serializers.JSONField,
+    serializers.ModelField,
+    serializers.ReadOnlyField,
+    serializers.SerializerMethodField,
+)
+
+_float_serializers = {}
+
+
+def use_orjson():
+    return orjson is not None and settings.API_JSON_BACKEND == 'orjson'
+
+
+def has_special_float(data):
+    """
+    Есть ли в данных float, который orjson запишет не так, как
+    стандартный json: NaN, бесконечность или число с экспонентой.
+    """
+    low, high = PLAIN_FLOAT_RANGE
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, float):
+            if item and not low <= abs(item) < high:
+                return True
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return False
+
+
+def field_has_floats(field):
+    """Может ли поле сериализатора вернуть float."""
+    if isinstance(field, serializers.ListSerializer):
+        return field_has_floats(field.child)
+    if isinstance(field, serializers.Serializer):
+        return any(
+            field_has_floats(child) for child in field.fields.values()
+        ) or any(
+            serializer_class_has_floats(serializer_class)
+            for serializer_class in getattr(
+                field, 'expandable_fields', {}
+            ).values()
+        )
+    if isinstance(field, serializers.ManyRelatedField):
+        return field_has_floats(field.child_relation)
+    if isinstance(field, (serializers.ListField, serializers.DictField)):
+        return field_has_floats(field.child)
+    return isinstance(field, FLOAT_FIELDS)
+
+
+def serializer_class_has_floats(serializer_class):
+    """Может ли сериализатор вернуть float; запоминается для класса."""
+    if serializer_class not in _float_serializers:
+        _float_serializers[serializer_class] = field_has_floats(
+            serializer_class()
+        )
+    return _float_serializers[serializer_class]
+
+
+def may_have_floats(data, view):
+    """
+    Могут ли в данных ответа быть float. Решение принимается по
+    сериализатору данных или представления; без сериализатора
+    ответ считается способным содержать float.
+    """
+    serializer = getattr(data, 'serializer', None)
+    if serializer is None and isinstance(data, dict):
+        serializer = getattr(data.get('results'), 'serializer', None)
+    if serializer is not None:
+        return serializer_class_has_floats(type(
+            getattr(serializer, 'child', serializer)
+        ))
+    get_serializer_class = getattr(view, 'get_serializer_class', None)
+    if get_serializer_class is None:
+        return True
+    try:
+        serializer_class = get_serializer_class()
+    except AssertionError:
+        return True
+    return serializer_class_has_floats(serializer_class)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON-рендерер на orjson с откатом на стандартный JSONRenderer.
+
+    Даты, Decimal и ленивые строки перевода кодируются так же,
+    как в JSONEncoder из DRF. Ответы с отступами и данные, которые
+    orjson записал бы иначе, отдаются стандартным рендерером. Данные
+    проверяются на такие float, только если их сериализатор может
+    вернуть float.
+    """
+
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if not use_orjson() or indent is not None or not self.compact:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+
+        view = (renderer_context or {}).get('view')
+        if may_have_floats(data, view) and has_special_float(data):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder.default,
+                option=(
+                    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+                ),
+            )
+        except orjson.JSONEncodeError:
+            # Например, целые больше 64 бит.
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        # Как и DRF, экранируем U+2028 и U+2029 для совместимости с JS.
+        return ret.replace(LINE_SEPARATOR, b'\\u2028').replace(
+            PARAGRAPH_SEPARATOR, b'\\u2029'
+        )
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Рендерер в MessagePack, выбирается заголовком
+    `Accept: application/msgpack`.
+
+    Без установленного пакета msgpack используется кодировщик
+    на чистом Python.
+    """
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=self.encoder.default)
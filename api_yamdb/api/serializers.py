@@ -3,11 +3,14 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.mail import send_mail
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, router, transaction
 from django.shortcuts import get_object_or_404
 
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
 from reviews.constants import (
+    BULK_DELETE_MAX_IDS,
     CONFIRMATION_CODE_LENGTH,
     EMAIL_LENGTH,
     MAX_SCORE_VALUE,
@@ -15,12 +18,39 @@ from reviews.constants import (
     OWNER_USERNAME_URL,
     USERNAME_LENGTH,
 )
-from reviews.models import Category, Comment, Genre, Review
+from reviews.models import (
+    ArchivedReview, Category, Comment, Genre, Review, Title
+)
 from reviews.validators import username_validator
-from .mixins import TitleSerializerMixin
+from .mixins import SparseFieldsetsMixin, TitleSerializerMixin
+from .slug_cache import category_slugs, genre_slugs
 
 User = get_user_model()
 
+DUPLICATE_REVIEW_MESSAGE = 'Вы уже оставляли отзыв на это произведение.'
+
+
+def is_constraint_violation(error, model, name):
+    """
+    Вызвана ли ошибка `error` ограничением уникальности `name` модели.
+
+    PostgreSQL называет ограничение в тексте ошибки, а SQLite
+    перечисляет его столбцы.
+    """
+    constraint = next(
+        constraint for constraint in model._meta.constraints
+        if constraint.name == name
+    )
+    columns = ', '.join(
+        f'{model._meta.db_table}.{model._meta.get_field(field).column}'
+        for field in constraint.fields
+    )
+    message = str(error)
+    return (
+        f'"{name}"' in message
+        or f'UNIQUE constraint failed: {columns}' in message
+    )
+
 
 class SignUpSerializer(serializers.Serializer):
     email = serializers.EmailField(required=True, max_length=EMAIL_LENGTH)
@@ -101,7 +131,7 @@ class TokenSerializer(serializers.Serializer):
         return data
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """Сериализатор для пользователей с ролями."""
 
     class Meta:
@@ -111,20 +141,20 @@ class UserSerializer(serializers.ModelSerializer):
         )
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """Сериализатор для жанров."""
 
     class Meta:
         model = Genre
-        exclude = ('id',)
+        exclude = ('id', 'name_casefold')
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """Сериализатор для категорий."""
 
     class Meta:
         model = Category
-        exclude = ('id',)
+        exclude = ('id', 'name_casefold')
 
 
 class TitleListSerializer(TitleSerializerMixin):
@@ -135,25 +165,102 @@ class TitleListSerializer(TitleSerializerMixin):
     rating = serializers.IntegerField()
 
 
+class CachedSlugRelatedField(serializers.SlugRelatedField):
+    """
+    Связь по slug, которая переводит slug в id и обратно по SlugCache,
+    не обращаясь к таблице связанной модели.
+    """
+
+    def __init__(self, slug_cache, **kwargs):
+        self.slug_cache = slug_cache
+        kwargs.setdefault('queryset', slug_cache.model.objects.all())
+        super().__init__(slug_field='slug', **kwargs)
+
+    def use_pk_only_optimization(self):
+        return True
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        pk = self.slug_cache.get_id(data)
+        if pk is None:
+            self.fail('does_not_exist', slug_name='slug', value=data)
+        model = self.slug_cache.model
+        return model.from_db(
+            router.db_for_write(model), ['id', 'slug'], [pk, data]
+        )
+
+    def to_representation(self, value):
+        return self.slug_cache.get_slug(value.pk)
+
+    def get_missing_slugs(self, objs):
+        """
+        Slug объектов `objs`, которых уже нет в таблице. Кеш процесса
+        может не знать об удалении в другом процессе, поэтому перед
+        записью id сверяются с таблицей одним запросом.
+        """
+        existing = set(self.slug_cache.model.objects.filter(
+            pk__in=[obj.pk for obj in objs]
+        ).values_list('pk', flat=True))
+        missing = [obj.slug for obj in objs if obj.pk not in existing]
+        if missing:
+            self.slug_cache.invalidate()
+        return missing
+
+
 class TitleCreateSerializer(TitleSerializerMixin):
     """Сериализатор для создания/изменения/удаления произведения."""
 
-    genre = serializers.SlugRelatedField(
-        slug_field='slug',
-        queryset=Genre.objects.all(),
+    genre = CachedSlugRelatedField(
+        genre_slugs,
         many=True,
         allow_empty=False,
     )
-    category = serializers.SlugRelatedField(
-        slug_field='slug',
-        queryset=Category.objects.all(),
+    category = CachedSlugRelatedField(
+        category_slugs,
         allow_null=False,
     )
 
+    def validate(self, data):
+        """Проверяет, что жанры и категория не удалены после загрузки кеша."""
+        errors = {}
+        for name in ('genre', 'category'):
+            if name not in data:
+                continue
+            field = self.fields[name]
+            relation = getattr(field, 'child_relation', field)
+            objs = data[name] if relation is not field else [data[name]]
+            missing = relation.get_missing_slugs(objs)
+            if missing:
+                errors[name] = [
+                    relation.error_messages['does_not_exist'].format(
+                        slug_name='slug', value=slug
+                    )
+                    for slug in missing
+                ]
+        if errors:
+            raise serializers.ValidationError(errors)
+        return data
+
+    @transaction.atomic
+    def save(self, **kwargs):
+        # Произведение и его жанры сохраняются вместе или не сохраняются.
+        return super().save(**kwargs)
+
+
+class AuthorSerializer(serializers.ModelSerializer):
+    """Сериализатор для развёрнутого автора отзыва или комментария."""
 
-class ReviewSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ('username', 'first_name', 'last_name', 'bio')
+
+
+class ReviewSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """Сериализатор для отзывов."""
 
+    expandable_fields = {'author': AuthorSerializer}
+
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username'
     )
@@ -167,27 +274,47 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     def validate(self, data):
         """
-        Проверяет, что пользователь оставляет
-        только один отзыв на произведение.
+        Проверяет, что у пользователя нет архивного отзыва на
+        произведение. Повтор среди оперативных отзывов отсекает
+        ограничение unique_review при вставке.
         """
         request = self.context.get('request')
         if request and request.method == 'POST':
-            user = request.user
-            title_id = self.context['view'].kwargs.get('title_id')
-            if Review.objects.filter(author=user, title_id=title_id).exists():
-                raise ValidationError(
-                    "Вы уже оставляли отзыв на это произведение."
-                )
+            title = self.context['view'].get_title()
+            if title.archived_review_count and ArchivedReview.objects.filter(
+                author_id=request.user.pk, title=title
+            ).exists():
+                raise ValidationError(DUPLICATE_REVIEW_MESSAGE)
         return data
 
+    def create(self, validated_data):
+        """
+        Вставляет отзыв без предварительной проверки: повторный отзыв
+        отклоняется ограничением unique_review, поэтому создание — один
+        запрос и между проверкой и вставкой нет гонки.
+        """
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError as error:
+            if not is_constraint_violation(error, Review, 'unique_review'):
+                raise
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [DUPLICATE_REVIEW_MESSAGE]
+            })
+
     class Meta:
         model = Review
-        fields = ('id', 'author', 'text', 'score', 'pub_date')
+        fields = (
+            'id', 'author', 'text', 'score', 'pub_date', 'comment_count'
+        )
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """Сериализатор для комментариев."""
 
+    expandable_fields = {'author': AuthorSerializer}
+
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username'
     )
@@ -195,3 +322,152 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ('id', 'author', 'text', 'pub_date')
+
+
+class UserReviewSerializer(ReviewSerializer):
+    """Отзыв в списке отзывов текущего пользователя."""
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ('title',)
+        read_only_fields = ('title',)
+
+
+class UserCommentSerializer(CommentSerializer):
+    """Комментарий в списке комментариев текущего пользователя."""
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ('review',)
+        read_only_fields = ('review',)
+
+
+class BulkReviewSerializer(serializers.ModelSerializer):
+    """Элемент пакетной загрузки отзывов."""
+
+    title = serializers.IntegerField(source='title_id')
+    author = serializers.CharField(
+        required=False, max_length=USERNAME_LENGTH
+    )
+
+    class Meta:
+        model = Review
+        fields = ('title', 'author', 'text', 'score')
+
+
+class BulkCommentSerializer(serializers.ModelSerializer):
+    """Элемент пакетной загрузки комментариев."""
+
+    review = serializers.IntegerField(source='review_id')
+    author = serializers.CharField(
+        required=False, max_length=USERNAME_LENGTH
+    )
+
+    class Meta:
+        model = Comment
+        fields = ('review', 'author', 'text')
+
+
+class BulkDeleteSerializer(serializers.Serializer):
+    """Запрос на быстрое удаление объектов по списку id."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=BULK_DELETE_MAX_IDS,
+    )
+    background = serializers.BooleanField(default=False)
+
+
+class ValuesSerializer:
+    """
+    Облегчённый сериализатор списков только для чтения.
+
+    Строит ответ прямо из строк `values_list()`, минуя поля DRF.
+    Результат совпадает с ответом соответствующего ModelSerializer.
+    """
+
+    columns = ()
+    pub_date_field = serializers.DateTimeField()
+
+    def get_rows(self, queryset):
+        return queryset.prefetch_related(None).values_list(
+            *(lookup for _, lookup in self.columns)
+        )
+
+    def to_representation(self, rows):
+        keys = [key for key, _ in self.columns]
+        to_datetime = self.pub_date_field.to_representation
+        data = []
+        for row in rows:
+            item = dict(zip(keys, row))
+            item['pub_date'] = to_datetime(item['pub_date'])
+            data.append(item)
+        return data
+
+
+class ReviewValuesSerializer(ValuesSerializer):
+    """Облегчённый аналог ReviewSerializer для списка отзывов."""
+
+    columns = (
+        ('id', 'id'),
+        ('author', 'author__username'),
+        ('text', 'text'),
+        ('score', 'score'),
+        ('pub_date', 'pub_date'),
+        ('comment_count', 'comment_count'),
+    )
+
+
+class CommentValuesSerializer(ValuesSerializer):
+    """Облегчённый аналог CommentSerializer для списка комментариев."""
+
+    columns = (
+        ('id', 'id'),
+        ('author', 'author__username'),
+        ('text', 'text'),
+        ('pub_date', 'pub_date'),
+    )
+
+
+class TitleValuesSerializer(ValuesSerializer):
+    """Облегчённый аналог TitleListSerializer для списка произведений."""
+
+    columns = (
+        ('id', 'id'),
+        ('name', 'name'),
+        ('year', 'year'),
+        ('description', 'description'),
+        ('category_name', 'category__name'),
+        ('category_slug', 'category__slug'),
+        ('rating', 'rating'),
+        ('review_count', 'review_count'),
+    )
+
+    def to_representation(self, rows):
+        genres = {}
+        for title_id, name, slug in Title.genre.through.objects.filter(
+            title_id__in=[row[0] for row in rows]
+        ).order_by('genre__name').values_list(
+            'title_id', 'genre__name', 'genre__slug'
+        ):
+            genres.setdefault(title_id, []).append(
+                {'name': name, 'slug': slug}
+            )
+        return [
+            {
+                'id': title_id,
+                'genre': genres.get(title_id, []),
+                'category': (
+                    None if category_slug is None
+                    else {'name': category_name, 'slug': category_slug}
+                ),
+                'rating': None if rating is None else int(rating),
+                'name': name,
+                'year': year,
+                'description': description,
+                'review_count': review_count,
+            }
+            for (
+                title_id, name, year, description,
+                category_name, category_slug, rating, review_count,
+            ) in rows
+        ]
@@ -0,0 +1,104 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api_yamdb.db_router import LoadTracker
+from reviews.bulk_delete import bulk_deleted
+from reviews.counters import change_counters
+from reviews.models import Category, Comment, Genre, Review, Title
+from .authentication import get_token_version_cache_key
+from .events import broker
+from .renderers import FastJSONRenderer
+from .serializers import CommentSerializer, ReviewSerializer
+from .slug_cache import category_slugs, genre_slugs
+
+User = get_user_model()
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Настраивает новое соединение с SQLite прагмами из настроек."""
+    if connection.vendor == 'sqlite':
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            connection.connection.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created)
+def track_replica_load(sender, connection, **kwargs):
+    """Считает выполняемые запросы к репликам для выбора least_loaded."""
+    tracker = LoadTracker(connection.alias)
+    if (
+        connection.alias in settings.DATABASE_REPLICAS
+        and tracker not in connection.execute_wrappers
+    ):
+        connection.execute_wrappers.append(tracker)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def reset_token_version_cache(sender, instance, **kwargs):
+    """Сбрасывает закешированную версию токенов пользователя."""
+    cache.delete(get_token_version_cache_key(instance.pk))
+
+
+@receiver(bulk_deleted, sender=User)
+def reset_bulk_deleted_token_versions(sender, ids, **kwargs):
+    """Сбрасывает версии токенов пользователей из быстрого удаления."""
+    cache.delete_many([get_token_version_cache_key(pk) for pk in ids])
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_slug_cache(sender, **kwargs):
+    """
+    Сбрасывает кеш slug таблицы сразу и ещё раз после фиксации
+    транзакции, чтобы процесс не закешировал незафиксированное состояние.
+    """
+    slug_cache = genre_slugs if sender is Genre else category_slugs
+    slug_cache.invalidate()
+    transaction.on_commit(slug_cache.invalidate)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Comment)
+def increment_counters(sender, instance, created, raw=False, **kwargs):
+    """Учитывает новый объект в счётчиках."""
+    if created and not raw:
+        change_counters(sender, [instance], 1)
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+def decrement_counters(sender, instance, **kwargs):
+    """Учитывает удалённый объект в счётчиках."""
+    change_counters(sender, [instance], -1)
+
+
+@receiver(post_save, sender=Review)
+def publish_review_event(sender, instance, created, **kwargs):
+    """Отправляет подписчикам произведения событие о новом отзыве."""
+    if created and broker.is_listened(instance.title_id):
+        data = FastJSONRenderer().render(ReviewSerializer(instance).data)
+        transaction.on_commit(
+            lambda: broker.publish(instance.title_id, 'review', data)
+        )
+
+
+@receiver(post_save, sender=Comment)
+def publish_comment_event(sender, instance, created, **kwargs):
+    """Отправляет подписчикам произведения событие о новом комментарии."""
+    if created and broker.is_listened(instance.review.title_id):
+        data = FastJSONRenderer().render(
+            {**CommentSerializer(instance).data, 'review': instance.review_id}
+        )
+        transaction.on_commit(
+            lambda: broker.publish(instance.review.title_id, 'comment', data)
+        )
@@ -0,0 +1,98 @@
+"""
+Кеш соответствия slug и id жанров и категорий в памяти процесса.
+
+Таблицы маленькие и почти не меняются, поэтому сериализаторы и фильтры
+произведений проверяют slug без запросов к ним.
+
+Версии таблиц хранятся в кеше Django по умолчанию. Чтобы изменение в
+одном процессе сбрасывало кеш slug в остальных, кеш должен быть общим
+для процессов. Иначе процесс видит изменения не позже чем через
+SLUG_CACHE_MAX_AGE секунд. При записи произведения id всё равно
+сверяются с таблицами.
+"""
+import threading
+import time
+
+from django.core.cache import cache
+
+from reviews.models import Category, Genre
+
+SLUG_CACHE_VERSION_KEY = 'slug_cache_version:{table}'
+# Даже без сигнала об изменении таблица перечитывается не реже, чем
+# раз в столько секунд: на случай правок в обход ORM.
+SLUG_CACHE_MAX_AGE = 300
+
+
+class SlugCache:
+    """
+    Отображение slug <-> id таблицы в памяти процесса.
+
+    Версия таблицы хранится в общем кеше Django, её увеличивают сигналы
+    post_save и post_delete. Процесс перечитывает таблицу, когда видит
+    новую версию.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.version_key = SLUG_CACHE_VERSION_KEY.format(
+            table=model._meta.label_lower
+        )
+        self._lock = threading.Lock()
+        self._version = None
+        self._loaded_at = 0
+        self._ids = {}
+        self._slugs = {}
+        self._choices = ()
+
+    def __deepcopy__(self, memo):
+        # Поля сериализаторов копируются вместе с аргументами, а кеш
+        # должен оставаться общим.
+        return self
+
+    def get_version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, 0, None)
+            version = cache.get(self.version_key, 0)
+        return version
+
+    def invalidate(self):
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, 1, None)
+
+    def load(self):
+        version = self.get_version()
+        if (
+            version == self._version
+            and time.monotonic() - self._loaded_at < SLUG_CACHE_MAX_AGE
+        ):
+            return
+        with self._lock:
+            ids = dict(
+                self.model.objects.order_by().values_list('slug', 'pk')
+            )
+            self._ids = ids
+            self._slugs = {pk: slug for slug, pk in ids.items()}
+            self._choices = tuple((slug, slug) for slug in sorted(ids))
+            self._version = version
+            self._loaded_at = time.monotonic()
+
+    def get_id(self, slug):
+        """id по slug или None, если такого slug нет."""
+        self.load()
+        return self._ids.get(slug)
+
+    def get_slug(self, pk):
+        self.load()
+        return self._slugs.get(pk)
+
+    def get_choices(self):
+        """Варианты (slug, slug) для полей и фильтров с выбором."""
+        self.load()
+        return self._choices
+
+
+genre_slugs = SlugCache(Genre)
+category_slugs = SlugCache(Category)
@@ -0,0 +1,196 @@
+import sqlite3
+import threading
+
+from django.conf import settings
+from rest_framework import throttling
+
+from .authentication import get_token_user_id
+
+WRITE_METHODS = ('POST', 'PATCH')
+
+
+def refill(bucket, capacity, refill_rate, now):
+    """Количество токенов в корзине после пополнения за прошедшее время."""
+    if bucket is None:
+        return capacity
+    tokens, updated = bucket
+    return min(capacity, tokens + (now - updated) * refill_rate)
+
+
+def take_tokens(buckets, capacity, refill_rate, now):
+    """
+    Пополняет корзины и забирает по токену из каждой, только если токен
+    есть во всех: отклонённый запрос не расходует ни одну из них.
+
+    Возвращает признак успеха и новые количества токенов.
+    """
+    tokens = [refill(bucket, capacity, refill_rate, now) for bucket in buckets]
+    allowed = all(value >= 1 for value in tokens)
+    if allowed:
+        tokens = [value - 1 for value in tokens]
+    return allowed, tokens
+
+
+class MemoryBucketStore:
+    """Хранилище корзин в памяти процесса."""
+
+    max_keys = 10000
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, keys, capacity, refill_rate, now):
+        """
+        Забирает токен из корзины каждого ключа из `keys` или ни из одной.
+        Возвращает признак успеха и наименьший остаток токенов.
+        """
+        with self._lock:
+            allowed, tokens = take_tokens(
+                [self._buckets.get(key) for key in keys],
+                capacity, refill_rate, now
+            )
+            if len(self._buckets) + len(keys) > self.max_keys:
+                self._prune()
+            for key, value in zip(keys, tokens):
+                self._buckets[key] = (value, now)
+        return allowed, min(tokens)
+
+    def _prune(self):
+        """Удаляет половину корзин, которые дольше всех не обновлялись."""
+        oldest = sorted(self._buckets, key=lambda key: self._buckets[key][1])
+        for key in oldest[:len(oldest) // 2]:
+            del self._buckets[key]
+
+
+class SQLiteBucketStore:
+    """
+    Хранилище корзин в отдельном файле SQLite.
+
+    Позволяет нескольким процессам-воркерам делить общие лимиты.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+
+    def _get_connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS buckets ('
+                'key TEXT PRIMARY KEY, '
+                'tokens REAL NOT NULL, '
+                'updated REAL NOT NULL'
+                ') WITHOUT ROWID'
+            )
+            self._local.connection = connection
+        return connection
+
+    def consume(self, keys, capacity, refill_rate, now):
+        """
+        Забирает токен из корзины каждого ключа из `keys` или ни из одной
+        в одной транзакции. Возвращает признак успеха и наименьший
+        остаток токенов.
+        """
+        connection = self._get_connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            buckets = [
+                connection.execute(
+                    'SELECT tokens, updated FROM buckets WHERE key = ?',
+                    (key,)
+                ).fetchone()
+                for key in keys
+            ]
+            allowed, tokens = take_tokens(
+                buckets, capacity, refill_rate, now
+            )
+            connection.executemany(
+                'INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)',
+                [(key, value, now) for key, value in zip(keys, tokens)]
+            )
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return allowed, min(tokens)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_bucket_store():
+    """Возвращает хранилище корзин, выбранное в настройках."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if settings.THROTTLE_BUCKET_STORE == 'sqlite':
+                    _store = SQLiteBucketStore(
+                        settings.THROTTLE_BUCKET_SQLITE_PATH
+                    )
+                else:
+                    _store = MemoryBucketStore()
+    return _store
+
+
+class TokenBucketThrottle(throttling.ScopedRateThrottle):
+    """
+    Ограничение частоты запросов по алгоритму token bucket.
+
+    Ёмкость корзины и скорость её пополнения задаются частотой из
+    DEFAULT_THROTTLE_RATES для `throttle_scope` представления.
+    Каждый запрос расходует токен из корзины IP и, если в нём есть
+    JWT, из корзины пользователя; отклонённый запрос не расходует
+    ни одну из них. Пользователь берётся из claims
+    токена без запроса к БД, поэтому проверку можно выполнять до
+    аутентификации (см. EarlyThrottleMixin).
+    """
+
+    cache_format = '%(scope)s:%(ident)s'
+
+    def get_cache_keys(self, request):
+        idents = [f'ip:{self.get_ident(request)}']
+        user_id = get_token_user_id(request)
+        if user_id is not None:
+            idents.append(f'user:{user_id}')
+        return [
+            self.cache_format % {'scope': self.scope, 'ident': ident}
+            for ident in idents
+        ]
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        if self.rate is None:
+            return True
+
+        self.refill_rate = self.num_requests / self.duration
+        now = self.timer()
+        allowed, self.tokens = get_bucket_store().consume(
+            self.get_cache_keys(request), self.num_requests,
+            self.refill_rate, now
+        )
+        return allowed
+
+    def wait(self):
+        return (1 - self.tokens) / self.refill_rate
+
+
+class WriteTokenBucketThrottle(TokenBucketThrottle):
+    """Ограничивает только создание и изменение объектов."""
+
+    def allow_request(self, request, view):
+        if request.method not in WRITE_METHODS:
+            return True
+        return super().allow_request(request, view)
@@ -4,6 +4,8 @@ from rest_framework import routers
 
 from .views import (
     AuthViewSet,
+    BulkCreateViewSet,
+    BulkDeleteViewSet,
     CategoryViewSet,
     CommentViewSet,
     GenreViewSet,
@@ -16,6 +18,10 @@ from .views import (
 router_v1 = routers.DefaultRouter()
 
 router_v1.register('auth', AuthViewSet, basename='auth')
+router_v1.register('bulk', BulkCreateViewSet, basename='bulk')
+router_v1.register(
+    'bulk-delete', BulkDeleteViewSet, basename='bulk-delete'
+)
 router_v1.register('categories', CategoryViewSet, basename='categories')
 router_v1.register('genres', GenreViewSet, basename='genres')
 router_v1.register('titles', TitleViewSet, basename='titles')
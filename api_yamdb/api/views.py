@@ -1,46 +1,86 @@
+from collections import defaultdict
+
 from django.contrib.auth import get_user_model
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, status, viewsets
+from rest_framework import status, viewsets
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 
-from reviews.constants import OWNER_USERNAME_URL
-from reviews.models import Category, Genre, Review, Title
+from reviews.bulk_delete import get_job, start_bulk_delete
+from reviews.constants import (
+    BULK_CREATE_MAX_ITEMS,
+    OWNER_USERNAME_URL,
+    TITLES_BATCH_MAX_IDS,
+)
+from reviews.counters import change_counters, get_table_count
+from reviews.expressions import rating_expression
+from reviews.models import (
+    ArchivedComment,
+    ArchivedReview,
+    Category,
+    Comment,
+    Genre,
+    Review,
+    Title,
+)
 
-from .filters import TitleFilter
-from .mixins import CategoryGenreViewsetMixin
+from .authentication import YamdbRefreshToken
+from .filters import CasefoldSearchFilter, TitleFilter
+from .idempotency import idempotent
+from .mixins import (
+    CategoryGenreViewsetMixin,
+    EarlyThrottleMixin,
+    FastDestroyMixin,
+    IncludeArchivedMixin,
+    OptimisticLockMixin,
+    ValuesListMixin,
+    is_archive_requested,
+    is_field_requested,
+)
+from .pagination import PubDateCursorPagination
 from .permissions import (
     AuthorModeratorAdminOrReadOnly,
     IsAdmin,
     IsAdminOrReadOnly,
 )
 from .serializers import (
+    BulkCommentSerializer,
+    BulkDeleteSerializer,
+    BulkReviewSerializer,
     CategorySerializer,
     CommentSerializer,
+    CommentValuesSerializer,
     GenreSerializer,
     ReviewSerializer,
+    ReviewValuesSerializer,
     TitleCreateSerializer,
     TitleListSerializer,
+    TitleValuesSerializer,
     SignUpSerializer,
     TokenSerializer,
+    UserCommentSerializer,
+    UserReviewSerializer,
     UserSerializer,
 )
+from .throttling import TokenBucketThrottle, WriteTokenBucketThrottle
 
 User = get_user_model()
 
 
-class AuthViewSet(viewsets.ViewSet):
+class AuthViewSet(EarlyThrottleMixin, viewsets.ViewSet):
     """ViewSet для регистрации пользователей."""
 
     permission_classes = [AllowAny]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'auth'
 
     @action(detail=False, methods=['post'])
+    @idempotent
     def signup(self, request):
         serializer = SignUpSerializer(data=request.data)
 
@@ -57,7 +97,7 @@ class AuthViewSet(viewsets.ViewSet):
         if serializer.is_valid():
             username = serializer.validated_data.get('username')
             user = get_object_or_404(User, username=username)
-            refresh = RefreshToken.for_user(user)
+            refresh = YamdbRefreshToken.for_user(user)
             return Response({
                 'refresh': str(refresh),
                 'access': str(refresh.access_token),
@@ -66,15 +106,15 @@ class AuthViewSet(viewsets.ViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UsersViewSet(viewsets.ModelViewSet):
+class UsersViewSet(OptimisticLockMixin, FastDestroyMixin,
+                   viewsets.ModelViewSet):
     """Viewset для пользователей."""
 
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAdmin]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['username']
-    pagination_class = PageNumberPagination
+    filter_backends = [CasefoldSearchFilter]
+    search_fields = ['username_casefold']
     http_method_names = ['get', 'post', 'delete', 'patch']
     lookup_field = 'username'
 
@@ -86,7 +126,11 @@ class UsersViewSet(viewsets.ModelViewSet):
     )
     def personal_info(self, request):
         if request.method == 'GET':
-            serializer = self.get_serializer(request.user)
+            user = request.user
+            if not isinstance(user, User):
+                user = get_object_or_404(User, pk=user.pk)
+            self.etag_object = user
+            serializer = self.get_serializer(user)
             return Response(serializer.data)
 
         if request.method == 'PATCH':
@@ -97,12 +141,44 @@ class UsersViewSet(viewsets.ModelViewSet):
                 request.user, data=data, partial=True
             )
             if serializer.is_valid():
-                serializer.save()
+                self.save_versioned(serializer)
                 return Response(serializer.data)
             return Response(
                 serializer.errors, status=status.HTTP_400_BAD_REQUEST
             )
 
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path=f'{OWNER_USERNAME_URL}/reviews',
+        permission_classes=[IsAuthenticated],
+        pagination_class=PubDateCursorPagination,
+        serializer_class=UserReviewSerializer,
+    )
+    def own_reviews(self, request):
+        """Отзывы текущего пользователя, от новых к старым."""
+        return self.list_own(Review)
+
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path=f'{OWNER_USERNAME_URL}/comments',
+        permission_classes=[IsAuthenticated],
+        pagination_class=PubDateCursorPagination,
+        serializer_class=UserCommentSerializer,
+    )
+    def own_comments(self, request):
+        """Комментарии текущего пользователя, от новых к старым."""
+        return self.list_own(Comment)
+
+    def list_own(self, model):
+        queryset = model.objects.filter(author_id=self.request.user.pk)
+        if is_field_requested(self.request, 'author'):
+            queryset = queryset.select_related('author')
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
 
 class GenreViewSet(CategoryGenreViewsetMixin):
     """ViewSet для жанров."""
@@ -118,57 +194,402 @@ class CategoryViewSet(CategoryGenreViewsetMixin):
     serializer_class = CategorySerializer
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(OptimisticLockMixin, FastDestroyMixin, ValuesListMixin,
+                   viewsets.ModelViewSet):
     """Viewset для произведений."""
 
     http_method_names = ['get', 'post', 'patch', 'delete', 'list', 'retrieve']
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')
-    ).order_by('name')
+    queryset = Title.objects.order_by('name')
     permission_classes = [IsAdminOrReadOnly]
     filter_backends = [DjangoFilterBackend]
     filterset_class = TitleFilter
-    pagination_class = PageNumberPagination
+    values_serializer_class = TitleValuesSerializer
+
+    def get_queryset(self):
+        """Загружает только связи и агрегаты, нужные для ответа."""
+        queryset = super().get_queryset()
+        if is_field_requested(self.request, 'rating'):
+            # Коррелированный подзапрос вместо JOIN с GROUP BY: страница
+            # читается по индексу названия, а оценки — по покрывающему
+            # индексу отзывов.
+            queryset = queryset.annotate(rating=rating_expression())
+        if is_field_requested(self.request, 'category'):
+            queryset = queryset.select_related('category')
+        if is_field_requested(self.request, 'genre'):
+            queryset = queryset.prefetch_related('genre')
+        return queryset
+
+    def get_exact_count(self):
+        """Количество произведений по счётчику, если нет фильтров."""
+        if self.request.query_params.keys() & TitleFilter.base_filters.keys():
+            return None
+        return get_table_count(Title)
 
     def get_serializer_class(self):
-        if self.action in ('list', 'retrieve'):
+        if self.action in ('list', 'retrieve', 'batch'):
             return TitleListSerializer
         return TitleCreateSerializer
 
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    @action(detail=False, methods=['get'])
+    def batch(self, request):
+        """
+        Возвращает произведения по списку id из параметра `ids`
+        в порядке их перечисления.
+        """
+        try:
+            ids = list(dict.fromkeys(
+                int(title_id)
+                for title_id in request.query_params.get('ids', '').split(',')
+                if title_id
+            ))
+        except ValueError:
+            return Response(
+                {'ids': 'Ожидается список целых чисел через запятую.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(ids) > TITLES_BATCH_MAX_IDS:
+            return Response(
+                {'ids': f'Можно запросить не более {TITLES_BATCH_MAX_IDS} '
+                        'произведений.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        titles = self.get_queryset().in_bulk(ids)
+        serializer = self.get_serializer(
+            [titles[title_id] for title_id in ids if title_id in titles],
+            many=True
+        )
+        return Response(serializer.data)
 
-class ReviewViewSet(viewsets.ModelViewSet):
+
+class ReviewViewSet(EarlyThrottleMixin, OptimisticLockMixin,
+                    FastDestroyMixin, IncludeArchivedMixin, ValuesListMixin,
+                    viewsets.ModelViewSet):
     """ViewSet для отзывов."""
 
     http_method_names = ['get', 'list', 'post', 'patch', 'delete', 'retrieve']
     serializer_class = ReviewSerializer
+    values_serializer_class = ReviewValuesSerializer
     permission_classes = [AuthorModeratorAdminOrReadOnly]
+    throttle_classes = [WriteTokenBucketThrottle]
+    throttle_scope = 'reviews'
+
+    _title = None
 
     def get_title(self):
-        """Получение произведения по ID."""
-        return get_object_or_404(Title, id=self.kwargs.get('title_id'))
+        """
+        Произведение из URL. Загружается один раз за запрос и
+        переиспользуется в get_queryset, подсчёте и perform_create.
+        """
+        if self._title is None:
+            self._title = get_object_or_404(
+                Title, id=self.kwargs.get('title_id')
+            )
+        return self._title
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
-
+        queryset = self.get_title().reviews.all()
+        if is_field_requested(self.request, 'author'):
+            queryset = queryset.select_related('author')
+        return queryset
+
+    def get_archived_queryset(self):
+        queryset = ArchivedReview.objects.filter(
+            title_id=self.kwargs.get('title_id')
+        )
+        if is_field_requested(self.request, 'author'):
+            queryset = queryset.select_related('author')
+        return queryset
+
+    def get_exact_count(self):
+        if is_archive_requested(self.request):
+            return None
+        return self.get_title().review_count
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    @transaction.atomic
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, title=self.get_title())
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(EarlyThrottleMixin, IncludeArchivedMixin,
+                     ValuesListMixin, viewsets.ModelViewSet):
     """ViewSet для комментариев."""
 
     http_method_names = ['get', 'post', 'patch', 'delete', 'list', 'retrieve']
     serializer_class = CommentSerializer
+    values_serializer_class = CommentValuesSerializer
     permission_classes = [AuthorModeratorAdminOrReadOnly]
+    throttle_classes = [WriteTokenBucketThrottle]
+    throttle_scope = 'comments'
 
-    def get_title(self):
-        return get_object_or_404(Title, id=self.kwargs.get('title_id'))
+    _review = None
 
     def get_review(self):
-        return get_object_or_404(Review, id=self.kwargs.get('review_id'))
+        """
+        Отзыв из URL, принадлежащий произведению из URL. Цепочка
+        проверяется одним запросом по id отзыва и id произведения, а
+        результат переиспользуется до конца запроса. С include_archived
+        отзыв ищется и в архиве.
+        """
+        if self._review is None:
+            chain = {
+                'pk': self.kwargs.get('review_id'),
+                'title_id': self.kwargs.get('title_id'),
+            }
+            review = Review.objects.filter(**chain).first()
+            if review is None and is_archive_requested(self.request):
+                review = ArchivedReview.objects.filter(**chain).first()
+            if review is None:
+                raise Http404('Отзыв не найден.')
+            self._review = review
+        return self._review
 
     def get_queryset(self):
-        return self.get_review().comments.all()
-
+        review = self.get_review()
+        if isinstance(review, ArchivedReview):
+            # Комментарии архивного отзыва лежат только в архиве.
+            queryset = Comment.objects.none()
+        else:
+            queryset = review.comments.all()
+        if is_field_requested(self.request, 'author'):
+            queryset = queryset.select_related('author')
+        return queryset
+
+    def get_archived_queryset(self):
+        queryset = ArchivedComment.objects.filter(
+            review_id=self.get_review().pk
+        )
+        if is_field_requested(self.request, 'author'):
+            queryset = queryset.select_related('author')
+        return queryset
+
+    def get_exact_count(self):
+        if is_archive_requested(self.request):
+            return None
+        return self.get_review().comment_count
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    @transaction.atomic
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, review=self.get_review())
+
+
+class BulkCreateViewSet(viewsets.ViewSet):
+    """
+    ViewSet для пакетной загрузки отзывов и комментариев партнёрами.
+
+    Пакет проверяется целиком несколькими запросами, корректные элементы
+    сохраняются одним bulk_create, а в ответе для каждого элемента
+    возвращается его статус.
+    """
+
+    permission_classes = [IsAdmin]
+    # Поля, по которым созданные строки находятся после bulk_create,
+    # если база не возвращает их ключи.
+    natural_keys = {
+        Review: ('title_id', 'author_id'),
+        Comment: ('review_id', 'author_id', 'pub_date'),
+    }
+
+    @action(detail=False, methods=['post'])
+    def reviews(self, request):
+        return self.bulk_create(
+            request, Review, BulkReviewSerializer, self.check_reviews
+        )
+
+    @action(detail=False, methods=['post'])
+    def comments(self, request):
+        return self.bulk_create(
+            request, Comment, BulkCommentSerializer, self.check_comments
+        )
+
+    def bulk_create(self, request, model, serializer_class, check_items):
+        if not isinstance(request.data, list) or not request.data:
+            return Response(
+                {'detail': 'Ожидается непустой список объектов.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(request.data) > BULK_CREATE_MAX_ITEMS:
+            return Response(
+                {'detail': (
+                    'Пакет не может содержать больше '
+                    f'{BULK_CREATE_MAX_ITEMS} объектов.'
+                )},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = [None] * len(request.data)
+        items = {}
+        for index, data in enumerate(request.data):
+            serializer = serializer_class(data=data)
+            if serializer.is_valid():
+                items[index] = serializer.validated_data
+            else:
+                results[index] = self.error(serializer.errors)
+
+        self.resolve_authors(request, items, results)
+        check_items(items, results)
+
+        objs = [model(**data) for data in items.values()]
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(objs)
+                change_counters(model, objs, 1)
+                if objs and objs[0].pk is None:
+                    self.set_created_ids(model, objs)
+        except IntegrityError:
+            return Response(
+                {'detail': 'Пакет конфликтует с уже сохранёнными данными.'},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        for index, obj in zip(items, objs):
+            results[index] = {'status': status.HTTP_201_CREATED, 'id': obj.pk}
+        return Response(results, status=status.HTTP_200_OK)
+
+    @staticmethod
+    def error(errors):
+        return {'status': status.HTTP_400_BAD_REQUEST, 'errors': errors}
+
+    def set_created_ids(self, model, objs):
+        """
+        Проставляет id объектам после bulk_create: SQLite их не
+        возвращает. Строки читаются в той же транзакции по естественному
+        ключу. Если строк с одинаковым ключом несколько, новым объектам
+        достаются последние id в порядке вставки.
+        """
+        fields = self.natural_keys[model]
+        rows = model.objects.filter(**{
+            f'{field}__in': {getattr(obj, field) for obj in objs}
+            for field in fields
+        }).order_by('id').values_list('id', *fields)
+        ids = defaultdict(list)
+        for pk, *key in rows:
+            ids[tuple(key)].append(pk)
+        for obj in reversed(objs):
+            obj.pk = ids[tuple(getattr(obj, field) for field in fields)].pop()
+
+    def resolve_authors(self, request, items, results):
+        """Заменяет имена авторов на их id одним запросом."""
+        usernames = {
+            data['author'] for data in items.values() if 'author' in data
+        }
+        author_ids = dict(
+            User.objects.filter(username__in=usernames).values_list(
+                'username', 'id'
+            )
+        )
+        for index, data in list(items.items()):
+            username = data.pop('author', None)
+            if username is None:
+                data['author_id'] = request.user.id
+            elif username in author_ids:
+                data['author_id'] = author_ids[username]
+            else:
+                del items[index]
+                results[index] = self.error(
+                    {'author': ['Пользователь не найден.']}
+                )
+
+    def check_reviews(self, items, results):
+        title_ids = {data['title_id'] for data in items.values()}
+        existing_titles = set(
+            Title.objects.filter(id__in=title_ids).values_list(
+                'id', flat=True
+            )
+        )
+        lookup = {
+            'title_id__in': title_ids,
+            'author_id__in': {data['author_id'] for data in items.values()},
+        }
+        taken = set(
+            Review.objects.filter(**lookup).order_by().values_list(
+                'author_id', 'title_id'
+            ).union(
+                ArchivedReview.objects.filter(**lookup).order_by().values_list(
+                    'author_id', 'title_id'
+                )
+            )
+        )
+        for index, data in list(items.items()):
+            pair = (data['author_id'], data['title_id'])
+            if data['title_id'] not in existing_titles:
+                errors = {'title': ['Произведение не найдено.']}
+            elif pair in taken:
+                errors = {'non_field_errors': [
+                    'Автор уже оставлял отзыв на это произведение.'
+                ]}
+            else:
+                taken.add(pair)
+                continue
+            del items[index]
+            results[index] = self.error(errors)
+
+    def check_comments(self, items, results):
+        existing_reviews = set(
+            Review.objects.filter(
+                id__in={data['review_id'] for data in items.values()}
+            ).values_list('id', flat=True)
+        )
+        for index, data in list(items.items()):
+            if data['review_id'] not in existing_reviews:
+                del items[index]
+                results[index] = self.error(
+                    {'review': ['Отзыв не найден.']}
+                )
+
+
+class BulkDeleteViewSet(viewsets.ViewSet):
+    """
+    ViewSet для быстрого удаления произведений, отзывов и пользователей
+    вместе со всеми зависимыми отзывами и комментариями.
+
+    С `background: true` удаление идёт в фоне, а его ход можно узнать
+    GET-запросом к `bulk-delete/<id задачи>/`.
+    """
+
+    permission_classes = [IsAdmin]
+
+    @action(detail=False, methods=['post'])
+    def titles(self, request):
+        return self.bulk_delete(request, Title)
+
+    @action(detail=False, methods=['post'])
+    def reviews(self, request):
+        return self.bulk_delete(request, Review)
+
+    @action(detail=False, methods=['post'])
+    def users(self, request):
+        return self.bulk_delete(request, User)
+
+    def retrieve(self, request, pk=None):
+        job = get_job(pk)
+        if job is None:
+            return Response(
+                {'detail': 'Задача не найдена.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(job)
+
+    def bulk_delete(self, request, model):
+        serializer = BulkDeleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        background = serializer.validated_data['background']
+        job = start_bulk_delete(
+            model, serializer.validated_data['ids'], background=background
+        )
+        return Response(
+            job,
+            status=status.HTTP_202_ACCEPTED if background
+            else status.HTTP_200_OK
+        )
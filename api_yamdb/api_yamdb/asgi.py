@@ -2,6 +2,9 @@
 ASGI config for YaMDb project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Server-Sent Events streams of title activity (``api.events``) and hot
+read endpoints (``api.async_views``) are served directly on the event
+loop; everything else goes to the regular Django application.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
@@ -13,4 +16,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from api.async_views import async_read_router  # noqa: E402
+from api.events import events_router  # noqa: E402
+
+application = events_router(async_read_router(django_application))
@@ -0,0 +1,110 @@
+"""
+Чтение моделей приложения reviews с реплик базы данных.
+
+Реплики перечислены в DATABASE_REPLICAS. Запросы читают с реплик только
+внутри `replica_reads()`: её включают middleware и асинхронные
+представления для безопасных запросов. Пользователь, который недавно
+что-то изменил, READ_YOUR_WRITES_SECONDS секунд читает с основной базы.
+"""
+import contextvars
+import itertools
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+
+REPLICA_APP_LABELS = ('reviews',)
+LAST_WRITE_CACHE_KEY = 'last_write:{user_id}'
+
+_read_from_replica = contextvars.ContextVar(
+    'read_from_replica', default=False
+)
+_in_flight = Counter()
+_in_flight_lock = threading.Lock()
+
+
+def remember_write(user_id):
+    cache.set(
+        LAST_WRITE_CACHE_KEY.format(user_id=user_id), True,
+        settings.READ_YOUR_WRITES_SECONDS
+    )
+
+
+def can_read_from_replica(user_id):
+    """Есть ли реплики и не менял ли пользователь данные недавно."""
+    if not settings.DATABASE_REPLICAS:
+        return False
+    return user_id is None or cache.get(
+        LAST_WRITE_CACHE_KEY.format(user_id=user_id)
+    ) is None
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    token = _read_from_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+class LoadTracker:
+    """
+    Обёртка выполнения запросов, считающая запросы к базе `alias`,
+    которые выполняются прямо сейчас.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def __eq__(self, other):
+        return isinstance(other, LoadTracker) and other.alias == self.alias
+
+    def __call__(self, execute, sql, params, many, context):
+        with _in_flight_lock:
+            _in_flight[self.alias] += 1
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            with _in_flight_lock:
+                _in_flight[self.alias] -= 1
+
+
+class ReplicaRouter:
+    """
+    Отправляет чтение на реплики по кругу (round_robin) или на реплику
+    с наименьшим числом выполняемых запросов (least_loaded).
+    Запись всегда идёт в основную базу.
+    """
+
+    def __init__(self):
+        self._counter = itertools.count()
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if (
+            not replicas
+            or not _read_from_replica.get()
+            or model._meta.app_label not in REPLICA_APP_LABELS
+        ):
+            return None
+        if settings.REPLICA_SELECTION == 'least_loaded':
+            with _in_flight_lock:
+                return min(replicas, key=_in_flight.__getitem__)
+        return replicas[next(self._counter) % len(replicas)]
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = ('default', *settings.DATABASE_REPLICAS)
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -33,10 +33,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api.middleware.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -69,9 +71,63 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', 60)),
     }
 }
 
+# Прагмы, которые выполняются для каждого нового соединения с SQLite.
+# WAL позволяет читать во время записи, а busy_timeout заставляет
+# конкурирующих писателей ждать блокировку вместо ошибки
+# `database is locked`. Пустое значение SQLITE_PROFILE отключает их.
+SQLITE_PROFILES = {
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,
+        'busy_timeout': 5000,
+        'temp_store': 'MEMORY',
+    },
+}
+SQLITE_PRAGMAS = SQLITE_PROFILES.get(
+    os.getenv('SQLITE_PROFILE', 'production'), {}
+)
+
+# Реплики для чтения: файлы SQLite через запятую в SQLITE_REPLICAS.
+# Копии основной базы обновляет команда sync_replicas. Способ выбора
+# реплики: round_robin или least_loaded.
+DATABASE_REPLICAS = []
+for number, name in enumerate(
+    filter(None, os.getenv('SQLITE_REPLICAS', '').split(','))
+):
+    DATABASE_REPLICAS.append(f'replica_{number}')
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'NAME': BASE_DIR / name.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['api_yamdb.db_router.ReplicaRouter']
+REPLICA_SELECTION = os.getenv('REPLICA_SELECTION', 'round_robin')
+# Сколько секунд после изменения данных пользователь читает
+# с основной базы, чтобы видеть свои изменения.
+READ_YOUR_WRITES_SECONDS = 5
+# Команда archive_reviews переносит в архивные таблицы отзывы старше
+# ARCHIVE_REVIEWS_AFTER_DAYS дней и отзывы сверх ARCHIVE_KEEP_NEWEST_REVIEWS
+# последних у произведения. Значение 0 отключает условие.
+ARCHIVE_REVIEWS_AFTER_DAYS = int(os.getenv('ARCHIVE_REVIEWS_AFTER_DAYS', 365))
+ARCHIVE_KEEP_NEWEST_REVIEWS = int(
+    os.getenv('ARCHIVE_KEEP_NEWEST_REVIEWS', 1000)
+)
+
+# Кеш по умолчанию хранится в памяти процесса. При нескольких процессах
+# нужен общий кеш, например Redis или Memcached: в нём хранятся ход задач
+# быстрого удаления и версии кеша slug жанров и категорий.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
 
 # Password validation
 
@@ -110,19 +166,75 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 
+STATIC_ROOT = BASE_DIR / 'collected_static'
+
+# collectstatic сохраняет рядом с файлами сжатые копии .gz и .br.
+STATICFILES_STORAGE = 'api_yamdb.storage.CompressedStaticFilesStorage'
+
+# Ответы меньше этого размера в байтах не сжимаются.
+COMPRESSION_MIN_SIZE = 1024
+BROTLI_QUALITY = 4
+
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.CountedPageNumberPagination',
     'PAGE_SIZE': 5,
+    # Для чтения без запроса пользователя к БД можно заменить на
+    # 'api.authentication.StatelessJWTAuthentication'.
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'api.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'api.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'auth': '30/min',
+        'reviews': '60/min',
+        'comments': '60/min',
+    },
 }
 
+# Библиотека для JSON в API: 'orjson' (если установлена) или 'stdlib'.
+API_JSON_BACKEND = 'orjson'
+
+# Сколько секунд хранится ответ на POST-запрос с Idempotency-Key.
+IDEMPOTENCY_KEY_TTL = 60 * 60 * 24
+
+# Размер пула потоков для запросов к БД из асинхронных представлений.
+ASYNC_DB_WORKERS = 8
+
+# Поток событий /api/v1/titles/<id>/events/ (только под ASGI):
+# размер буфера подписчика, число событий для возобновления по
+# Last-Event-ID, интервал пингов в секундах и задержка переподключения.
+SSE_BUFFER_SIZE = 100
+SSE_HISTORY_SIZE = 100
+SSE_HEARTBEAT_INTERVAL = 15
+SSE_RETRY_MS = 3000
+# Сколько секунд после ухода последнего подписчика события произведения
+# ещё сохраняются для возобновления по Last-Event-ID.
+SSE_RESUME_WINDOW = 60
+
+# Хранилище корзин для ограничения частоты запросов: 'memory' — в памяти
+# процесса, 'sqlite' — общий файл для нескольких воркеров.
+THROTTLE_BUCKET_STORE = 'memory'
+THROTTLE_BUCKET_SQLITE_PATH = BASE_DIR / 'throttle.sqlite3'
+
 AUTH_USER_MODEL = 'reviews.User'
 
+# Сколько секунд версия токенов пользователя живёт в кеше процесса
+# при использовании StatelessJWTAuthentication.
+TOKEN_VERSION_CACHE_TTL = 30
+
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_USE_TLS = True
 EMAIL_HOST = 'smtp.yandex.ru'
@@ -0,0 +1,53 @@
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import StaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class CompressedStaticFilesStorage(StaticFilesStorage):
+    """
+    Хранилище статики, которое при collectstatic сохраняет рядом
+    с файлами сжатые копии .gz и .br (если установлен brotli).
+
+    Веб-сервер отдаёт их без сжатия на каждый запрос,
+    например с `gzip_static on` в nginx.
+    """
+
+    compressible_extensions = (
+        '.css', '.csv', '.html', '.js', '.json', '.svg', '.txt', '.xml',
+        '.yaml', '.yml',
+    )
+    min_size = 256
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+        for name in paths:
+            if self.should_compress(name):
+                self.compress(name)
+                yield name, name, True
+
+    def should_compress(self, name):
+        return (
+            name.endswith(self.compressible_extensions)
+            and self.size(name) >= self.min_size
+        )
+
+    def compress(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as file:
+            content = file.read()
+        variants = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants['.br'] = brotli.compress(content, quality=11)
+        for extension, compressed in variants.items():
+            if len(compressed) < len(content):
+                with open(path + extension, 'wb') as file:
+                    file.write(compressed)
+            elif os.path.exists(path + extension):
+                os.remove(path + extension)
@@ -1,15 +1,106 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import Group
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import redirect
+from django.urls import path, reverse
+from django.utils.html import format_html
 
+from .bulk_delete import get_job, start_bulk_delete
+from .expressions import count_subquery
 from .models import Category, Comment, Genre, Review, Title
+from .paginator import EstimatedCountPaginator
 
 User = get_user_model()
 
 
+class LargeTableAdminMixin:
+    """Список большой таблицы без точного подсчёта всех строк."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class BulkDeleteAdminMixin:
+    """
+    Быстрое удаление выбранных объектов в фоне. Ход задачи показывается
+    сообщением на странице списка по ссылке `bulk-delete/<id задачи>/`.
+    """
+
+    actions = ('bulk_delete_selected',)
+
+    def get_urls(self):
+        return [
+            path(
+                'bulk-delete/<str:job_id>/',
+                self.admin_site.admin_view(self.bulk_delete_job_view),
+                name=self.get_admin_url_name('bulk_delete_job'),
+            ),
+            *super().get_urls(),
+        ]
+
+    def get_admin_url_name(self, view):
+        opts = self.model._meta
+        return f'{opts.app_label}_{opts.model_name}_{view}'
+
+    def get_job_link(self, job):
+        url = reverse(
+            f'admin:{self.get_admin_url_name("bulk_delete_job")}',
+            args=[job['id']], current_app=self.admin_site.name
+        )
+        return format_html('<a href="{}">Ход удаления</a>', url)
+
+    @admin.action(
+        description='Быстро удалить выбранные в фоне',
+        permissions=('delete',),
+    )
+    def bulk_delete_selected(self, request, queryset):
+        """Удаляет объекты со всеми зависимыми строками пачками SQL."""
+        job = start_bulk_delete(
+            queryset.model, queryset.values_list('pk', flat=True),
+            background=True
+        )
+        self.message_user(request, format_html(
+            'Удаление запущено. {}', self.get_job_link(job)
+        ))
+
+    def bulk_delete_job_view(self, request, job_id):
+        if not self.has_delete_permission(request):
+            raise PermissionDenied
+        job = get_job(job_id)
+        if job is None:
+            self.message_user(
+                request,
+                'Задача удаления не найдена: она завершилась больше суток '
+                'назад или выполняется в другом процессе без общего кеша.',
+                messages.WARNING
+            )
+        elif job['status'] == 'failed':
+            self.message_user(
+                request, f'Удаление прервано ошибкой: {job["error"]}',
+                messages.ERROR
+            )
+        elif job['status'] == 'running':
+            self.message_user(request, format_html(
+                'Удаление идёт: обработано {} из {}. {}',
+                job['processed'], job['requested'], self.get_job_link(job)
+            ))
+        else:
+            deleted = ', '.join(
+                f'{label}: {count}' for label, count in job['deleted'].items()
+            )
+            self.message_user(
+                request, f'Удаление завершено. Удалено строк — {deleted}.',
+                messages.SUCCESS
+            )
+        return redirect(
+            f'admin:{self.get_admin_url_name("changelist")}'
+        )
+
+
 @admin.register(User)
-class UserAdmin(BaseUserAdmin):
+class UserAdmin(BulkDeleteAdminMixin, LargeTableAdminMixin, BaseUserAdmin):
     fieldsets = BaseUserAdmin.fieldsets + (
         (None, {'fields': ('role', 'bio', 'count_reviews', 'count_comments')}),
     )
@@ -23,13 +114,21 @@ class UserAdmin(BaseUserAdmin):
     )
     readonly_fields = ('count_reviews', 'count_comments')
 
-    @admin.display(description='Кол-во отзывов')
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            reviews_count=count_subquery(Review, 'author'),
+            comments_count=count_subquery(Comment, 'author'),
+        )
+
+    @admin.display(description='Кол-во отзывов', ordering='reviews_count')
     def count_reviews(self, obj):
-        return len(obj.reviews.all())
+        return obj.reviews_count
 
-    @admin.display(description='Кол-во комментариев')
+    @admin.display(
+        description='Кол-во комментариев', ordering='comments_count'
+    )
     def count_comments(self, obj):
-        return len(obj.comments.all())
+        return obj.comments_count
 
 
 class CategoryGenreAdminBase(admin.ModelAdmin):
@@ -47,13 +146,29 @@ class GenreAdmin(CategoryGenreAdminBase):
 
 
 @admin.register(Title)
-class TitleAdmin(admin.ModelAdmin):
+class TitleAdmin(BulkDeleteAdminMixin, admin.ModelAdmin):
     list_display = ('id', 'name', 'year', 'category', 'genre_list')
     list_editable = ('year', 'category',)
     list_display_links = ('name',)
     search_fields = ('name', 'year',)
     list_filter = ('category',)
     filter_horizontal = ('genre',)
+    list_select_related = ('category',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('genre')
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        """
+        Варианты категории для list_editable загружаются один раз,
+        а не в каждой строке списка.
+        """
+        formfield = super().formfield_for_foreignkey(
+            db_field, request, **kwargs
+        )
+        if db_field.name == 'category':
+            formfield.choices = list(formfield.choices)
+        return formfield
 
     @admin.display(description='Жанры')
     def genre_list(self, obj):
@@ -61,16 +176,19 @@ class TitleAdmin(admin.ModelAdmin):
 
 
 @admin.register(Review)
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(BulkDeleteAdminMixin, LargeTableAdminMixin,
+                  admin.ModelAdmin):
     list_display = ('id', 'author', 'title', 'pub_date', 'score',)
-    search_fields = ('author', 'title', 'text',)
+    list_select_related = ('author', 'title')
+    search_fields = ('author__username', 'title__name', 'text',)
     list_filter = ('pub_date', 'score',)
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('id', 'pub_date', 'author', 'review', 'text',)
-    search_fields = ('author', 'text',)
+    list_select_related = ('author', 'review__author', 'review__title')
+    search_fields = ('author__username', 'text',)
     list_filter = ('pub_date',)
 
 
@@ -0,0 +1,175 @@
+"""
+Быстрое удаление произведений, отзывов и пользователей вместе со всеми
+зависимыми строками.
+
+Вместо сборщика каскада Django, который загружает каждый зависимый
+объект и отправляет сигналы, строки удаляются в порядке зависимостей
+пачками DELETE ... WHERE id IN (...). Каждая пачка удаляется в своей
+транзакции вместе с изменением счётчиков, поэтому запись не блокируется
+надолго, а прерванное удаление можно запустить повторно. Так удаляют
+задачи администратора и фоновые задачи: при ошибке часть объектов
+остаётся удалённой. Удаление одного объекта через API вызывает
+`bulk_delete` внутри общей транзакции, и пачки становятся её
+точками сохранения.
+
+Сигналы pre_delete и post_delete при этом не отправляются, и их
+обработчики не вызываются. Вместо них после каждой пачки отправляется
+сигнал `bulk_deleted` с моделью и id удалённых объектов: обработчики,
+которые должны срабатывать при удалении, подписываются на него.
+"""
+import threading
+import uuid
+
+from django.core.cache import cache
+from django.db import connections, router, transaction
+from django.db.models import CASCADE, SET_NULL
+from django.dispatch import Signal
+
+from .constants import BULK_DELETE_CHUNK_SIZE, BULK_DELETE_JOB_TTL
+from .counters import change_counters, get_counted_fields
+
+# Отправляется с sender=model и ids — id удалённых объектов пачки.
+bulk_deleted = Signal()
+
+JOB_CACHE_KEY = 'bulk_delete:{job_id}'
+
+
+def get_delete_plan(model, lookup='pk'):
+    """
+    Шаги удаления объектов `model` в порядке зависимостей: сначала
+    строки, которые ссылаются на удаляемые, затем сами объекты.
+    Шаг — (модель, путь к id удаляемых объектов, поле для SET_NULL).
+    """
+    steps = []
+    for relation in model._meta.get_fields(include_hidden=True):
+        if relation.concrete or not relation.auto_created:
+            continue
+        if relation.many_to_many:
+            # Строки промежуточной таблицы — отдельная связь с CASCADE.
+            continue
+        related_lookup = f'{relation.field.name}__{lookup}'
+        if relation.on_delete is CASCADE:
+            steps.extend(
+                get_delete_plan(relation.related_model, related_lookup)
+            )
+        elif relation.on_delete is SET_NULL:
+            steps.append(
+                (relation.related_model, related_lookup, relation.field.name)
+            )
+    steps.append((model, lookup, None))
+    return steps
+
+
+def delete_step(model, lookup, ids, chunk_size):
+    """
+    Удаляет пачками строки `model`, связанные с объектами `ids`, и
+    уменьшает счётчики их родителей. Возвращает число удалённых строк.
+    """
+    queryset = model._base_manager.filter(
+        **{f'{lookup}__in': ids}
+    ).order_by().only(*get_counted_fields(model))
+    using = router.db_for_write(model)
+    deleted = 0
+    while True:
+        with transaction.atomic(using=using):
+            objs = list(queryset[:chunk_size])
+            if not objs:
+                return deleted
+            model._base_manager.filter(
+                pk__in=[obj.pk for obj in objs]
+            )._raw_delete(using)
+            change_counters(model, objs, -1)
+        deleted += len(objs)
+
+
+def bulk_delete(model, ids, chunk_size=BULK_DELETE_CHUNK_SIZE,
+                progress=None):
+    """
+    Удаляет объекты `model` с id из `ids` со всеми зависимыми строками.
+
+    `progress` вызывается после каждой пачки объектов с количеством
+    обработанных id и словарём удалённых строк по моделям.
+    """
+    plan = get_delete_plan(model)
+    deleted = {}
+    ids = list(ids)
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        for step_model, lookup, null_field in plan:
+            if null_field:
+                step_model._base_manager.filter(
+                    **{f'{lookup}__in': chunk}
+                ).update(**{null_field: None})
+                continue
+            label = step_model._meta.label_lower
+            deleted[label] = deleted.get(label, 0) + delete_step(
+                step_model, lookup, chunk, chunk_size
+            )
+        bulk_deleted.send(sender=model, ids=chunk)
+        if progress is not None:
+            progress(start + len(chunk), deleted)
+    return deleted
+
+
+def get_job(job_id):
+    """Состояние задачи удаления или None, если она не найдена."""
+    return cache.get(JOB_CACHE_KEY.format(job_id=job_id))
+
+
+def save_job(job):
+    cache.set(
+        JOB_CACHE_KEY.format(job_id=job['id']), job, BULK_DELETE_JOB_TTL
+    )
+
+
+def run_job(job, model, ids):
+    def progress(processed, deleted):
+        job.update(processed=processed, deleted=dict(deleted))
+        save_job(job)
+
+    try:
+        bulk_delete(model, ids, progress=progress)
+    except Exception as error:
+        job.update(status='failed', error=str(error))
+        save_job(job)
+        raise
+    job['status'] = 'done'
+    save_job(job)
+
+
+def run_job_in_background(job, model, ids):
+    try:
+        run_job(job, model, ids)
+    except Exception:
+        # Ошибка уже сохранена в состоянии задачи.
+        pass
+    finally:
+        connections.close_all()
+
+
+def start_bulk_delete(model, ids, background=False):
+    """
+    Запускает удаление и возвращает состояние задачи. В фоне удаление
+    идёт в отдельном потоке, а ход его виден через `get_job`.
+
+    Состояние хранится в кеше, поэтому при нескольких процессах нужен
+    общий для них кеш.
+    """
+    ids = list(dict.fromkeys(ids))
+    job = {
+        'id': uuid.uuid4().hex,
+        'model': model._meta.label_lower,
+        'status': 'running',
+        'requested': len(ids),
+        'processed': 0,
+        'deleted': {},
+    }
+    save_job(job)
+    if not background:
+        run_job(job, model, ids)
+        return dict(job)
+    started = dict(job)
+    threading.Thread(
+        target=run_job_in_background, args=(job, model, ids), daemon=True
+    ).start()
+    return started
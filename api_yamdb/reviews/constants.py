@@ -1,8 +1,16 @@
+ARCHIVE_CHUNK_SIZE = 100
+BULK_CREATE_MAX_ITEMS = 500
+BULK_DELETE_CHUNK_SIZE = 500
+BULK_DELETE_JOB_TTL = 60 * 60 * 24
+BULK_DELETE_MAX_IDS = 1000
 CONFIRMATION_CODE_LENGTH = 40
 EMAIL_LENGTH = 254
+EXACT_COUNT_LIMIT = 10000
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
 MAX_SCORE_VALUE = 10
 MIN_SCORE_VALUE = 1
 OWNER_USERNAME_URL = 'me'
 SLUG_LENGTH = 50
 TEXT_LENGTH = 256
+TITLES_BATCH_MAX_IDS = 300
 USERNAME_LENGTH = 150
@@ -0,0 +1,119 @@
+"""
+Счётчики для пагинации без COUNT(*): количество произведений,
+отзывов к произведению и комментариев к отзыву, а также итоги
+архивных отзывов для рейтинга.
+"""
+from collections import Counter
+
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from reviews.expressions import count_subquery, sum_subquery
+from reviews.models import (
+    ArchivedComment, ArchivedReview, Comment, Review, TableCounter, Title
+)
+
+# Модель -> (родительская модель, поле ссылки на родителя, поле счётчика).
+# Счётчики обновляются выражениями F() в сигналах post_save и post_delete.
+CHILD_COUNTERS = {
+    Review: (Title, 'title_id', 'review_count'),
+    Comment: (Review, 'review_id', 'comment_count'),
+    ArchivedReview: (Title, 'title_id', 'archived_review_count'),
+    ArchivedComment: (ArchivedReview, 'review_id', 'comment_count'),
+}
+# Модель -> (суммируемое поле, поле суммы у родителя из CHILD_COUNTERS).
+CHILD_SUMS = {
+    ArchivedReview: ('score', 'archived_score_sum'),
+}
+TABLE_COUNTERS = (Title,)
+
+
+def get_counted_fields(model):
+    """Поля объектов `model`, которые нужны для `change_counters`."""
+    fields = ['pk']
+    if model in CHILD_COUNTERS:
+        fields.append(CHILD_COUNTERS[model][1])
+    if model in CHILD_SUMS:
+        fields.append(CHILD_SUMS[model][0])
+    return fields
+
+
+def change_counters(model, objs, delta):
+    """Изменяет счётчики на `delta` для каждого из объектов `objs`."""
+    if model in TABLE_COUNTERS:
+        TableCounter.objects.filter(table=model._meta.label_lower).update(
+            count=Greatest(F('count') + delta * len(objs), 0)
+        )
+    if model in CHILD_COUNTERS:
+        parent_model, field, counter = CHILD_COUNTERS[model]
+        parents = Counter(getattr(obj, field) for obj in objs)
+        sums = Counter()
+        value_field, sum_counter = CHILD_SUMS.get(model, (None, None))
+        if value_field:
+            for obj in objs:
+                sums[getattr(obj, field)] += getattr(obj, value_field)
+        for parent_id, number in parents.items():
+            changes = {counter: Greatest(F(counter) + delta * number, 0)}
+            if value_field:
+                changes[sum_counter] = Greatest(
+                    F(sum_counter) + delta * sums[parent_id], 0
+                )
+            parent_model.objects.filter(pk=parent_id).update(**changes)
+
+
+def get_table_count(model):
+    """
+    Количество строк таблицы. Если счётчика ещё нет, он создаётся
+    по результату COUNT(*).
+    """
+    table = model._meta.label_lower
+    count = TableCounter.objects.filter(table=table).values_list(
+        'count', flat=True
+    ).first()
+    if count is None:
+        count = TableCounter.objects.get_or_create(
+            table=table, defaults={'count': model.objects.count()}
+        )[0].count
+    return count
+
+
+def reconcile_counters(dry_run=False):
+    """
+    Сверяет счётчики с реальным количеством строк и исправляет
+    расхождения. Возвращает список (счётчик, id родителя, было, стало).
+    """
+    drift = []
+    counters = [
+        (parent_model, counter, count_subquery(model, field))
+        for model, (parent_model, field, counter) in CHILD_COUNTERS.items()
+    ]
+    counters.extend(
+        (CHILD_COUNTERS[model][0], sum_counter,
+         sum_subquery(model, CHILD_COUNTERS[model][1], value_field))
+        for model, (value_field, sum_counter) in CHILD_SUMS.items()
+    )
+    for parent_model, counter, actual in counters:
+        rows = parent_model.objects.annotate(actual=actual).exclude(
+            **{counter: F('actual')}
+        ).values_list('pk', counter, 'actual')
+        label = f'{parent_model._meta.label_lower}.{counter}'
+        drift.extend((label, pk, stored, real) for pk, stored, real in rows)
+        if rows and not dry_run:
+            # Количество пересчитывается в том же UPDATE, поэтому
+            # параллельные изменения счётчика не теряются.
+            parent_model.objects.filter(
+                pk__in=[pk for pk, _, _ in rows]
+            ).update(**{counter: actual})
+    for model in TABLE_COUNTERS:
+        table = model._meta.label_lower
+        stored = TableCounter.objects.filter(table=table).values_list(
+            'count', flat=True
+        ).first()
+        real = model.objects.count()
+        if stored != real:
+            drift.append((table, None, stored, real))
+            if not dry_run:
+                TableCounter.objects.update_or_create(
+                    table=table, defaults={'count': real}
+                )
+    return drift
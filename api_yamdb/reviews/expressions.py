@@ -0,0 +1,55 @@
+from django.db.models import (
+    Avg, Case, Count, ExpressionWrapper, F, FloatField, IntegerField,
+    OuterRef, Subquery, Sum, When,
+)
+from django.db.models.functions import Coalesce
+
+from .models import Review
+
+
+def count_subquery(model, field):
+    """Количество объектов `model`, ссылающихся полем `field` на строку."""
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef('pk')}).order_by(
+            ).values(field).annotate(count=Count('pk')).values('count'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def sum_subquery(model, field, value_field):
+    """Сумма поля `value_field` объектов `model`, ссылающихся на строку."""
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef('pk')}).order_by(
+            ).values(field).annotate(total=Sum(value_field)).values('total'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def rating_expression():
+    """
+    Средняя оценка произведения с учётом архивных отзывов.
+
+    Пока у произведения нет архива, рейтинг — один коррелированный
+    подзапрос по покрывающему индексу отзывов. Иначе к сумме и числу
+    оценок оперативных отзывов добавляются итоги архива из полей Title.
+    """
+    return Case(
+        When(archived_review_count=0, then=Subquery(
+            Review.objects.filter(title=OuterRef('pk')).order_by().values(
+                'title'
+            ).annotate(rating=Avg('score')).values('rating')
+        )),
+        default=ExpressionWrapper(
+            (sum_subquery(Review, 'title', 'score') + F('archived_score_sum'))
+            * 1.0
+            / (count_subquery(Review, 'title') + F('archived_review_count')),
+            output_field=FloatField(),
+        ),
+        output_field=FloatField(),
+    )
@@ -0,0 +1,54 @@
+# Generated by Django 3.2 on 2026-10-19 10:55
+
+from django.db import migrations, models
+
+CASEFOLD_FIELDS = (
+    ('category', 'name', 'name_casefold'),
+    ('genre', 'name', 'name_casefold'),
+    ('title', 'name', 'name_casefold'),
+    ('user', 'username', 'username_casefold'),
+)
+
+
+def fill_casefold_fields(apps, schema_editor):
+    for model_name, field, casefold_field in CASEFOLD_FIELDS:
+        model = apps.get_model('reviews', model_name)
+        objects = list(model.objects.only('pk', field))
+        for obj in objects:
+            setattr(obj, casefold_field, getattr(obj, field).casefold())
+        model.objects.bulk_update(objects, [casefold_field], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='name_casefold',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=256, verbose_name='Наименование для поиска'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='name_casefold',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=256, verbose_name='Наименование для поиска'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='name_casefold',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=256, verbose_name='Название для поиска'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='username_casefold',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=150, verbose_name='Имя пользователя для поиска'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_casefold_fields, migrations.RunPython.noop),
+    ]
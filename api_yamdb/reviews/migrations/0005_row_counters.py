@@ -0,0 +1,59 @@
+# Generated by Django 3.2 on 2026-10-19 10:59
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_children(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef('pk')}).order_by(
+            ).values(field).annotate(count=Count('pk')).values('count')
+        ),
+        0,
+    )
+
+
+def fill_counters(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    Comment = apps.get_model('reviews', 'Comment')
+    TableCounter = apps.get_model('reviews', 'TableCounter')
+    Title.objects.update(review_count=count_children(Review, 'title'))
+    Review.objects.update(comment_count=count_children(Comment, 'review'))
+    TableCounter.objects.create(
+        table=Title._meta.label_lower, count=Title.objects.count()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_casefold_search_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableCounter',
+            fields=[
+                ('table', models.CharField(max_length=256, primary_key=True, serialize=False, verbose_name='Таблица')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Количество строк')),
+            ],
+            options={
+                'verbose_name': 'счётчик строк',
+                'verbose_name_plural': 'Счётчики строк',
+            },
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество комментариев'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество отзывов'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 3.2 on 2026-10-19 11:10
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_row_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='archived_review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество архивных отзывов'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='archived_score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок архивных отзывов'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedReview',
+            fields=[
+                ('text', models.TextField(max_length=256, verbose_name='Текст')),
+                ('score', models.PositiveSmallIntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(10)], verbose_name='Оценка')),
+                ('comment_count', models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество комментариев')),
+                ('id', models.IntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата добавления')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_reviews', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_reviews', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'архивный отзыв',
+                'verbose_name_plural': 'Архивные отзывы',
+                'ordering': ('-pub_date',),
+                'abstract': False,
+                'default_related_name': 'archived_reviews',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedComment',
+            fields=[
+                ('text', models.TextField(max_length=256, verbose_name='Текст')),
+                ('id', models.IntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата добавления')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_comments', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('review', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_comments', to='reviews.archivedreview', verbose_name='Отзыв')),
+            ],
+            options={
+                'verbose_name': 'архивный комментарий',
+                'verbose_name_plural': 'Архивные комментарии',
+                'ordering': ('-pub_date',),
+                'abstract': False,
+                'default_related_name': 'archived_comments',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedreview',
+            index=models.Index(fields=['title', '-pub_date'], name='archived_review_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedcomment',
+            index=models.Index(fields=['review', '-pub_date'], name='archived_comment_review_idx'),
+        ),
+    ]
@@ -1,6 +1,9 @@
+from contextlib import nullcontext
+
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models import F
 
 from .constants import (
     CONFIRMATION_CODE_LENGTH,
@@ -9,11 +12,134 @@ from .constants import (
     MIN_SCORE_VALUE,
     SLUG_LENGTH,
     TEXT_LENGTH,
+    USERNAME_LENGTH,
 )
 from .validators import validate_year
 
 
-class User(AbstractUser):
+class CasefoldFieldsMixin(models.Model):
+    """
+    Заполняет при сохранении теневые поля с приведёнными к единому
+    регистру значениями, по которым индексируется поиск.
+    """
+
+    casefold_fields = {}
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        for field, casefold_field in self.casefold_fields.items():
+            setattr(self, casefold_field, getattr(self, field).casefold())
+            if update_fields is not None and field in update_fields:
+                kwargs['update_fields'] = {*update_fields, casefold_field}
+        super().save(*args, **kwargs)
+
+
+class CounterFieldsMixin(models.Model):
+    """
+    Поля-счётчики меняются только выражениями F(), поэтому при обычном
+    сохранении существующего объекта они не попадают в UPDATE. Если
+    строки нет, save() как обычно выполняет INSERT.
+    """
+
+    counter_fields = ()
+
+    class Meta:
+        abstract = True
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields,
+                   forced_update):
+        if update_fields is None:
+            values = [
+                (field, model, value) for field, model, value in values
+                if field.name not in self.counter_fields
+            ]
+        return super()._do_update(
+            base_qs, using, pk_val, values, update_fields, forced_update
+        )
+
+
+class VersionConflict(Exception):
+    """Строку успели изменить после того, как её версия была прочитана."""
+
+
+class VersionedModelMixin(models.Model):
+    """
+    Каждое сохранение существующего объекта увеличивает `version` в
+    самом UPDATE (`version = version + 1`), поэтому сохранение
+    устаревшей копии объекта не уменьшает версию. Если перед
+    сохранением задан `expected_version`, UPDATE выполняется с условием
+    на эту версию, и при несовпадении save() бросает VersionConflict
+    вместо перезаписи чужих изменений.
+
+    Без `expected_version` новая версия после сохранения не читается:
+    поле становится отложенным и загружается из БД при обращении,
+    например для ETag.
+    """
+
+    version = models.PositiveIntegerField(
+        default=1,
+        editable=False,
+        verbose_name='Версия',
+    )
+
+    expected_version = None
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            return super().save(*args, **kwargs)
+        if 'version' in self.get_deferred_fields():
+            # В UPDATE значение заменит version + 1, а при INSERT
+            # отсутствующей строки версия начнётся заново.
+            self.version = self._meta.get_field('version').get_default()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'version'}
+        # Точка сохранения нужна, чтобы VersionConflict не помечал
+        # внешнюю транзакцию к откату.
+        context = nullcontext()
+        if self.expected_version is not None:
+            context = transaction.atomic(
+                using=kwargs.get('using')
+                or router.db_for_write(type(self), instance=self)
+            )
+        try:
+            with context:
+                super().save(*args, **kwargs)
+        finally:
+            self.expected_version = None
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields,
+                   forced_update):
+        # Увеличение версии и условие на неё добавляются в тот же
+        # UPDATE, который строит Model.save(), поэтому сигналы и
+        # остальные миксины работают как при обычном сохранении.
+        values = [
+            (field, model, F('version') + 1 if field.name == 'version'
+             else value)
+            for field, model, value in values
+        ]
+        if self.expected_version is not None:
+            base_qs = base_qs.filter(version=self.expected_version)
+        if not super()._do_update(
+            base_qs, using, pk_val, values, update_fields, forced_update
+        ):
+            if self.expected_version is not None:
+                raise VersionConflict
+            return False
+        if self.expected_version is not None:
+            self.version = self.expected_version + 1
+        else:
+            self.__dict__.pop('version', None)
+        return True
+
+
+class User(VersionedModelMixin, CasefoldFieldsMixin, AbstractUser):
 
     class Role(models.TextChoices):
         USER = 'user', 'Пользователь'
@@ -41,6 +167,47 @@ class User(AbstractUser):
         max_length=CONFIRMATION_CODE_LENGTH,
         verbose_name='Код подтверждения',
     )
+    token_version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Версия токенов',
+    )
+    username_casefold = models.CharField(
+        max_length=USERNAME_LENGTH,
+        editable=False,
+        db_index=True,
+        verbose_name='Имя пользователя для поиска',
+    )
+
+    casefold_fields = {'username': 'username_casefold'}
+    TOKEN_STATE_FIELDS = ('role', 'is_staff', 'is_superuser', 'is_active')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_token_state = instance.get_token_state()
+        return instance
+
+    def get_token_state(self):
+        """Значения полей, которые зашиты в JWT-токен пользователя."""
+        if self.get_deferred_fields() & set(self.TOKEN_STATE_FIELDS):
+            return None
+        return tuple(getattr(self, field) for field in self.TOKEN_STATE_FIELDS)
+
+    def save(self, *args, **kwargs):
+        """
+        Увеличивает версию токенов при смене роли или прав,
+        чтобы ранее выданные токены перестали приниматься.
+        """
+        loaded_state = getattr(self, '_loaded_token_state', None)
+        current_state = self.get_token_state()
+        if loaded_state is not None and loaded_state != current_state:
+            self.token_version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
+        super().save(*args, **kwargs)
+        self._loaded_token_state = current_state
 
     @property
     def is_moderator(self):
@@ -63,16 +230,24 @@ class User(AbstractUser):
         return self.username
 
 
-class CategoryGenreBase(models.Model):
+class CategoryGenreBase(CasefoldFieldsMixin):
     name = models.CharField(
         unique=True,
         max_length=TEXT_LENGTH,
         verbose_name='Наименование',
     )
+    name_casefold = models.CharField(
+        max_length=TEXT_LENGTH,
+        editable=False,
+        db_index=True,
+        verbose_name='Наименование для поиска',
+    )
     slug = models.SlugField(
         unique=True, max_length=SLUG_LENGTH, verbose_name='Слаг'
     )
 
+    casefold_fields = {'name': 'name_casefold'}
+
     class Meta:
         abstract = True
         ordering = ('name',)
@@ -95,11 +270,17 @@ class Genre(CategoryGenreBase):
         verbose_name_plural = 'Жанры'
 
 
-class Title(models.Model):
+class Title(VersionedModelMixin, CounterFieldsMixin, CasefoldFieldsMixin):
     name = models.CharField(
         max_length=TEXT_LENGTH,
         verbose_name='Название'
     )
+    name_casefold = models.CharField(
+        max_length=TEXT_LENGTH,
+        editable=False,
+        db_index=True,
+        verbose_name='Название для поиска',
+    )
     year = models.IntegerField(
         validators=[validate_year],
         verbose_name='Год выпуска',
@@ -122,12 +303,39 @@ class Title(models.Model):
         null=True,
         verbose_name='Категория',
     )
+    review_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество отзывов',
+    )
+    archived_review_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество архивных отзывов',
+    )
+    archived_score_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок архивных отзывов',
+    )
+
+    casefold_fields = {'name': 'name_casefold'}
+    counter_fields = (
+        'review_count', 'archived_review_count', 'archived_score_sum'
+    )
 
     class Meta:
         default_related_name = 'titles'
         verbose_name = 'произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('name',)
+        indexes = [
+            models.Index(fields=('name',), name='title_name_idx'),
+            models.Index(
+                fields=('category', 'year', 'name'),
+                name='title_category_year_name_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'{self.name}, {self.year}'
@@ -154,7 +362,7 @@ class ReviewCommentBase(models.Model):
         ordering = ('-pub_date',)
 
 
-class Review(ReviewCommentBase):
+class ReviewBase(CounterFieldsMixin, ReviewCommentBase):
     title = models.ForeignKey(
         Title,
         on_delete=models.CASCADE,
@@ -167,8 +375,24 @@ class Review(ReviewCommentBase):
             MaxValueValidator(MAX_SCORE_VALUE),
         ]
     )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
+    )
+
+    counter_fields = ('comment_count',)
 
     class Meta(ReviewCommentBase.Meta):
+        abstract = True
+
+    def __str__(self):
+        return f'Отзыв от {self.author.username} на {self.title.name}'
+
+
+class Review(VersionedModelMixin, ReviewBase):
+
+    class Meta(ReviewBase.Meta):
         default_related_name = 'reviews'
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
@@ -177,9 +401,16 @@ class Review(ReviewCommentBase):
                 fields=('title', 'author'), name='unique_review'
             )
         ]
-
-    def __str__(self):
-        return f'Отзыв от {self.author.username} на {self.title.name}'
+        indexes = [
+            models.Index(
+                fields=('title', '-pub_date', 'score'),
+                name='review_title_pub_date_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='review_author_pub_date_idx'
+            ),
+        ]
 
 
 class Comment(ReviewCommentBase):
@@ -193,9 +424,84 @@ class Comment(ReviewCommentBase):
         default_related_name = 'comments'
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=('review', '-pub_date'),
+                name='comment_review_pub_date_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='comment_author_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return (
             f'Комментарий от {self.author.username}'
             f'к отзыву {self.review.id}'
         )
+
+
+class ArchivedReview(ReviewBase):
+    """
+    Старый отзыв, перенесённый из оперативной таблицы командой
+    archive_reviews. Сохраняет id исходного отзыва.
+    """
+
+    id = models.IntegerField(primary_key=True, verbose_name='ID')
+    pub_date = models.DateTimeField('Дата добавления')
+
+    class Meta(ReviewBase.Meta):
+        default_related_name = 'archived_reviews'
+        verbose_name = 'архивный отзыв'
+        verbose_name_plural = 'Архивные отзывы'
+        indexes = [
+            models.Index(
+                fields=('title', '-pub_date'),
+                name='archived_review_title_idx'
+            ),
+        ]
+
+
+class ArchivedComment(ReviewCommentBase):
+    """Комментарий, перенесённый в архив вместе со своим отзывом."""
+
+    id = models.IntegerField(primary_key=True, verbose_name='ID')
+    pub_date = models.DateTimeField('Дата добавления')
+    review = models.ForeignKey(
+        ArchivedReview,
+        on_delete=models.CASCADE,
+        verbose_name='Отзыв',
+    )
+
+    class Meta(ReviewCommentBase.Meta):
+        default_related_name = 'archived_comments'
+        verbose_name = 'архивный комментарий'
+        verbose_name_plural = 'Архивные комментарии'
+        indexes = [
+            models.Index(
+                fields=('review', '-pub_date'),
+                name='archived_comment_review_idx'
+            ),
+        ]
+
+
+class TableCounter(models.Model):
+    """Поддерживаемое количество строк таблицы."""
+
+    table = models.CharField(
+        primary_key=True,
+        max_length=TEXT_LENGTH,
+        verbose_name='Таблица',
+    )
+    count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество строк',
+    )
+
+    class Meta:
+        verbose_name = 'счётчик строк'
+        verbose_name_plural = 'Счётчики строк'
+
+    def __str__(self):
+        return f'{self.table}: {self.count}'
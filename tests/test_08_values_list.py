@@ -0,0 +1,60 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08ValuesListAPI:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def check_same_content(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        separator = '&' if '?' in url else '?'
+        serializer_response = client.get(f'{url}{separator}omit=')
+        assert response.content == serializer_response.content, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` через '
+            'облегчённый сериализатор совпадает с ответом ModelSerializer.'
+        )
+
+    def test_01_values_list_matches_serializers(
+        self, client, admin_client, admin, user_client, user,
+        moderator_client, moderator
+    ):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        create_single_review(user_client, titles[1]['id'], 'text', 8)
+        create_single_review(admin_client, titles[1]['id'], 'text', 3)
+        admin_client.post(
+            self.TITLES_URL,
+            data={'name': 'Без описания', 'year': 2000, 'genre': ['drama'],
+                  'category': 'books'}
+        )
+        admin_client.delete('/api/v1/categories/films/')
+
+        urls = (
+            self.TITLES_URL,
+            f'{self.TITLES_URL}?genre=drama',
+            f'{self.TITLES_URL}?category=books&name=о',
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[1]['id']),
+            self.COMMENTS_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=reviews[0]['id']
+            ),
+        )
+        for url in urls:
+            self.check_same_content(client, url)
@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+from django.db import connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.db.utils import OperationalError
+
+
+@pytest.mark.django_db
+class Test09SQLiteConcurrency:
+
+    WORKERS = 8
+    OPERATIONS = 50
+
+    def get_connection(self, path):
+        return DatabaseWrapper(
+            {**connections['default'].settings_dict, 'NAME': str(path)}
+        )
+
+    def run_worker(self, path, worker, errors):
+        connection = self.get_connection(path)
+        try:
+            with connection.cursor() as cursor:
+                for number in range(self.OPERATIONS):
+                    cursor.execute(
+                        'INSERT INTO review (worker, text) VALUES (%s, %s)',
+                        (worker, f'Отзыв {number}')
+                    )
+                    cursor.execute(
+                        'SELECT COUNT(*) FROM review WHERE worker = %s',
+                        (worker,)
+                    )
+                    if cursor.fetchone()[0] != number + 1:
+                        errors.append('Прочитано неверное количество строк.')
+        except OperationalError as error:
+            errors.append(str(error))
+        finally:
+            connection.close()
+
+    def test_01_pragmas(self, tmp_path):
+        connection = self.get_connection(tmp_path / 'db.sqlite3')
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            journal_mode = cursor.fetchone()[0]
+            cursor.execute('PRAGMA busy_timeout')
+            busy_timeout = cursor.fetchone()[0]
+        connection.close()
+        assert journal_mode == 'wal', (
+            'Проверьте, что для новых соединений с SQLite включается '
+            'режим WAL.'
+        )
+        assert busy_timeout > 0, (
+            'Проверьте, что для новых соединений с SQLite задаётся '
+            'busy_timeout.'
+        )
+
+    def test_02_concurrent_writes_and_reads(self, tmp_path):
+        path = tmp_path / 'db.sqlite3'
+        connection = self.get_connection(path)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE TABLE review ('
+                'id INTEGER PRIMARY KEY, worker INTEGER, text TEXT)'
+            )
+        connection.close()
+
+        errors = []
+        threads = [
+            threading.Thread(
+                target=self.run_worker, args=(path, worker, errors)
+            )
+            for worker in range(self.WORKERS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not errors, (
+            'Проверьте, что при одновременной записи и чтении из '
+            f'{self.WORKERS} потоков SQLite не возвращает ошибок: {errors[:3]}'
+        )
+        connection = self.get_connection(path)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM review')
+            count = cursor.fetchone()[0]
+        connection.close()
+        assert count == self.WORKERS * self.OPERATIONS, (
+            'Проверьте, что при одновременной записи в SQLite '
+            'сохраняются все строки.'
+        )
@@ -0,0 +1,44 @@
+import pytest
+
+from api_yamdb.db_router import (
+    ReplicaRouter, can_read_from_replica, remember_write, replica_reads
+)
+from reviews.models import Title
+
+REPLICAS = ['replica_a', 'replica_b']
+
+
+class Test10ReplicaRouter:
+
+    @pytest.fixture(autouse=True)
+    def replicas(self, settings):
+        settings.DATABASE_REPLICAS = REPLICAS
+        settings.REPLICA_SELECTION = 'round_robin'
+
+    def test_01_reads_outside_replica_context(self):
+        assert ReplicaRouter().db_for_read(Title) is None, (
+            'Проверьте, что вне безопасного запроса чтение идёт '
+            'в основную базу.'
+        )
+
+    def test_02_round_robin(self):
+        router = ReplicaRouter()
+        with replica_reads():
+            aliases = [router.db_for_read(Title) for _ in range(4)]
+        assert aliases == REPLICAS * 2, (
+            'Проверьте, что при REPLICA_SELECTION = round_robin реплики '
+            'выбираются по кругу.'
+        )
+        assert router.db_for_write(Title) == 'default', (
+            'Проверьте, что запись всегда идёт в основную базу.'
+        )
+
+    def test_03_read_your_writes(self):
+        assert can_read_from_replica(None), (
+            'Проверьте, что анонимные запросы читают с реплик.'
+        )
+        remember_write(-1)
+        assert not can_read_from_replica(-1), (
+            'Проверьте, что пользователь после изменения данных '
+            'читает с основной базы.'
+        )
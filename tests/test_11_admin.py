@@ -0,0 +1,66 @@
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.mark.django_db
+class Test11AdminChangelists:
+
+    CHANGELIST_URLS = (
+        '/admin/reviews/user/',
+        '/admin/reviews/title/',
+        '/admin/reviews/review/',
+        '/admin/reviews/comment/',
+        '/admin/reviews/category/',
+        '/admin/reviews/genre/',
+    )
+
+    def create_objects(self, django_user_model, number):
+        category = Category.objects.create(
+            name=f'Категория {number}', slug=f'category-{number}'
+        )
+        genre = Genre.objects.create(
+            name=f'Жанр {number}', slug=f'genre-{number}'
+        )
+        author = django_user_model.objects.create_user(
+            username=f'author{number}', email=f'author{number}@yamdb.fake'
+        )
+        title = Title.objects.create(
+            name=f'Произведение {number}', year=2000, category=category
+        )
+        title.genre.set([genre])
+        review = Review.objects.create(
+            author=author, title=title, text='Отзыв', score=5
+        )
+        Comment.objects.create(author=author, review=review, text='Текст')
+
+    def count_queries(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что страница `{url}` админки открывается.'
+        )
+        return len(context)
+
+    def test_01_changelists_constant_queries(self, django_user_model):
+        superuser = django_user_model.objects.create_superuser(
+            username='superuser', email='superuser@yamdb.fake',
+            password='1234567'
+        )
+        client = Client()
+        client.force_login(superuser)
+        self.create_objects(django_user_model, 0)
+        queries = {
+            url: self.count_queries(client, url)
+            for url in self.CHANGELIST_URLS
+        }
+        for number in range(1, 6):
+            self.create_objects(django_user_model, number)
+        for url in self.CHANGELIST_URLS:
+            assert self.count_queries(client, url) == queries[url], (
+                f'Проверьте, что число запросов на странице `{url}` '
+                'не зависит от количества строк в списке.'
+            )
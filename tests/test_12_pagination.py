@@ -0,0 +1,141 @@
+from http import HTTPStatus
+
+import pytest
+
+from api import pagination
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12CountedPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+    USERS_URL = '/api/v1/users/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    REVIEW_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/{id}/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def get_count(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        return response.json()['count']
+
+    def test_01_counters(
+        self, client, admin_client, admin, user_client, user,
+        moderator_client, moderator
+    ):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        title_id = titles[0]['id']
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        comments_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title_id, review_id=reviews[0]['id']
+        )
+        assert self.get_count(client, self.TITLES_URL) == len(titles), (
+            'Проверьте, что в ответе на GET-запрос к списку произведений '
+            '`count` равен количеству произведений.'
+        )
+        assert self.get_count(client, reviews_url) == len(reviews), (
+            'Проверьте, что в ответе на GET-запрос к списку отзывов '
+            '`count` равен количеству отзывов произведения.'
+        )
+        assert self.get_count(client, comments_url) == len(comments), (
+            'Проверьте, что в ответе на GET-запрос к списку комментариев '
+            '`count` равен количеству комментариев к отзыву.'
+        )
+
+        admin_client.delete(self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, id=reviews[1]['id']
+        ))
+        admin_client.delete(f'{self.TITLES_URL}{titles[1]["id"]}/')
+        assert self.get_count(client, reviews_url) == len(reviews) - 1, (
+            'Проверьте, что после удаления отзыва `count` в списке '
+            'отзывов уменьшается.'
+        )
+        assert self.get_count(client, self.TITLES_URL) == len(titles) - 1, (
+            'Проверьте, что после удаления произведения `count` в списке '
+            'произведений уменьшается.'
+        )
+
+    def test_02_count_disabled(self, client, admin_client, admin, user_client,
+                               user, moderator_client, moderator):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        _, reviews, titles = create_comments(admin_client, author_map)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        response = client.get(f'{url}?count=false')
+        data = response.json()
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}?count=false` возвращает '
+            'ответ со статусом 200.'
+        )
+        assert data['count'] is None and data['next'] is None, (
+            'Проверьте, что с параметром `count=false` в ответе `count` '
+            'равен null, а `next` указывает на следующую страницу, '
+            'только если она есть.'
+        )
+        assert len(data['results']) == len(reviews), (
+            'Проверьте, что с параметром `count=false` возвращаются '
+            'все объекты страницы.'
+        )
+        response = client.get(f'{url}?count=false&page=2')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что с параметром `count=false` запрос '
+            'несуществующей страницы возвращает ответ со статусом 404.'
+        )
+
+    def test_03_counter_fields(self, client, admin_client, admin, user_client,
+                               user, moderator_client, moderator):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        title_url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        admin_client.patch(title_url, data={'name': 'Новое название'},
+                           content_type='application/json')
+        data = client.get(title_url).json()
+        assert data.get('review_count') == len(reviews), (
+            'Проверьте, что в ответе на GET-запрос к произведению поле '
+            '`review_count` равно количеству его отзывов и не сбрасывается '
+            'при изменении произведения.'
+        )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        counts = {
+            review['id']: review.get('comment_count')
+            for review in client.get(url).json()['results']
+        }
+        assert counts[reviews[0]['id']] == len(comments), (
+            'Проверьте, что в списке отзывов поле `comment_count` равно '
+            'количеству комментариев к отзыву.'
+        )
+
+    @pytest.mark.parametrize('limit, count, exact', [
+        (2, 2, False),
+        (3, 3, True),
+    ])
+    def test_04_capped_count(self, admin_client, admin, user, moderator,
+                             monkeypatch, limit, count, exact):
+        monkeypatch.setattr(pagination, 'EXACT_COUNT_LIMIT', limit)
+        response = admin_client.get(self.USERS_URL, {'search': 'test'})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert (data['count'], data['count_exact']) == (count, exact), (
+            'Проверьте, что количество, ограниченное EXACT_COUNT_LIMIT, '
+            'возвращается с `count_exact: false`, а точное — с '
+            '`count_exact: true`.'
+        )
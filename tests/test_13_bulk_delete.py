@@ -0,0 +1,195 @@
+import re
+import time
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.test import Client
+
+from api.authentication import get_token_version_cache_key
+from reviews.bulk_delete import bulk_delete, bulk_deleted
+from reviews.counters import get_table_count, reconcile_counters
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13BulkDelete:
+
+    URL = '/api/v1/bulk-delete/'
+
+    def create_title(self, number, category, genre):
+        title = Title.objects.create(
+            name=f'Произведение {number}', year=2000, category=category
+        )
+        title.genre.set([genre])
+        return title
+
+    @pytest.fixture
+    def objects(self, django_user_model):
+        get_table_count(Title)
+        category = Category.objects.create(name='Фильмы', slug='films')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        titles = [self.create_title(number, category, genre)
+                  for number in range(5)]
+        authors = [
+            django_user_model.objects.create_user(
+                username=f'author{number}',
+                email=f'author{number}@yamdb.fake'
+            )
+            for number in range(3)
+        ]
+        for title in titles:
+            for author in authors:
+                review = Review.objects.create(
+                    author=author, title=title, text='Отзыв', score=5
+                )
+                for commenter in authors:
+                    Comment.objects.create(
+                        author=commenter, review=review, text='Текст'
+                    )
+        return titles, authors
+
+    def check_counters(self):
+        assert reconcile_counters(dry_run=True) == [], (
+            'Проверьте, что после быстрого удаления счётчики отзывов, '
+            'комментариев и произведений остаются верными.'
+        )
+
+    def test_01_delete_users(self, admin_client, objects):
+        titles, authors = objects
+        response = admin_client.post(
+            f'{self.URL}users/', data={'ids': [authors[0].id]},
+            format='json'
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что POST-запрос администратора к '
+            f'`{self.URL}users/` возвращает ответ со статусом 200.'
+        )
+        assert response.json()['status'] == 'done', (
+            'Проверьте, что без `background` удаление выполняется '
+            'в запросе.'
+        )
+        assert not Review.objects.filter(author=authors[0]).exists()
+        assert not Comment.objects.filter(author=authors[0]).exists()
+        assert not Comment.objects.filter(
+            review__author=authors[0]
+        ).exists(), (
+            'Проверьте, что вместе с пользователем удаляются комментарии '
+            'к его отзывам.'
+        )
+        assert Comment.objects.count() == len(titles) * 2 * 2
+        self.check_counters()
+
+    def test_02_delete_titles_in_chunks(self, objects):
+        titles, _ = objects
+        deleted = bulk_delete(
+            Title, [title.id for title in titles[:3]], chunk_size=2
+        )
+        assert deleted['reviews.title'] == 3
+        assert deleted['reviews.review'] == 3 * 3
+        assert deleted['reviews.comment'] == 3 * 3 * 3, (
+            'Проверьте, что быстрое удаление произведений удаляет '
+            'все их отзывы и комментарии.'
+        )
+        assert not Title.genre.through.objects.filter(
+            title_id__in=[title.id for title in titles[:3]]
+        ).exists()
+        assert get_table_count(Title) == 2
+        self.check_counters()
+
+    def test_03_background_job(self, admin_client, user_client, objects):
+        titles, _ = objects
+        data = {'ids': [title.id for title in titles], 'background': True}
+        response = user_client.post(
+            f'{self.URL}titles/', data=data, format='json'
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что быстрое удаление доступно только '
+            'администратору.'
+        )
+        response = admin_client.post(
+            f'{self.URL}titles/', data=data, format='json'
+        )
+        assert response.status_code == HTTPStatus.ACCEPTED, (
+            'Проверьте, что фоновое удаление возвращает ответ '
+            'со статусом 202.'
+        )
+        job_url = f'{self.URL}{response.json()["id"]}/'
+        for _ in range(100):
+            job = admin_client.get(job_url).json()
+            if job['status'] != 'running':
+                break
+            time.sleep(0.05)
+        assert job['status'] == 'done', (
+            'Проверьте, что ход фонового удаления доступен по '
+            f'`{job_url}`.'
+        )
+        assert job['processed'] == len(titles)
+        assert not Title.objects.exists()
+        assert not Review.objects.exists()
+        self.check_counters()
+
+    def test_04_admin_action(self, django_user_model, objects):
+        titles, _ = objects
+        superuser = django_user_model.objects.create_superuser(
+            username='superuser', email='superuser@yamdb.fake',
+            password='password'
+        )
+        client = Client()
+        client.force_login(superuser)
+        response = client.post('/admin/reviews/title/', {
+            'action': 'bulk_delete_selected',
+            '_selected_action': [title.id for title in titles],
+        }, follow=True)
+        job_url = re.search(
+            r'href="(/admin/reviews/title/bulk-delete/\w+/)"',
+            response.content.decode()
+        )
+        assert job_url, (
+            'Проверьте, что действие быстрого удаления в админке даёт '
+            'ссылку на ход задачи в самой админке.'
+        )
+        for _ in range(100):
+            response = client.get(job_url[1], follow=True)
+            message = str(list(response.context['messages'])[0])
+            if not message.startswith('Удаление идёт'):
+                break
+            time.sleep(0.05)
+        assert message.startswith('Удаление завершено'), (
+            'Проверьте, что страница хода задачи в админке показывает '
+            'завершение удаления.'
+        )
+        assert not Title.objects.exists()
+        self.check_counters()
+
+    def test_05_token_versions_reset(self, objects):
+        _, authors = objects
+        key = get_token_version_cache_key(authors[0].id)
+        cache.set(key, authors[0].token_version)
+        bulk_delete(type(authors[0]), [authors[0].id])
+        assert cache.get(key) is None, (
+            'Проверьте, что быстрое удаление пользователей сбрасывает '
+            'закешированные версии их токенов.'
+        )
+
+    def test_06_destroy_is_atomic(self, admin_client, objects):
+        titles, _ = objects
+        comments = Comment.objects.count()
+
+        def fail(sender, **kwargs):
+            raise RuntimeError('Сбой после удаления строк')
+
+        bulk_deleted.connect(fail, sender=Title)
+        try:
+            with pytest.raises(RuntimeError):
+                admin_client.delete(f'/api/v1/titles/{titles[0].id}/')
+        finally:
+            bulk_deleted.disconnect(fail, sender=Title)
+        assert Title.objects.filter(pk=titles[0].id).exists()
+        assert Review.objects.filter(title=titles[0]).count() == 3
+        assert Comment.objects.count() == comments, (
+            'Проверьте, что удаление объекта через API выполняется в одной '
+            'транзакции и при ошибке не оставляет объект удалённым '
+            'частично.'
+        )
+        self.check_counters()
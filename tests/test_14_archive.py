@@ -0,0 +1,122 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from api.archive import archive_reviews
+from reviews.bulk_delete import bulk_delete
+from reviews.counters import get_table_count, reconcile_counters
+from reviews.models import (
+    ArchivedComment, ArchivedReview, Category, Comment, Review, Title
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14Archive:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    @pytest.fixture
+    def title(self, django_user_model):
+        get_table_count(Title)
+        category = Category.objects.create(name='Книги', slug='books')
+        title = Title.objects.create(
+            name='Произведение', year=2000, category=category
+        )
+        for number, score in enumerate((2, 6, 10)):
+            author = django_user_model.objects.create_user(
+                username=f'author{number}',
+                email=f'author{number}@yamdb.fake'
+            )
+            review = Review.objects.create(
+                author=author, title=title, text=f'Отзыв {number}',
+                score=score
+            )
+            for _ in range(number + 1):
+                Comment.objects.create(
+                    author=author, review=review, text='Текст'
+                )
+            Review.objects.filter(pk=review.pk).update(
+                pub_date=timezone.now() - timedelta(days=100 - number)
+            )
+        return title
+
+    def get_results(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        return response.json()
+
+    def test_01_archive_moves_rows(self, client, title):
+        rating = self.get_results(client, f'/api/v1/titles/{title.id}/')[
+            'rating'
+        ]
+        assert archive_reviews(older_than_days=0, keep_newest=1) == (2, 3)
+        assert Review.objects.filter(title=title).count() == 1
+        assert ArchivedReview.objects.filter(title=title).count() == 2
+        assert ArchivedComment.objects.count() == 3
+        assert Comment.objects.count() == 3, (
+            'Проверьте, что комментарии переносятся в архив вместе '
+            'со своим отзывом.'
+        )
+        assert reconcile_counters(dry_run=True) == [], (
+            'Проверьте, что после архивации счётчики остаются верными.'
+        )
+        assert self.get_results(client, f'/api/v1/titles/{title.id}/')[
+            'rating'
+        ] == rating, (
+            'Проверьте, что рейтинг произведения учитывает архивные отзывы.'
+        )
+
+    def test_02_include_archived(self, client, title):
+        archive_reviews(older_than_days=0, keep_newest=1)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        data = self.get_results(client, url)
+        assert data['count'] == 1, (
+            'Проверьте, что по умолчанию список отзывов читает только '
+            'оперативную таблицу.'
+        )
+        data = self.get_results(client, f'{url}?include_archived=1')
+        assert data['count'] == 3
+        assert [review['text'] for review in data['results']] == [
+            'Отзыв 2', 'Отзыв 1', 'Отзыв 0'
+        ], (
+            'Проверьте, что с `include_archived=1` список отзывов '
+            'содержит и архивные отзывы в порядке даты.'
+        )
+        fields_data = self.get_results(
+            client, f'{url}?include_archived=1&fields=id,text,comment_count'
+        )
+        assert [review['comment_count'] for review in fields_data[
+            'results'
+        ]] == [3, 2, 1]
+
+        archived = ArchivedReview.objects.order_by('pub_date').first()
+        comments_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title.id, review_id=archived.id
+        )
+        response = client.get(comments_url)
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        assert self.get_results(
+            client, f'{comments_url}?include_archived=1'
+        )['count'] == 1, (
+            'Проверьте, что с `include_archived=1` доступны комментарии '
+            'архивного отзыва.'
+        )
+        assert self.get_results(
+            client, f'{url}{archived.id}/?include_archived=1'
+        )['text'] == archived.text
+
+    def test_03_bulk_delete_removes_archive(self, title):
+        archive_reviews(older_than_days=0, keep_newest=1)
+        bulk_delete(Title, [title.id])
+        assert not ArchivedReview.objects.exists()
+        assert not ArchivedComment.objects.exists(), (
+            'Проверьте, что удаление произведения удаляет и его архив.'
+        )
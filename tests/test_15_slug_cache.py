@@ -0,0 +1,103 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Genre, Title
+from tests.utils import create_categories, create_genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15SlugCache:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @staticmethod
+    def lookup_queries(context):
+        return [
+            query['sql'] for query in context.captured_queries
+            if 'FROM "reviews_genre"' in query['sql']
+            or 'FROM "reviews_category"' in query['sql']
+        ]
+
+    def test_01_title_write_without_lookups(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = {
+            'name': 'Терминатор',
+            'year': 1984,
+            'genre': [genre['slug'] for genre in genres],
+            'category': categories[0]['slug'],
+        }
+        admin_client.post(self.TITLES_URL, data={
+            **data, 'name': 'Прогрев кеша'
+        })
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(self.TITLES_URL, data=data)
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что администратор может создать произведение.'
+        )
+        assert set(response.json()['genre']) == {
+            genre['slug'] for genre in genres
+        }
+        assert len([
+            sql for sql in self.lookup_queries(context)
+            if 'reviews_title_genre' not in sql
+        ]) == 2, (
+            'Проверьте, что при создании произведения slug жанров и '
+            'категории переводятся в id по кешу, а id сверяются с '
+            'таблицами одним запросом на связь.'
+        )
+
+    def test_02_filter_without_lookups(self, admin_client):
+        genres = create_genre(admin_client)
+        create_categories(admin_client)
+        url = (
+            f'{self.TITLES_URL}?genre={genres[0]["slug"]}'
+            '&category=films&fields=id,name'
+        )
+        admin_client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert not self.lookup_queries(context), (
+            'Проверьте, что фильтр по жанру и категории не обращается '
+            'к таблицам жанров и категорий.'
+        )
+
+    def test_03_cache_invalidation(self, admin_client):
+        create_genre(admin_client)
+        url = f'{self.TITLES_URL}?genre=new-genre'
+        assert admin_client.get(url).status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что фильтр по неизвестному жанру возвращает '
+            'ответ со статусом 400.'
+        )
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Новый', 'slug': 'new-genre'}
+        )
+        assert admin_client.get(url).status_code == HTTPStatus.OK, (
+            'Проверьте, что после добавления жанра кеш slug обновляется.'
+        )
+
+    def test_04_deleted_elsewhere(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = {
+            'name': 'Терминатор',
+            'year': 1984,
+            'genre': [genres[0]['slug']],
+            'category': categories[0]['slug'],
+        }
+        admin_client.get(f'{self.TITLES_URL}?genre={genres[0]["slug"]}')
+        # Удаление в другом процессе: сигнал до этого процесса не доходит.
+        Genre.objects.filter(slug=genres[0]['slug'])._raw_delete(
+            connection.alias
+        )
+        response = admin_client.post(self.TITLES_URL, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что произведение с жанром, удалённым после '
+            'загрузки кеша slug, отклоняется со статусом 400.'
+        )
+        assert 'genre' in response.json()
+        assert not Title.objects.exists()
@@ -0,0 +1,61 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Comment, Review, Title
+
+
+@pytest.mark.django_db
+class Test16NestedRoutes:
+
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    @pytest.fixture
+    def reviews(self, user):
+        category = Category.objects.create(name='Книги', slug='books')
+        return [
+            Review.objects.create(
+                author=user, text='Отзыв', score=5,
+                title=Title.objects.create(
+                    name=f'Произведение {number}', year=2000,
+                    category=category
+                ),
+            )
+            for number in range(2)
+        ]
+
+    def test_01_mismatched_chain(self, client, user_client, reviews):
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=reviews[1].title_id, review_id=reviews[0].id
+        )
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарии отзыва недоступны по адресу '
+            'другого произведения.'
+        )
+        response = user_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что нельзя добавить комментарий к отзыву по адресу '
+            'другого произведения.'
+        )
+        assert not Comment.objects.exists()
+
+    def test_02_parent_loaded_once(self, user_client, reviews):
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=reviews[0].title_id, review_id=reviews[0].id
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == HTTPStatus.CREATED
+        review_queries = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_review"' in query['sql']
+        ]
+        assert len(review_queries) == 1, (
+            'Проверьте, что при создании комментария отзыв и его '
+            'произведение загружаются одним запросом.'
+        )
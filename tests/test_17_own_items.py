@@ -0,0 +1,102 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Comment, Review, Title
+
+
+@pytest.mark.django_db
+class Test17OwnItems:
+
+    OWN_REVIEWS_URL = '/api/v1/users/me/reviews/'
+    OWN_COMMENTS_URL = '/api/v1/users/me/comments/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    @pytest.fixture
+    def titles(self):
+        category = Category.objects.create(name='Книги', slug='books')
+        return [
+            Title.objects.create(
+                name=f'Произведение {number}', year=2000, category=category
+            )
+            for number in range(7)
+        ]
+
+    def test_01_own_reviews_and_comments(
+        self, client, user_client, user, moderator, titles
+    ):
+        for title in titles:
+            review = Review.objects.create(
+                author=user, title=title, text=f'Отзыв {title.id}', score=5
+            )
+            Review.objects.create(
+                author=moderator, title=title, text='Чужой', score=5
+            )
+            Comment.objects.create(author=user, review=review, text='Мой')
+            Comment.objects.create(
+                author=moderator, review=review, text='Чужой'
+            )
+
+        assert client.get(self.OWN_REVIEWS_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), (
+            f'Проверьте, что `{self.OWN_REVIEWS_URL}` доступен только '
+            'авторизованным пользователям.'
+        )
+        response = user_client.get(self.OWN_REVIEWS_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.OWN_REVIEWS_URL}` '
+            'возвращает ответ со статусом 200.'
+        )
+        data = response.json()
+        reviews = data['results']
+        while data['next']:
+            data = user_client.get(data['next']).json()
+            reviews.extend(data['results'])
+        assert [review['title'] for review in reviews] == [
+            title.id for title in reversed(titles)
+        ], (
+            f'Проверьте, что `{self.OWN_REVIEWS_URL}` постранично '
+            'возвращает все отзывы пользователя от новых к старым.'
+        )
+        assert {review['author'] for review in reviews} == {user.username}
+
+        data = user_client.get(self.OWN_COMMENTS_URL).json()
+        assert 'next' in data and 'count' not in data, (
+            f'Проверьте, что `{self.OWN_COMMENTS_URL}` использует '
+            'курсорную пагинацию.'
+        )
+        assert {comment['text'] for comment in data['results']} == {'Мой'}
+
+    def test_02_duplicate_review_single_insert(self, user_client, titles):
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0].id)
+        data = {'text': 'Отзыв', 'score': 5}
+        assert user_client.post(url, data=data).status_code == (
+            HTTPStatus.CREATED
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что повторный отзыв на произведение отклоняется.'
+        )
+        assert 'non_field_errors' in response.json()
+        assert not [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_review"' in query['sql']
+        ], (
+            'Проверьте, что повтор отзыва определяется по ограничению '
+            'unique_review при вставке, без отдельной проверки.'
+        )
+        assert Review.objects.count() == 1
+
+    def test_03_other_integrity_error(self, user_client, titles, monkeypatch):
+        def fail(*args, **kwargs):
+            raise IntegrityError('FOREIGN KEY constraint failed')
+
+        monkeypatch.setattr(Review, 'save', fail)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0].id)
+        with pytest.raises(IntegrityError):
+            user_client.post(url, data={'text': 'Отзыв', 'score': 5})
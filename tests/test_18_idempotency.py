@@ -0,0 +1,139 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from rest_framework import status, viewsets
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+
+from api.idempotency import REPLAYED_HEADER, idempotent
+from reviews.models import Category, Review, Title
+
+
+class LocatedViewSet(viewsets.ViewSet):
+    """Создание с заголовками от обработчика и от finalize_response."""
+
+    authentication_classes = []
+    permission_classes = []
+    throttle_classes = []
+    calls = 0
+
+    @idempotent
+    def create(self, request):
+        type(self).calls += 1
+        return Response(
+            {'id': 1}, status=status.HTTP_201_CREATED,
+            headers={'Location': '/objects/1/'}
+        )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if not response.has_header(REPLAYED_HEADER):
+            response['ETag'] = '"1-1"'
+        return response
+
+
+@pytest.mark.django_db
+class Test18Idempotency:
+
+    SIGNUP_URL = '/api/v1/auth/signup/'
+    TOKEN_URL = '/api/v1/auth/token/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_signup_replay(self, client):
+        data = {'username': 'mobile', 'email': 'mobile@yamdb.fake'}
+        headers = {'HTTP_IDEMPOTENCY_KEY': 'signup-1'}
+        first = client.post(self.SIGNUP_URL, data=data, **headers)
+        second = client.post(self.SIGNUP_URL, data=data, **headers)
+        assert first.status_code == second.status_code == HTTPStatus.OK
+        assert second.json() == first.json()
+        assert second.get('Idempotent-Replayed') == 'true', (
+            'Проверьте, что повтор запроса с тем же Idempotency-Key '
+            'возвращает сохранённый ответ.'
+        )
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что повтор регистрации с тем же Idempotency-Key '
+            'не отправляет письмо ещё раз.'
+        )
+
+    def test_02_review_replay(self, user_client):
+        title = Title.objects.create(
+            name='Произведение', year=2000,
+            category=Category.objects.create(name='Книги', slug='books')
+        )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        data = {'text': 'Отзыв', 'score': 5}
+        headers = {'HTTP_IDEMPOTENCY_KEY': 'review-1'}
+        first = user_client.post(url, data=data, **headers)
+        second = user_client.post(url, data=data, **headers)
+        assert first.status_code == second.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что повтор создания отзыва с тем же '
+            'Idempotency-Key возвращает исходный ответ со статусом 201.'
+        )
+        assert second.json()['id'] == first.json()['id']
+        assert Review.objects.count() == 1
+
+        response = user_client.post(
+            url, data={'text': 'Другой', 'score': 1}, **headers
+        )
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY, (
+            'Проверьте, что Idempotency-Key нельзя использовать для '
+            'запроса с другим телом.'
+        )
+        response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что без Idempotency-Key повторный отзыв '
+            'по-прежнему отклоняется.'
+        )
+
+    def test_03_anonymous_scope_by_ip(self, client):
+        data = {'username': 'mobile', 'email': 'mobile@yamdb.fake'}
+        headers = {'HTTP_IDEMPOTENCY_KEY': 'signup-1'}
+        client.post(
+            self.SIGNUP_URL, data=data, REMOTE_ADDR='10.0.0.1', **headers
+        )
+        other = client.post(
+            self.SIGNUP_URL, data={'username': 'other',
+                                   'email': 'other@yamdb.fake'},
+            REMOTE_ADDR='10.0.0.2', **headers
+        )
+        assert other.get('Idempotent-Replayed') is None, (
+            'Проверьте, что Idempotency-Key анонимного запроса действует '
+            'только для адреса клиента, который его отправил.'
+        )
+        assert other.json()['username'] == 'other'
+
+    def test_04_token_not_stored(self, client, django_user_model):
+        django_user_model.objects.create(
+            username='mobile', email='mobile@yamdb.fake',
+            confirmation_code='code'
+        )
+        data = {'username': 'mobile', 'confirmation_code': 'code'}
+        headers = {'HTTP_IDEMPOTENCY_KEY': 'token-1'}
+        first = client.post(self.TOKEN_URL, data=data, **headers)
+        second = client.post(self.TOKEN_URL, data=data, **headers)
+        assert first.status_code == second.status_code == HTTPStatus.OK
+        assert second.get('Idempotent-Replayed') is None, (
+            'Проверьте, что ответы с выданными токенами не сохраняются '
+            'по Idempotency-Key и не возвращаются на повторы.'
+        )
+
+    def test_05_headers_replayed(self):
+        view = LocatedViewSet.as_view({'post': 'create'})
+        responses = []
+        for _ in range(2):
+            request = APIRequestFactory().post(
+                '/objects/', {'name': 'Объект'}, format='json',
+                HTTP_IDEMPOTENCY_KEY='object-1'
+            )
+            responses.append(view(request).render())
+        first, second = responses
+        assert LocatedViewSet.calls == 1
+        assert second[REPLAYED_HEADER] == 'true'
+        for name in ('Content-Type', 'ETag', 'Location'):
+            assert second.get(name) == first[name], (
+                'Проверьте, что повтор запроса с тем же Idempotency-Key '
+                f'возвращает сохранённый заголовок {name}.'
+            )
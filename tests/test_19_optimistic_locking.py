@@ -0,0 +1,172 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Review, Title, VersionConflict
+
+
+@pytest.mark.django_db
+class Test19OptimisticLocking:
+
+    TITLE_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    ME_URL = '/api/v1/users/me/'
+
+    @pytest.fixture
+    def title(self):
+        return Title.objects.create(
+            name='Произведение', year=2000,
+            category=Category.objects.create(name='Книги', slug='books')
+        )
+
+    def test_01_title_if_match(self, admin_client, title):
+        url = self.TITLE_URL_TEMPLATE.format(title_id=title.id)
+        etag = admin_client.get(url).get('ETag')
+        assert etag == '"1"', (
+            'Проверьте, что ответ с произведением содержит ETag '
+            'с версией строки.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.patch(
+                url, data={'name': 'Новое'}, HTTP_IF_MATCH=etag
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert response.get('ETag') == '"2"', (
+            'Проверьте, что PATCH увеличивает версию и возвращает новый ETag.'
+        )
+        assert [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "reviews_title"')
+            and '"version" = 1' in query['sql']
+        ], (
+            'Проверьте, что PATCH с If-Match выполняет условный UPDATE '
+            'по версии строки.'
+        )
+
+        response = admin_client.patch(
+            url, data={'name': 'Устаревшее'}, HTTP_IF_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.PRECONDITION_FAILED, (
+            'Проверьте, что PATCH с устаревшим If-Match возвращает 412.'
+        )
+        title.refresh_from_db()
+        assert title.name == 'Новое'
+
+        response = admin_client.patch(url, data={'year': 2001})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что PATCH без If-Match по-прежнему выполняется.'
+        )
+
+    def test_02_concurrent_save(self, title):
+        first = Title.objects.get(pk=title.pk)
+        second = Title.objects.get(pk=title.pk)
+        second.name = 'Второе'
+        second.save()
+        first.name = 'Первое'
+        first.expected_version = first.version
+        with pytest.raises(VersionConflict):
+            first.save()
+        title.refresh_from_db()
+        assert (title.name, title.version) == ('Второе', 2), (
+            'Проверьте, что запись с устаревшей версией не перезаписывает '
+            'чужие изменения.'
+        )
+        assert title.review_count == 0
+
+    def test_03_review_delete(self, user_client, user, title):
+        review = Review.objects.create(
+            author=user, title=title, text='Отзыв', score=5
+        )
+        url = self.REVIEW_URL_TEMPLATE.format(
+            title_id=title.id, review_id=review.id
+        )
+        etag = user_client.get(url).get('ETag')
+        user_client.patch(url, data={'score': 4})
+        response = user_client.delete(url, HTTP_IF_MATCH=etag)
+        assert response.status_code == HTTPStatus.PRECONDITION_FAILED, (
+            'Проверьте, что DELETE с устаревшим If-Match возвращает 412.'
+        )
+        assert Review.objects.filter(pk=review.pk).exists()
+
+        etag = user_client.get(url).get('ETag')
+        response = user_client.delete(url, HTTP_IF_MATCH=etag)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not Review.objects.filter(pk=review.pk).exists()
+
+    def test_04_personal_info(self, user_client, user):
+        etag = user_client.get(self.ME_URL).get('ETag')
+        response = user_client.patch(
+            self.ME_URL, data={'bio': 'Новая'}, HTTP_IF_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = user_client.patch(
+            self.ME_URL, data={'bio': 'Старая'}, HTTP_IF_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.PRECONDITION_FAILED, (
+            f'Проверьте, что PATCH `{self.ME_URL}` с устаревшим If-Match '
+            'возвращает 412.'
+        )
+        user.refresh_from_db()
+        assert user.bio == 'Новая'
+
+    def test_05_stale_copy_keeps_version_growing(self, title):
+        stale = Title.objects.get(pk=title.pk)
+        for _ in range(2):
+            title.save()
+        stale.save()
+        assert stale.version == 4, (
+            'Проверьте, что версия увеличивается в самом UPDATE, а '
+            'сохранение устаревшей копии не уменьшает её.'
+        )
+        title.refresh_from_db()
+        assert title.version == 4
+
+    def test_06_weak_etag(self, admin_client, title, settings):
+        settings.COMPRESSION_MIN_SIZE = 1
+        url = self.TITLE_URL_TEMPLATE.format(title_id=title.id)
+        response = admin_client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        assert response['Content-Encoding'] == 'gzip'
+        etag = response.get('ETag')
+        assert etag == 'W/"1"'
+        response = admin_client.patch(
+            url, data={'name': 'Новое'}, HTTP_IF_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что PATCH принимает в If-Match слабый ETag '
+            'сжатого ответа.'
+        )
+        response = admin_client.patch(
+            url, data={'name': 'Устаревшее'}, HTTP_IF_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.PRECONDITION_FAILED
+
+    def test_07_save_without_version_read(self, title):
+        with CaptureQueriesContext(connection) as context:
+            title.save()
+        assert [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+        ] == [], (
+            'Проверьте, что сохранение без expected_version не читает '
+            'новую версию строки.'
+        )
+        assert title.version == 2, (
+            'Проверьте, что версия после сохранения загружается из БД при '
+            'обращении к ней.'
+        )
+
+    def test_08_save_missing_row(self, title, user):
+        review = Review.objects.create(
+            author=user, title=title, text='Отзыв', score=5
+        )
+        Review.objects.filter(pk=review.pk)._raw_delete('default')
+        Title.objects.filter(pk=title.pk)._raw_delete('default')
+        title.save()
+        review.save()
+        assert Title.objects.filter(pk=title.pk).exists()
+        assert Review.objects.filter(pk=review.pk).exists(), (
+            'Проверьте, что save() объекта, строку которого успели '
+            'удалить, как обычно создаёт её заново.'
+        )
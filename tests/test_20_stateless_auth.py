@@ -0,0 +1,84 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from api.authentication import (
+    StatelessJWTAuthentication, YamdbRefreshToken, YamdbTokenUser
+)
+from reviews.models import User
+
+
+@pytest.mark.django_db
+class Test20StatelessAuth:
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    @staticmethod
+    def authenticate(user, method='get'):
+        token = YamdbRefreshToken.for_user(user).access_token
+        request = getattr(APIRequestFactory(), method)(
+            '/', HTTP_AUTHORIZATION=f'Bearer {token}'
+        )
+        return StatelessJWTAuthentication().authenticate(request)[0]
+
+    def test_01_safe_request_without_user_query(self, moderator):
+        self.authenticate(moderator)
+        with CaptureQueriesContext(connection) as context:
+            request_user = self.authenticate(moderator)
+        assert not context.captured_queries, (
+            'Проверьте, что безопасный запрос с JWT не обращается к БД, '
+            'пока версия токенов пользователя есть в кеше.'
+        )
+        assert isinstance(request_user, YamdbTokenUser)
+        assert request_user.is_moderator and not request_user.is_admin, (
+            'Проверьте, что роль пользователя восстанавливается из claims '
+            'токена.'
+        )
+
+    def test_02_role_change_revokes_token(self, user):
+        token = YamdbRefreshToken.for_user(user).access_token
+        self.authenticate(user)
+        user.role = User.Role.ADMIN
+        user.save()
+        request = APIRequestFactory().get(
+            '/', HTTP_AUTHORIZATION=f'Bearer {token}'
+        )
+        with pytest.raises(AuthenticationFailed):
+            StatelessJWTAuthentication().authenticate(request)
+        assert self.authenticate(user).is_admin, (
+            'Проверьте, что новый токен после смены роли принимается.'
+        )
+
+    def test_03_deactivation_revokes_token(self, user):
+        self.authenticate(user)
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        cache.clear()
+        with pytest.raises(AuthenticationFailed):
+            self.authenticate(user)
+
+        user.refresh_from_db()
+        user.is_active = True
+        user.save()
+        token = YamdbRefreshToken.for_user(user).access_token
+        user.is_active = False
+        user.save()
+        request = APIRequestFactory().get(
+            '/', HTTP_AUTHORIZATION=f'Bearer {token}'
+        )
+        with pytest.raises(AuthenticationFailed):
+            StatelessJWTAuthentication().authenticate(request)
+
+    def test_04_write_loads_user(self, user):
+        request_user = self.authenticate(user, method='post')
+        assert isinstance(request_user, User), (
+            'Проверьте, что на изменяющих запросах пользователь '
+            'загружается из БД.'
+        )
+        assert request_user.pk == user.pk
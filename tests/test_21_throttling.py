@@ -0,0 +1,114 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api import throttling
+from reviews.models import Category, Title
+
+
+@pytest.mark.django_db
+class Test21Throttling:
+
+    SIGNUP_URL = '/api/v1/auth/signup/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    @pytest.fixture(autouse=True)
+    def rates(self, monkeypatch):
+        monkeypatch.setattr(
+            throttling.TokenBucketThrottle, 'THROTTLE_RATES',
+            {'auth': '2/min', 'reviews': '1/min', 'comments': '1/min'}
+        )
+        monkeypatch.setattr(
+            throttling, '_store', throttling.MemoryBucketStore()
+        )
+
+    @pytest.fixture
+    def reviews_url(self):
+        title = Title.objects.create(
+            name='Произведение', year=2000,
+            category=Category.objects.create(name='Книги', slug='books')
+        )
+        return self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+
+    def test_01_signup_retry_after(self, client):
+        for number in range(2):
+            response = client.post(self.SIGNUP_URL, data={
+                'username': f'user{number}',
+                'email': f'user{number}@yamdb.fake',
+            })
+            assert response.status_code == HTTPStatus.OK
+        response = client.post(self.SIGNUP_URL, data={
+            'username': 'user2', 'email': 'user2@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что частые запросы к `{self.SIGNUP_URL}` '
+            'отклоняются со статусом 429.'
+        )
+        assert int(response['Retry-After']) > 0, (
+            'Проверьте, что ответ 429 содержит заголовок Retry-After.'
+        )
+
+    def test_02_rejected_without_queries(self, user_client, reviews_url):
+        data = {'text': 'Отзыв', 'score': 5}
+        assert user_client.post(reviews_url, data=data).status_code == (
+            HTTPStatus.CREATED
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(reviews_url, data=data)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert 'Retry-After' in response
+        assert not context.captured_queries, (
+            'Проверьте, что запрос сверх лимита отклоняется до '
+            'аутентификации и обращений к БД.'
+        )
+
+    def test_03_keyed_by_ip_and_user(
+        self, user_client, moderator_client, reviews_url
+    ):
+        data = {'text': 'Отзыв', 'score': 5}
+        assert user_client.post(
+            reviews_url, data=data, REMOTE_ADDR='10.0.0.1'
+        ).status_code == HTTPStatus.CREATED
+        assert user_client.post(
+            reviews_url, data=data, REMOTE_ADDR='10.0.0.2'
+        ).status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что лимит пользователя действует с любого IP.'
+        )
+        assert moderator_client.post(
+            reviews_url, data=data, REMOTE_ADDR='10.0.0.1'
+        ).status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что лимит IP действует для всех пользователей.'
+        )
+        assert moderator_client.get(reviews_url).status_code == (
+            HTTPStatus.OK
+        ), 'Проверьте, что лимит записи не ограничивает чтение.'
+
+    def test_04_rejected_request_keeps_other_buckets(
+        self, user_client, moderator_client, reviews_url
+    ):
+        data = {'text': 'Отзыв', 'score': 5}
+        user_client.post(reviews_url, data=data, REMOTE_ADDR='10.0.0.1')
+        assert user_client.post(
+            reviews_url, data=data, REMOTE_ADDR='10.0.0.2'
+        ).status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert moderator_client.post(
+            reviews_url, data=data, REMOTE_ADDR='10.0.0.2'
+        ).status_code == HTTPStatus.CREATED, (
+            'Проверьте, что запрос, отклонённый по лимиту пользователя, '
+            'не расходует лимит IP.'
+        )
+
+    @pytest.mark.parametrize('store', ['memory', 'sqlite'])
+    def test_05_all_or_nothing(self, store, tmp_path):
+        store = (
+            throttling.MemoryBucketStore() if store == 'memory'
+            else throttling.SQLiteBucketStore(tmp_path / 'buckets.sqlite3')
+        )
+        assert store.consume(['ip', 'user'], 1, 0.001, 0) == (True, 0)
+        allowed, _ = store.consume(['other-ip', 'user'], 1, 0.001, 1)
+        assert not allowed
+        assert store.consume(['other-ip'], 1, 0.001, 1) == (True, 0), (
+            'Проверьте, что корзины расходуются только все вместе.'
+        )
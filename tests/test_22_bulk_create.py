@@ -0,0 +1,142 @@
+from http import HTTPStatus
+
+import pytest
+
+from api import views
+from api.archive import archive_reviews
+from reviews.models import ArchivedReview, Category, Comment, Review, Title
+
+
+@pytest.mark.django_db
+class Test22BulkCreate:
+
+    REVIEWS_URL = '/api/v1/bulk/reviews/'
+    COMMENTS_URL = '/api/v1/bulk/comments/'
+
+    @pytest.fixture
+    def titles(self):
+        category = Category.objects.create(name='Книги', slug='books')
+        return [
+            Title.objects.create(
+                name=f'Произведение {number}', year=2000, category=category
+            )
+            for number in range(2)
+        ]
+
+    def test_01_access(self, user_client, admin_client):
+        assert user_client.post(
+            self.REVIEWS_URL, data=[], format='json'
+        ).status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что `{self.REVIEWS_URL}` доступен только '
+            'администратору.'
+        )
+        assert admin_client.post(
+            self.REVIEWS_URL, data=[], format='json'
+        ).status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что пустой пакет отклоняется со статусом 400.'
+        )
+
+    def test_02_review_statuses(self, admin_client, admin, user, titles):
+        Review.objects.create(
+            author=user, title=titles[1], text='Отзыв', score=5
+        )
+        response = admin_client.post(self.REVIEWS_URL, data=[
+            {'title': titles[0].id, 'text': 'Первый', 'score': 5},
+            {'title': titles[0].id, 'text': 'Повтор', 'score': 4},
+            {'title': titles[0].id, 'text': 'Чужой', 'score': 11},
+            {'title': 999999, 'text': 'Нет произведения', 'score': 3},
+            {'title': titles[1].id, 'author': 'nobody', 'text': 'Нет автора',
+             'score': 3},
+            {'title': titles[1].id, 'author': user.username,
+             'text': 'Уже есть', 'score': 3},
+            {'title': titles[1].id, 'text': 'Второй', 'score': 1},
+        ], format='json')
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()
+        assert [result['status'] for result in results] == [
+            201, 400, 400, 400, 400, 400, 201
+        ], (
+            'Проверьте, что пакетная загрузка возвращает статус для каждого '
+            'элемента и отклоняет повторы пары автор-произведение.'
+        )
+        assert 'non_field_errors' in results[1]['errors']
+        assert 'score' in results[2]['errors']
+        assert 'title' in results[3]['errors']
+        assert 'author' in results[4]['errors']
+        assert 'non_field_errors' in results[5]['errors']
+
+        created = Review.objects.filter(
+            pk__in=[results[0]['id'], results[6]['id']]
+        ).values_list('text', 'author_id')
+        assert set(created) == {('Первый', admin.id), ('Второй', admin.id)}, (
+            'Проверьте, что в ответе возвращаются id созданных отзывов.'
+        )
+        for title in titles:
+            title.refresh_from_db()
+        assert [title.review_count for title in titles] == [1, 2], (
+            'Проверьте, что пакетная загрузка обновляет счётчики отзывов.'
+        )
+
+    def test_03_comment_statuses(self, admin_client, user, titles):
+        review = Review.objects.create(
+            author=user, title=titles[0], text='Отзыв', score=5
+        )
+        response = admin_client.post(self.COMMENTS_URL, data=[
+            {'review': review.id, 'text': 'Комментарий'},
+            {'review': 999999, 'text': 'Нет отзыва'},
+            {'review': review.id, 'author': user.username, 'text': 'Автор'},
+        ], format='json')
+        assert response.status_code == HTTPStatus.OK
+        assert [result['status'] for result in response.json()] == [
+            201, 400, 201
+        ]
+        assert Comment.objects.count() == 2
+        review.refresh_from_db()
+        assert review.comment_count == 2, (
+            'Проверьте, что пакетная загрузка обновляет счётчики '
+            'комментариев.'
+        )
+
+    def test_04_archived_review(self, admin_client, admin, user, titles):
+        for author in (user, admin):
+            Review.objects.create(
+                author=author, title=titles[0], text='Отзыв', score=5
+            )
+        archive_reviews(older_than_days=0, keep_newest=1)
+        assert ArchivedReview.objects.filter(author=user).exists()
+        response = admin_client.post(self.REVIEWS_URL, data=[
+            {'title': titles[0].id, 'author': user.username,
+             'text': 'Повтор', 'score': 3},
+        ], format='json')
+        assert response.json()[0]['status'] == 400, (
+            'Проверьте, что пакетная загрузка отклоняет отзыв автора, '
+            'чей отзыв на произведение уже в архиве.'
+        )
+        assert not Review.objects.filter(author=user).exists()
+
+    def test_05_ids_with_concurrent_insert(
+        self, admin_client, admin, user, titles, monkeypatch
+    ):
+        review = Review.objects.create(
+            author=user, title=titles[0], text='Отзыв', score=5
+        )
+        change_counters = views.change_counters
+
+        def insert_concurrently(model, objs, delta):
+            change_counters(model, objs, delta)
+            Comment.objects.create(author=user, review=review, text='Чужой')
+
+        monkeypatch.setattr(views, 'change_counters', insert_concurrently)
+        response = admin_client.post(self.COMMENTS_URL, data=[
+            {'review': review.id, 'text': 'Первый'},
+            {'review': review.id, 'text': 'Второй'},
+        ], format='json')
+        ids = [result['id'] for result in response.json()]
+        assert list(Comment.objects.filter(pk__in=ids).order_by(
+            'pk'
+        ).values_list('text', 'author_id')) == [
+            ('Первый', admin.id), ('Второй', admin.id)
+        ], (
+            'Проверьте, что id созданных объектов определяются по их '
+            'данным, а не по последним строкам таблицы.'
+        )
@@ -0,0 +1,78 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.constants import TITLES_BATCH_MAX_IDS
+from reviews.models import Category, Genre, Review, Title
+
+
+@pytest.mark.django_db
+class Test23TitlesBatch:
+
+    BATCH_URL = '/api/v1/titles/batch/'
+
+    @pytest.fixture
+    def titles(self, user):
+        category = Category.objects.create(name='Книги', slug='books')
+        genres = [
+            Genre.objects.create(name=f'Жанр {number}', slug=f'genre-{number}')
+            for number in range(2)
+        ]
+        titles = []
+        for number in range(5):
+            title = Title.objects.create(
+                name=f'Произведение {number}', year=2000, category=category
+            )
+            title.genre.set(genres)
+            Review.objects.create(
+                author=user, title=title, text='Отзыв', score=number + 1
+            )
+            titles.append(title)
+        return titles
+
+    def get_ids(self, client, ids):
+        response = client.get(
+            f'{self.BATCH_URL}?ids={",".join(map(str, ids))}'
+        )
+        assert response.status_code == HTTPStatus.OK
+        return [title['id'] for title in response.json()]
+
+    def test_01_order(self, client, titles):
+        ids = [titles[3].id, titles[0].id, 999999, titles[3].id, titles[1].id]
+        assert self.get_ids(client, ids) == [
+            titles[3].id, titles[0].id, titles[1].id
+        ], (
+            f'Проверьте, что `{self.BATCH_URL}` возвращает найденные '
+            'произведения в порядке перечисления id без повторов.'
+        )
+        response = client.get(f'{self.BATCH_URL}?ids={titles[4].id}')
+        title = response.json()[0]
+        assert title['rating'] == 5 and len(title['genre']) == 2, (
+            'Проверьте, что произведения из пакета содержат рейтинг '
+            'и жанры.'
+        )
+
+    def test_02_validation(self, client):
+        assert client.get(f'{self.BATCH_URL}?ids=1,a').status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), 'Проверьте, что нечисловые id отклоняются со статусом 400.'
+        ids = ','.join(map(str, range(1, TITLES_BATCH_MAX_IDS + 2)))
+        assert client.get(f'{self.BATCH_URL}?ids={ids}').status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), (
+            'Проверьте, что нельзя запросить больше '
+            f'{TITLES_BATCH_MAX_IDS} произведений за раз.'
+        )
+
+    def test_03_query_count(self, client, titles):
+        counts = []
+        for ids in ([titles[0].id], [title.id for title in titles]):
+            with CaptureQueriesContext(connection) as context:
+                assert len(self.get_ids(client, ids)) == len(ids)
+            counts.append(len(context.captured_queries))
+        assert counts[0] == counts[1], (
+            'Проверьте, что количество запросов к БД не зависит от '
+            'количества запрошенных произведений.'
+        )
@@ -0,0 +1,83 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Review, Title
+
+
+@pytest.mark.django_db
+class Test24SparseFields:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    @pytest.fixture
+    def title(self, user):
+        title = Title.objects.create(
+            name='Произведение', year=2000,
+            category=Category.objects.create(name='Книги', slug='books')
+        )
+        title.genre.add(Genre.objects.create(name='Драма', slug='drama'))
+        Review.objects.create(author=user, title=title, text='Отзыв', score=7)
+        return title
+
+    @staticmethod
+    def get(client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        return response.json(), ' '.join(
+            query['sql'] for query in context.captured_queries
+        )
+
+    def test_01_fields(self, client, title):
+        data, sql = self.get(client, f'{self.TITLES_URL}?fields=id,name')
+        assert list(data['results'][0]) == ['id', 'name'], (
+            'Проверьте, что параметр fields оставляет в ответе только '
+            'перечисленные поля.'
+        )
+        assert 'reviews_review' not in sql and 'reviews_genre' not in sql, (
+            'Проверьте, что для полей, которых нет в ответе, не '
+            'выполняются подзапросы и загрузка связей.'
+        )
+
+    def test_02_omit(self, client, title):
+        data, sql = self.get(
+            client, f'{self.TITLES_URL}{title.id}/?omit=genre,rating'
+        )
+        assert 'genre' not in data and 'rating' not in data, (
+            'Проверьте, что параметр omit убирает поля из ответа.'
+        )
+        assert data['category'] == {'name': 'Книги', 'slug': 'books'}
+        assert 'reviews_review' not in sql and 'reviews_genre' not in sql
+
+    def test_03_expand(self, client, user, title):
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        data, _ = self.get(client, url)
+        assert data['results'][0]['author'] == user.username
+        data, sql = self.get(client, f'{url}?expand=author')
+        assert data['results'][0]['author'] == {
+            'username': user.username,
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'bio': user.bio,
+        }, (
+            'Проверьте, что параметр expand разворачивает автора отзыва.'
+        )
+        _, sql = self.get(client, f'{url}?fields=id,text')
+        assert 'reviews_user' not in sql, (
+            'Проверьте, что автор не загружается, если его нет в ответе.'
+        )
+
+    def test_04_ignored_on_write(self, admin_client, title):
+        response = admin_client.patch(
+            f'{self.TITLES_URL}{title.id}/?fields=id',
+            data={'name': 'Новое'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['name'] == 'Новое', (
+            'Проверьте, что параметры fields и omit не влияют на '
+            'изменяющие запросы.'
+        )
@@ -0,0 +1,99 @@
+import gzip
+
+import pytest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+
+from api import middleware
+from api.middleware import CompressionMiddleware
+from api_yamdb.storage import CompressedStaticFilesStorage
+from reviews.models import Category
+
+BODY = b'{"results": [' + b'{"name": "value"}, ' * 200 + b'{}]}'
+
+
+class Test25Compression:
+
+    @pytest.fixture(autouse=True)
+    def gzip_only(self, monkeypatch, settings):
+        monkeypatch.setattr(middleware, 'brotli', None)
+        settings.COMPRESSION_MIN_SIZE = 1024
+
+    @staticmethod
+    def process(response, accept_encoding='gzip, br'):
+        request = RequestFactory().get(
+            '/', HTTP_ACCEPT_ENCODING=accept_encoding
+        )
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_01_threshold(self):
+        response = self.process(HttpResponse(b'{"small": true}'))
+        assert not response.has_header('Content-Encoding'), (
+            'Проверьте, что ответы короче COMPRESSION_MIN_SIZE не сжимаются.'
+        )
+        response = self.process(HttpResponse(BODY))
+        assert response['Content-Encoding'] == 'gzip', (
+            'Проверьте, что большие ответы сжимаются gzip, если brotli '
+            'не установлен.'
+        )
+        assert gzip.decompress(response.content) == BODY
+        assert response['Content-Length'] == str(len(response.content))
+        assert 'Accept-Encoding' in response['Vary']
+
+    def test_02_no_accept_encoding(self):
+        response = self.process(HttpResponse(BODY), accept_encoding='')
+        assert response.content == BODY
+        assert 'Accept-Encoding' in response['Vary'], (
+            'Проверьте, что несжатый ответ, который мог быть сжат, '
+            'содержит Vary: Accept-Encoding.'
+        )
+
+    def test_03_streaming(self):
+        response = self.process(StreamingHttpResponse(
+            BODY[i:i + 100] for i in range(0, len(BODY), 100)
+        ))
+        assert response['Content-Encoding'] == 'gzip', (
+            'Проверьте, что потоковые ответы сжимаются по мере отдачи.'
+        )
+        assert gzip.decompress(b''.join(response.streaming_content)) == BODY
+        assert not response.has_header('Content-Length')
+
+        response = self.process(StreamingHttpResponse(
+            iter([BODY]), content_type='text/event-stream'
+        ))
+        assert not response.has_header('Content-Encoding'), (
+            'Проверьте, что поток событий не сжимается.'
+        )
+
+    @pytest.mark.django_db
+    def test_04_api_response(self, client, settings):
+        settings.COMPRESSION_MIN_SIZE = 1
+        for number in range(5):
+            Category.objects.create(
+                name=f'Книги {number} ' * 30, slug=f'books-{number}'
+            )
+        response = client.get(
+            '/api/v1/categories/', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        assert response['Content-Encoding'] == 'gzip', (
+            'Проверьте, что ответы API сжимаются.'
+        )
+        assert b'books-0' in gzip.decompress(response.content)
+
+    def test_05_precompressed_static(self, tmp_path):
+        storage = CompressedStaticFilesStorage(location=tmp_path)
+        (tmp_path / 'redoc.yaml').write_bytes(b'openapi: 3.0.2\n' * 100)
+        (tmp_path / 'small.yaml').write_bytes(b'openapi: 3.0.2\n')
+        (tmp_path / 'image.png').write_bytes(b'\x89PNG' * 200)
+        processed = list(storage.post_process({
+            'redoc.yaml': None, 'small.yaml': None, 'image.png': None
+        }))
+        assert [name for name, _, _ in processed] == ['redoc.yaml']
+        assert gzip.decompress(
+            (tmp_path / 'redoc.yaml.gz').read_bytes()
+        ) == (tmp_path / 'redoc.yaml').read_bytes(), (
+            'Проверьте, что collectstatic сохраняет сжатые копии '
+            'текстовых файлов.'
+        )
+        assert not (tmp_path / 'small.yaml.gz').exists()
+        assert not (tmp_path / 'image.png.gz').exists()
@@ -0,0 +1,121 @@
+import io
+from datetime import datetime, timezone
+from decimal import Decimal
+from http import HTTPStatus
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api import renderers
+from api.parsers import FastJSONParser, MessagePackParser
+from api.renderers import FastJSONRenderer, MessagePackRenderer, orjson
+
+DATA = {
+    'id': 1,
+    'name': 'Произведение с разделителем строк',
+    'rating': 7.5,
+    'ratio': 0.1,
+    'price': Decimal('10.50'),
+    'pub_date': datetime(2020, 1, 1, 10, 30, tzinfo=timezone.utc),
+    'label': gettext_lazy('Отзыв'),
+    'genre': ['drama', None, True],
+    1: 'числовой ключ',
+}
+
+
+@pytest.mark.skipif(orjson is None, reason='orjson не установлен')
+class Test26Renderers:
+
+    @pytest.fixture(autouse=True)
+    def orjson_backend(self, settings):
+        settings.API_JSON_BACKEND = 'orjson'
+
+    @pytest.mark.parametrize('data', [
+        DATA,
+        [DATA, {'value': 1e16}],
+        {'small': 1.5e-7, 'tiny': 1e-5, 'large': 1e22, 'zero': 0.0},
+        {'big': 2 ** 70},
+    ])
+    def test_01_same_as_stdlib(self, data):
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(
+            data
+        ), (
+            'Проверьте, что FastJSONRenderer выдаёт те же байты, что и '
+            'стандартный JSONRenderer.'
+        )
+
+    @pytest.mark.parametrize('value', [float('nan'), float('inf')])
+    def test_02_non_finite_float(self, value):
+        with pytest.raises(ValueError):
+            JSONRenderer().render({'value': value})
+        with pytest.raises(ValueError):
+            FastJSONRenderer().render({'value': value})
+
+    def test_03_json_parser(self):
+        body = JSONRenderer().render(DATA)
+        assert FastJSONParser().parse(io.BytesIO(body)) == JSONParser(
+        ).parse(io.BytesIO(body)), (
+            'Проверьте, что FastJSONParser разбирает JSON так же, как '
+            'стандартный JSONParser.'
+        )
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"name": '))
+
+    def test_04_messagepack_round_trip(self):
+        data = {'id': 1, 'name': 'Произведение', 'rating': 7.5,
+                'genre': ['drama'], 'category': None}
+        body = MessagePackRenderer().render(data)
+        assert MessagePackParser().parse(io.BytesIO(body)) == data, (
+            'Проверьте, что MessagePackParser разбирает ответ '
+            'MessagePackRenderer без потерь.'
+        )
+        with pytest.raises(ParseError):
+            MessagePackParser().parse(io.BytesIO(b'\xc1'))
+
+    def test_05_float_check_by_serializer(self, monkeypatch):
+        class ScoreSerializer(serializers.Serializer):
+            score = serializers.IntegerField()
+
+        class RatioSerializer(serializers.Serializer):
+            ratio = serializers.FloatField()
+
+        walked = []
+        monkeypatch.setattr(
+            renderers, 'has_special_float',
+            lambda data: walked.append(data) or True
+        )
+        FastJSONRenderer().render({
+            'results': ScoreSerializer([{'score': 1}], many=True).data
+        })
+        assert not walked, (
+            'Проверьте, что данные сериализатора без float не '
+            'проверяются на особые float.'
+        )
+        data = RatioSerializer({'ratio': 1e-5}).data
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(
+            data
+        )
+        assert walked, (
+            'Проверьте, что данные сериализатора с FloatField '
+            'проверяются на особые float.'
+        )
+
+
+@pytest.mark.django_db
+class Test26MessagePackDepth:
+
+    SIGNUP_URL = '/api/v1/auth/signup/'
+
+    def test_01_deep_nesting(self, client):
+        response = client.generic(
+            'POST', self.SIGNUP_URL, b'\x91' * 5000,
+            content_type='application/msgpack'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что тело MessagePack со слишком глубокой '
+            'вложенностью отклоняется со статусом 400.'
+        )
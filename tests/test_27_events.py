@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from api.events import EventBroker
+from reviews.models import Category, Review, Title
+
+
+class Test27EventBroker:
+
+    @pytest.fixture(autouse=True)
+    def sse_settings(self, settings):
+        settings.SSE_BUFFER_SIZE = 2
+        settings.SSE_HISTORY_SIZE = 3
+        settings.SSE_RESUME_WINDOW = 60
+
+    @staticmethod
+    def drain(subscriber):
+        events = []
+        while not subscriber.queue.empty():
+            events.append(subscriber.queue.get_nowait())
+        return events
+
+    def test_01_fan_out(self):
+        async def scenario():
+            broker = EventBroker()
+            first = broker.subscribe(1)
+            second = broker.subscribe(1)
+            other = broker.subscribe(2)
+            broker.publish(1, 'review', b'{}')
+            await asyncio.sleep(0)
+            return [self.drain(item) for item in (first, second, other)]
+
+        first, second, other = asyncio.run(scenario())
+        assert len(first) == len(second) == 1 and not other, (
+            'Проверьте, что событие получают все подписчики произведения '
+            'и только они.'
+        )
+        assert first[0][1:] == ('review', b'{}')
+
+    def test_02_overflow(self):
+        async def scenario():
+            broker = EventBroker()
+            subscriber = broker.subscribe(1)
+            for _ in range(3):
+                broker.publish(1, 'review', b'{}')
+            await asyncio.sleep(0)
+            return subscriber
+
+        subscriber = asyncio.run(scenario())
+        assert subscriber.overflowed, (
+            'Проверьте, что при переполнении буфера подписчик помечается '
+            'для отключения.'
+        )
+        assert subscriber.queue.qsize() == 2
+
+    def test_03_last_event_id(self):
+        async def scenario():
+            broker = EventBroker()
+            broker.unsubscribe(broker.subscribe(1))
+            for number in range(4):
+                broker.publish(1, 'review', str(number).encode())
+            history = list(broker._history[1])
+            resumed = broker.subscribe(1, last_event_id=history[0][0])
+            return self.drain(resumed)
+
+        events = asyncio.run(scenario())
+        assert [data for _, _, data in events] == [b'2', b'3'], (
+            'Проверьте, что переподключившийся клиент получает события '
+            'после Last-Event-ID из ограниченной истории.'
+        )
+
+    def test_04_no_history_without_listeners(self, settings):
+        async def scenario():
+            broker = EventBroker()
+            broker.publish(1, 'review', b'{}')
+            assert not broker.is_listened(1) and not broker._history, (
+                'Проверьте, что события произведения без подписчиков '
+                'не сохраняются.'
+            )
+            settings.SSE_RESUME_WINDOW = 0
+            broker.unsubscribe(broker.subscribe(1))
+            broker.publish(1, 'review', b'{}')
+            return broker
+
+        broker = asyncio.run(scenario())
+        assert not broker._history and not broker._resume_until, (
+            'Проверьте, что история произведения удаляется после '
+            'окна возобновления.'
+        )
+
+    @pytest.mark.django_db
+    def test_05_no_serialization_without_listeners(self, user, monkeypatch):
+        monkeypatch.setattr(
+            'api.signals.FastJSONRenderer.render',
+            lambda *args, **kwargs: pytest.fail(
+                'Проверьте, что событие не сериализуется, если у '
+                'произведения нет подписчиков.'
+            )
+        )
+        title = Title.objects.create(
+            name='Произведение', year=2000,
+            category=Category.objects.create(name='Книги', slug='books')
+        )
+        Review.objects.create(author=user, title=title, text='Отзыв', score=5)
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+from asgiref.testing import ApplicationCommunicator
+from django.db.utils import OperationalError
+
+from api import async_views
+from api_yamdb.asgi import application, django_application
+from reviews.models import Category, Comment, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28AsyncViews:
+
+    @pytest.fixture
+    def review(self, user, django_user_model):
+        title = Title.objects.create(
+            name='Произведение', year=2000,
+            category=Category.objects.create(name='Книги', slug='books')
+        )
+        for number in range(12):
+            Review.objects.create(
+                author=django_user_model.objects.create_user(
+                    username=f'author{number}',
+                    email=f'author{number}@yamdb.fake'
+                ),
+                title=title, text='Отзыв ' * 30, score=8
+            )
+        review = Review.objects.create(
+            author=user, title=title, text='Отзыв', score=8
+        )
+        Comment.objects.create(author=user, review=review, text='Комментарий')
+        return review
+
+    @staticmethod
+    def get(app, path, query_string=b'', headers=()):
+        async def request():
+            communicator = ApplicationCommunicator(app, {
+                'type': 'http',
+                'method': 'GET',
+                'path': path,
+                'query_string': query_string,
+                'headers': [(b'host', b'testserver'), *headers],
+                'scheme': 'http',
+                'server': ('testserver', 80),
+            })
+            await communicator.send_input({'type': 'http.request'})
+            start = await communicator.receive_output(5)
+            body = b''
+            while True:
+                message = await communicator.receive_output(5)
+                body += message.get('body', b'')
+                if not message.get('more_body'):
+                    response_headers = {
+                        name.lower(): value
+                        for name, value in start['headers']
+                    }
+                    return start['status'], response_headers, body
+
+        return asyncio.run(request())
+
+    @staticmethod
+    async def django_not_called(scope, receive, send):
+        raise AssertionError(
+            f'Проверьте, что `{scope["path"]}` обрабатывается без Django.'
+        )
+
+    def assert_same(self, path, query_string=b'', headers=(), app=None):
+        app = app or async_views.async_read_router(self.django_not_called)
+        fast = self.get(app, path, query_string, headers)
+        django = self.get(django_application, path, query_string, headers)
+        assert fast == django, (
+            f'Проверьте, что асинхронный ответ на `{path}` совпадает с '
+            'ответом Django: статус, заголовки и тело.'
+        )
+        return fast
+
+    def test_01_parity(self, review):
+        title_id = review.title_id
+        for path, query_string in (
+            (f'/api/v1/titles/{title_id}/reviews/', b''),
+            (f'/api/v1/titles/{title_id}/reviews/', b'page=2'),
+            (
+                f'/api/v1/titles/{title_id}/reviews/{review.id}/comments/',
+                b''
+            ),
+        ):
+            for headers in ((), ((b'accept-encoding', b'gzip'),)):
+                self.assert_same(path, query_string, headers)
+
+    def test_02_headers(self, review):
+        reviews_url = f'/api/v1/titles/{review.title_id}/reviews/'
+        _, headers, _ = self.assert_same(
+            f'{reviews_url}{review.id}/comments/'
+        )
+        assert headers[b'vary'] == b'Accept', (
+            'Проверьте, что короткий ответ не содержит '
+            'Vary: Accept-Encoding.'
+        )
+        _, headers, _ = self.assert_same(
+            reviews_url, headers=((b'accept-encoding', b'gzip'),)
+        )
+        assert headers[b'content-encoding'] == b'gzip'
+        assert headers[b'x-frame-options'] == b'DENY'
+
+    def test_03_unexpected_error(self, review, monkeypatch):
+        async def locked(view):
+            raise OperationalError('database is locked')
+
+        monkeypatch.setattr(async_views, 'list_data', locked)
+        status, _, _ = self.assert_same(
+            f'/api/v1/titles/{review.title_id}/reviews/', app=application
+        )
+        assert status == 200, (
+            'Проверьте, что при неожиданной ошибке асинхронного чтения '
+            'запрос обрабатывается Django.'
+        )
+
+    def test_04_titles_served_by_django(self, review):
+        for path in ('/api/v1/titles/', f'/api/v1/titles/{review.title_id}/'):
+            with pytest.raises(AssertionError, match='без Django'):
+                self.get(
+                    async_views.async_read_router(self.django_not_called),
+                    path
+                )
@@ -0,0 +1,35 @@
+import pytest
+
+from api.management.commands.explain_hot_queries import (
+    find_problem, is_ordered_limit
+)
+from reviews.models import Category, Title
+
+
+class Test29ExplainHotQueries:
+
+    @pytest.mark.parametrize('detail, ordered_limit, problem', [
+        ('SCAN reviews_title', False, 'полный просмотр таблицы'),
+        (
+            'SCAN reviews_category USING INDEX '
+            'sqlite_autoindex_reviews_category_1',
+            False, 'полный просмотр индекса'
+        ),
+        ('SCAN reviews_title USING INDEX title_name_idx', True, None),
+        ('SCAN reviews_title', True, 'полный просмотр таблицы'),
+        ('SCAN reviews_review USING COVERING INDEX idx', False, None),
+        ('SEARCH reviews_title USING INDEX idx (year=?)', False, None),
+        ('USE TEMP B-TREE FOR ORDER BY', False, 'сортировка без индекса'),
+    ])
+    def test_01_find_problem(self, detail, ordered_limit, problem):
+        assert find_problem(detail, ordered_limit) == problem, (
+            'Проверьте, что explain_hot_queries отмечает каждый SCAN, '
+            'кроме покрывающего индекса и обхода индекса до LIMIT.'
+        )
+
+    def test_02_ordered_limit(self):
+        assert is_ordered_limit(Title.objects.order_by('name')[:5])
+        assert not is_ordered_limit(Title.objects.order_by('name'))
+        assert not is_ordered_limit(
+            Category.objects.filter(name='Книги').order_by('name')[:5]
+        )
@@ -0,0 +1,99 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre
+
+
+@pytest.mark.django_db
+class Test30Search:
+
+    USERS_URL = '/api/v1/users/'
+
+    @staticmethod
+    def search(client, url, value, field):
+        response = client.get(url, {'search': value})
+        assert response.status_code == HTTPStatus.OK
+        return sorted(item[field] for item in response.json()['results'])
+
+    @pytest.mark.parametrize('url, model', [
+        ('/api/v1/categories/', Category),
+        ('/api/v1/genres/', Genre),
+    ])
+    def test_01_substring(self, client, url, model):
+        model.objects.create(name='Научная Фантастика', slug='sci-fi')
+        model.objects.create(name='Фэнтези', slug='fantasy')
+        model.objects.create(name='Фантастический роман', slug='novel')
+        assert self.search(client, url, 'фантаст', 'slug') == [
+            'novel', 'sci-fi'
+        ], (
+            f'Проверьте, что поиск `{url}?search=` находит названия, '
+            'содержащие строку в любом месте и в любом регистре.'
+        )
+        assert self.search(client, url, 'фантаст научная', 'slug') == [
+            'sci-fi'
+        ], (
+            f'Проверьте, что в поиске `{url}?search=` каждое слово '
+            'ищется отдельно и должны найтись все слова.'
+        )
+        assert self.search(client, url, 'научная роман', 'slug') == []
+
+    def test_02_users_substring(self, admin_client, admin, user):
+        assert self.search(
+            admin_client, self.USERS_URL, admin.username[1:].upper(),
+            'username'
+        ) == [admin.username], (
+            f'Проверьте, что поиск `{self.USERS_URL}?search=` находит '
+            'пользователей по части имени без учёта регистра.'
+        )
+
+    def test_03_prefix_lookup(self):
+        Category.objects.create(name='Книги', slug='books')
+        Category.objects.create(name='Записные книжки', slug='notebooks')
+        assert list(Category.objects.filter(
+            name_casefold__prefix='кни'
+        ).values_list('slug', flat=True)) == ['books'], (
+            'Проверьте, что lookup prefix ищет по началу строки.'
+        )
+
+    def test_04_prefix_mode(self, admin_client, django_user_model):
+        django_user_model.objects.create(
+            username='Смирнов', email='smirnov@yamdb.fake'
+        )
+        django_user_model.objects.create(
+            username='Иван_Смирнов', email='ivan@yamdb.fake'
+        )
+        response = admin_client.get(self.USERS_URL, {
+            'search': 'СМИР', 'search_mode': 'prefix'
+        })
+        assert response.status_code == HTTPStatus.OK
+        assert [
+            item['username'] for item in response.json()['results']
+        ] == ['Смирнов'], (
+            f'Проверьте, что `{self.USERS_URL}?search_mode=prefix` ищет '
+            'пользователей по началу имени без учёта регистра.'
+        )
+
+    def test_05_prefix_mode_uses_index(self, admin_client, admin):
+        with CaptureQueriesContext(connection) as queries:
+            admin_client.get(self.USERS_URL, {
+                'search': admin.username[:3], 'search_mode': 'prefix'
+            })
+        select = next(
+            query['sql'] for query in queries.captured_queries
+            if '"username_casefold" >=' in query['sql']
+            and 'COUNT' not in query['sql']
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {select}')
+            plan = [row[-1] for row in cursor.fetchall()]
+        assert any(
+            detail.startswith('SEARCH reviews_user USING INDEX')
+            and 'username_casefold>?' in detail
+            for detail in plan
+        ), (
+            'Проверьте, что поиск пользователей по началу имени использует '
+            f'индекс username_casefold. План: {plan}'
+        )